@@ -163,6 +163,19 @@ CREATE TABLE IF NOT EXISTS season_contract (
 	FOREIGN KEY (contractee_id) REFERENCES user(id) ON DELETE CASCADE ON UPDATE CASCADE
 ) STRICT;
 
+CREATE TABLE IF NOT EXISTS sync_run (
+	id			INTEGER NOT NULL,
+	season_id	TEXT NOT NULL,
+	started_at	REAL NOT NULL, -- unix timestamp
+	duration	REAL NOT NULL,
+	status		TEXT NOT NULL,
+	error		TEXT,
+	phases		TEXT NOT NULL, -- json list of the phase timings and row counts
+
+	PRIMARY KEY (id),
+	FOREIGN KEY (season_id) REFERENCES season(id) ON DELETE CASCADE ON UPDATE CASCADE
+) STRICT;
+
 CREATE TABLE IF NOT EXISTS media (
 	type		TEXT NOT NULL,
 	id			TEXT NOT NULL,
@@ -219,6 +232,40 @@ CREATE TABLE IF NOT EXISTS media_steam (
 	FOREIGN KEY (type, id) REFERENCES media(type, id) ON DELETE CASCADE ON UPDATE CASCADE
 ) STRICT;
 
+CREATE TABLE IF NOT EXISTS reminder (
+	id			INTEGER NOT NULL,
+	user_id		INTEGER NOT NULL,
+	channel_id	INTEGER NOT NULL,
+	message		TEXT NOT NULL,
+	remind_at	INTEGER NOT NULL,
+	hidden		INTEGER NOT NULL DEFAULT 0,
+	created_at	INTEGER NOT NULL DEFAULT (unixepoch()),
+	claimed_at	INTEGER,
+	attempts	INTEGER NOT NULL DEFAULT 0,
+	retry_at	INTEGER,
+
+	PRIMARY KEY (id AUTOINCREMENT)
+) STRICT;
+
+CREATE INDEX IF NOT EXISTS idx_reminder_remind_at ON reminder (remind_at);
+CREATE INDEX IF NOT EXISTS idx_reminder_user ON reminder (user_id, remind_at);
+
+-- reminders that ran out of delivery attempts
+CREATE TABLE IF NOT EXISTS reminder_dead (
+	id			INTEGER NOT NULL,
+	user_id		INTEGER NOT NULL,
+	channel_id	INTEGER NOT NULL,
+	message		TEXT NOT NULL,
+	remind_at	INTEGER NOT NULL,
+	hidden		INTEGER NOT NULL DEFAULT 0,
+	created_at	INTEGER,
+	attempts	INTEGER NOT NULL,
+	error		TEXT,
+	failed_at	INTEGER NOT NULL DEFAULT (unixepoch()),
+
+	PRIMARY KEY (id)
+) STRICT;
+
 -- Add default config
 INSERT OR IGNORE INTO bot_config (key, value) VALUES ("contracts.active_season", "season_x");
 INSERT OR IGNORE INTO bot_config (key, value) VALUES ("contracts.deadline_datetime", "2030-01-14T22:00:00Z");
@@ -1,9 +0,0 @@
-CREATE TABLE IF NOT EXISTS reminders (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    user_id INTEGER NOT NULL,
-    channel_id INTEGER NOT NULL,
-    message TEXT NOT NULL,
-    remind_at INTEGER NOT NULL,
-    hidden INTEGER NOT NULL DEFAULT 0,
-    created_at INTEGER DEFAULT (strftime('%s','now'))
-);
\ No newline at end of file
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+
+def compare(baseline: dict, current: dict, *, key: str = "median") -> list[tuple[str, float | None, float | None, float | None]]:
+	"""(scenario, baseline, current, relative change) for every scenario in either run."""
+	baseline_scenarios = {scenario["name"]: scenario for scenario in baseline["scenarios"]}
+	current_scenarios = {scenario["name"]: scenario for scenario in current["scenarios"]}
+
+	rows = []
+	for name in dict.fromkeys((*baseline_scenarios, *current_scenarios)):
+		before = baseline_scenarios.get(name, {}).get(key)
+		after = current_scenarios.get(name, {}).get(key)
+		change = (after - before) / before if before and after is not None else None
+		rows.append((name, before, after, change))
+
+	return rows
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+	parser.add_argument("baseline")
+	parser.add_argument("current")
+	parser.add_argument("--key", default="median", choices=["min", "median", "mean", "p95", "max"])
+	args = parser.parse_args()
+
+	with open(args.baseline, encoding="utf-8") as f:
+		baseline = json.load(f)
+	with open(args.current, encoding="utf-8") as f:
+		current = json.load(f)
+
+	print(f"{'scenario':<36}{'baseline':>12}{'current':>12}{'change':>10}")
+	for name, before, after, change in compare(baseline, current, key=args.key):
+		before_text = f"{before * 1000:.3f}ms" if before is not None else "-"
+		after_text = f"{after * 1000:.3f}ms" if after is not None else "-"
+		change_text = f"{change:+.1%}" if change is not None else "-"
+		print(f"{name[:35]:<36}{before_text:>12}{after_text:>12}{change_text:>10}")
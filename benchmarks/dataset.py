@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+from internal.enums import UserStatus, UserKind, ContractStatus, ContractKind, BadgeType
+from dataclasses import dataclass, asdict
+from internal.contracts.rep import RepName
+from pathlib import Path
+
+import argparse
+import datetime
+import sqlite3
+import random
+import uuid
+
+# rough size of the production data, the scales multiply it
+BASE_USERS = 900
+BASE_ALIASES = 250
+BASE_SEASON_USERS = 500
+BASE_BADGES = 120
+BASE_REMINDERS = 200
+
+SCALES: dict[str, int] = {"1x": 1, "10x": 10, "100x": 100}
+DEFAULT_SEED = 1337
+
+SEASON_X_CONTRACT_TYPES = (
+	"Base Contract",
+	"Challenge Contract",
+	"Veteran Special",
+	"Duality Special",
+	"Epoch Special",
+	"Honzuki Special",
+	"Aria Special",
+	"Base Buddy",
+	"Challenge Buddy",
+	"Sumira's Challenge",
+	"Hitome's Challenge",
+	"Sae's Challenge",
+	"Christmas Challenge",
+)
+OLD_SEASON_CONTRACT_TYPES = (
+	"Base Contract",
+	"Challenge Contract",
+	"Veteran Special",
+	"Movie Special",
+	"VN Special",
+	"Indie Special",
+	"Extreme Special",
+	"Base Buddy",
+	"Challenge Buddy",
+)
+OPTIONAL_CONTRACT_TYPES = frozenset(("Aria Special", "Sumira's Challenge", "Hitome's Challenge", "Sae's Challenge", "Christmas Challenge"))
+MEDIUMS = ("TV", "Movie", "ONA", "Manga", "Light Novel", "Visual Novel", "Game")
+SYLLABLES = ("ka", "ri", "na", "to", "mi", "zu", "ki", "sh", "ro", "a", "e", "yo", "ne", "ko", "su", "ha", "ru", "chi", "no", "x")
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class DatasetSize:
+	users: int
+	aliases: int
+	seasons: int
+	season_users: int  # per season
+	badges: int
+	badges_per_user: int  # average
+	max_aid_contracts: int  # per season user
+	reminders: int
+
+	@classmethod
+	def from_scale(cls, scale: int, *, seasons: int = 2) -> DatasetSize:
+		return cls(
+			users=BASE_USERS * scale,
+			aliases=BASE_ALIASES * scale,
+			seasons=max(seasons, 1),
+			season_users=BASE_SEASON_USERS * scale,
+			badges=BASE_BADGES * scale,
+			badges_per_user=4,
+			max_aid_contracts=3,
+			reminders=BASE_REMINDERS * scale,
+		)
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class Dataset:
+	"""What was generated, the benchmarks pick their inputs from here instead of querying for them."""
+
+	size: DatasetSize
+	seed: int
+	database_path: str
+	season_ids: tuple[str, ...]
+	usernames: tuple[str, ...]
+	aliases: tuple[str, ...]
+	season_user_ids: dict[str, tuple[str, ...]]
+	counts: dict[str, int]
+
+	def summary(self) -> dict:
+		return {"size": asdict(self.size), "seed": self.seed, "counts": self.counts}
+
+
+def _uuid(rng: random.Random) -> str:
+	return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _username(rng: random.Random, taken: set[str]) -> str:
+	while True:
+		name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+		if rng.random() < 0.35:
+			name += str(rng.randint(0, 999))
+		if rng.random() < 0.15:
+			name = f"{name}_{rng.choice(SYLLABLES)}"
+		if name not in taken:
+			taken.add(name)
+			return name
+
+
+def _contract_status(rng: random.Random) -> int:
+	return rng.choices(
+		(ContractStatus.PASSED, ContractStatus.PENDING, ContractStatus.FAILED, ContractStatus.LATE_PASS, ContractStatus.UNVERIFIED),
+		weights=(55, 25, 10, 5, 5),
+	)[0].value
+
+
+def generate_dataset(database_path: str, size: DatasetSize, *, seed: int = DEFAULT_SEED) -> Dataset:
+	"""
+	Create a fresh database filled with synthetic data.
+
+	The same size and seed always produce the same rows, existing files at the paths are replaced.
+	"""
+	rng = random.Random(seed)
+	Path(database_path).parent.mkdir(parents=True, exist_ok=True)
+	Path(database_path).unlink(missing_ok=True)
+
+	taken_names: set[str] = set()
+	users = [(_uuid(rng), _username(rng, taken_names)) for _ in range(size.users)]
+	discord_ids = rng.sample(range(10**17, 10**18), size.users)
+	aliases = [(_username(rng, taken_names), rng.choice(users)[0]) for _ in range(size.aliases)]
+	reps = tuple(RepName)
+
+	season_ids = ["season_x", "winter_2025", *(f"bench_season_{i}" for i in range(max(size.seasons - 2, 0)))][: size.seasons]
+	counts: dict[str, int] = {"user": len(users), "user_alias": len(aliases), "season": len(season_ids)}
+	season_user_ids: dict[str, tuple[str, ...]] = {}
+
+	conn = sqlite3.connect(database_path)
+	try:
+		conn.executescript(Path("assets/schemas/Database.sql").read_text())
+		conn.execute("BEGIN")
+
+		conn.executemany(
+			"INSERT INTO user (id, discord_id, username, rep, gen) VALUES (?, ?, ?, ?, ?)",
+			(
+				(user_id, discord_ids[i] if rng.random() < 0.6 else None, username, rng.choice(reps).value, rng.randint(1, 10))
+				for i, (user_id, username) in enumerate(users)
+			),
+		)
+		conn.executemany("INSERT INTO user_alias (username, user_id) VALUES (?, ?)", aliases)
+		conn.executemany(
+			"INSERT OR IGNORE INTO season (id, name) VALUES (?, ?)", ((season_id, season_id.replace("_", " ").title()) for season_id in season_ids)
+		)
+
+		counts["season_user"] = counts["season_contract"] = 0
+		for season_id in season_ids:
+			contract_types = SEASON_X_CONTRACT_TYPES if season_id == "season_x" else OLD_SEASON_CONTRACT_TYPES
+			participants = rng.sample(users, min(size.season_users, len(users)))
+			season_user_ids[season_id] = tuple(user_id for user_id, _ in participants)
+
+			season_users = []
+			contracts = []
+			for user_id, _ in participants:
+				kind = UserKind.AID if rng.random() < 0.1 else UserKind.NORMAL
+				status = rng.choices((UserStatus.PASSED, UserStatus.PENDING, UserStatus.FAILED, UserStatus.INCOMPLETE), weights=(50, 30, 15, 5))[0]
+				season_users.append(
+					(
+						season_id,
+						user_id,
+						status.value,
+						kind.value,
+						rng.choice(reps).value,
+						rng.choice(participants)[0],
+						f"https://anilist.co/user/{user_id[:8]}",
+						int(rng.random() < 0.2),
+						int(rng.random() < 0.5),
+						int(rng.random() < 0.3),
+						"Anything but horror",
+						"Sports",
+					)
+				)
+
+				user_types = contract_types if kind == UserKind.NORMAL else ()
+				aid_types = [f"Aid Contract {n}" for n in range(1, rng.randint(0, size.max_aid_contracts) + 1)]
+				for contract_type in (*user_types, *aid_types):
+					contracts.append(
+						(
+							season_id,
+							_uuid(rng),
+							f"{rng.choice(SYLLABLES).title()} {rng.choice(SYLLABLES)}{rng.choice(SYLLABLES)}",
+							contract_type,
+							(ContractKind.AID if contract_type.startswith("Aid") else ContractKind.NORMAL).value,
+							_contract_status(rng),
+							user_id,
+							rng.choice(users)[1],
+							int(contract_type in OPTIONAL_CONTRACT_TYPES),
+							f"{rng.randint(0, 24)}/24",
+							f"{rng.randint(0, 10)}/10",
+							"https://example.com/review" if rng.random() < 0.4 else None,
+							rng.choice(MEDIUMS),
+						)
+					)
+
+			conn.executemany("INSERT INTO season_user VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", season_users)
+			conn.executemany(
+				"INSERT INTO season_contract (season_id, id, name, type, kind, status, contractee_id, contractor, optional, progress, rating, review_url, medium) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+				contracts,
+			)
+			counts["season_user"] += len(season_users)
+			counts["season_contract"] += len(contracts)
+
+		epoch = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+		badge_ids = [_uuid(rng) for _ in range(size.badges)]
+		conn.executemany(
+			"INSERT INTO badge (id, name, description, artist, url, type, created_at, rarity) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+			(
+				(
+					badge_id,
+					f"Badge {i}",
+					"Synthetic badge",
+					rng.choice(users)[1],
+					f"https://example.com/badges/{i}.png",
+					rng.choice(tuple(BadgeType)).value,
+					(epoch + datetime.timedelta(hours=i)).isoformat(),
+					rng.choice(("common", "rare", "legendary")),
+				)
+				for i, badge_id in enumerate(badge_ids)
+			),
+		)
+
+		user_badges: set[tuple[str, str]] = set()
+		for user_id, _ in users:
+			for badge_id in rng.sample(badge_ids, min(rng.randint(0, size.badges_per_user * 2), len(badge_ids))):
+				user_badges.add((user_id, badge_id))
+		conn.executemany("INSERT INTO user_badge (user_id, badge_id) VALUES (?, ?)", sorted(user_badges))
+		counts["badge"] = len(badge_ids)
+		counts["user_badge"] = len(user_badges)
+
+		now = int(epoch.timestamp())
+		conn.executemany(
+			"INSERT INTO reminder (user_id, channel_id, message, remind_at, hidden, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+			(
+				(rng.choice(discord_ids), rng.randint(10**17, 10**18), "Synthetic reminder", now + rng.randint(60, 86400 * 30), int(rng.random() < 0.3), now)
+				for _ in range(size.reminders)
+			),
+		)
+		counts["reminder"] = size.reminders
+
+		conn.commit()
+	finally:
+		conn.close()
+
+	return Dataset(
+		size=size,
+		seed=seed,
+		database_path=database_path,
+		season_ids=tuple(season_ids),
+		usernames=tuple(username for _, username in users),
+		aliases=tuple(alias for alias, _ in aliases),
+		season_user_ids=season_user_ids,
+		counts=counts,
+	)
+
+
+def dataset_path(scale_name: str, directory: str = "data/benchmarks") -> str:
+	return f"{directory}/database-bench-{scale_name}.sqlite"
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Generate a synthetic database for benchmarks")
+	parser.add_argument("--scale", choices=SCALES.keys(), default="1x")
+	parser.add_argument("--seasons", type=int, default=2)
+	parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+	args = parser.parse_args()
+
+	database_path = dataset_path(args.scale)
+	dataset = generate_dataset(database_path, DatasetSize.from_scale(SCALES[args.scale], seasons=args.seasons), seed=args.seed)
+	print(f"Generated {database_path}: {dataset.counts}")
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import statistics
+import subprocess
+import platform
+import datetime
+import time
+import json
+import sys
+
+if TYPE_CHECKING:
+	from collections.abc import Awaitable, Callable
+
+
+@dataclass(kw_only=True, slots=True)
+class ScenarioResult:
+	name: str
+	iterations: int
+	timings: list[float] = field(default_factory=list, repr=False)
+	extra: dict[str, Any] = field(default_factory=dict)
+
+	def to_dict(self) -> dict[str, Any]:
+		timings = sorted(self.timings)
+		return {
+			"name": self.name,
+			"iterations": self.iterations,
+			"total": sum(timings),
+			"min": timings[0],
+			"median": statistics.median(timings),
+			"mean": statistics.fmean(timings),
+			"p95": timings[min(int(len(timings) * 0.95), len(timings) - 1)],
+			"max": timings[-1],
+			"ops_per_second": len(timings) / sum(timings) if sum(timings) else None,
+			**self.extra,
+		}
+
+
+async def measure(name: str, func: Callable[[int], Awaitable[Any]], *, iterations: int, warmup: int = 3) -> ScenarioResult:
+	"""Time `func(i)` per iteration, the iteration number lets scenarios cycle through their inputs."""
+	for i in range(warmup):
+		await func(i)
+
+	result = ScenarioResult(name=name, iterations=iterations)
+	for i in range(iterations):
+		start = time.perf_counter()
+		await func(i)
+		result.timings.append(time.perf_counter() - start)
+
+	return result
+
+
+def git_commit() -> str | None:
+	try:
+		return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def write_results(path: str, results: list[ScenarioResult], **metadata: Any):
+	data = {
+		"created_at": datetime.datetime.now(datetime.UTC).isoformat(),
+		"commit": git_commit(),
+		"python": sys.version.split()[0],
+		"platform": platform.platform(),
+		**metadata,
+		"scenarios": [result.to_dict() for result in results],
+	}
+
+	with open(path, "w", encoding="utf-8") as f:
+		json.dump(data, f, indent="\t")
+
+
+def format_results(results: list[ScenarioResult]) -> str:
+	lines = [f"{'scenario':<36}{'iters':>7}{'median':>12}{'p95':>12}{'ops/s':>12}"]
+	for result in results:
+		data = result.to_dict()
+		lines.append(
+			f"{result.name[:35]:<36}{result.iterations:>7}{data['median'] * 1000:>10.3f}ms{data['p95'] * 1000:>10.3f}ms{data['ops_per_second'] or 0:>12.1f}"
+		)
+	return "\n".join(lines)
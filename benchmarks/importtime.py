@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from benchmarks.harness import git_commit
+from pathlib import Path
+
+import subprocess
+import argparse
+import json
+import sys
+
+# what a cold start imports: the bot, the CLI scripts and the packages they share
+ENTRY_MODULES = (
+	"internal.base.bot",
+	"scripts.sync_season",
+	"scripts.sync_master_sheet",
+	"scripts.migrate_masterdb_to_database",
+	"scripts.migrate_seasondb_to_database",
+	"internal.database",
+	"internal.contracts",
+	"internal.constants",
+)
+DEFAULT_BASELINE = "data/benchmarks/importtime-baseline.json"
+DEFAULT_THRESHOLD = 0.25  # imports are noisier than the other benchmarks, disk cache and all
+DEFAULT_TOP = 10
+
+
+def parse_importtime(output: str) -> list[dict]:
+	"""Entries of `-X importtime` output in import order, times in microseconds and depth 0 for the top level imports."""
+	modules = []
+	for line in output.splitlines():
+		if not line.startswith("import time:") or "imported package" in line:
+			continue
+
+		self_time, cumulative, name = line.removeprefix("import time:").split("|", 2)
+		stripped = name.rstrip().removeprefix(" ")
+		modules.append(
+			{
+				"name": stripped.strip(),
+				"depth": (len(stripped) - len(stripped.lstrip())) // 2,
+				"self": int(self_time),
+				"cumulative": int(cumulative),
+			}
+		)
+
+	return modules
+
+
+def measure_import(module: str) -> list[dict]:
+	"""Import `module` in a fresh interpreter, nothing from this process is cached in it."""
+	result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True)
+	if result.returncode != 0:
+		raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+	return parse_importtime(result.stderr)
+
+
+def bench_imports(modules: tuple[str, ...], *, repeat: int, top: int) -> dict[str, dict]:
+	"""Fastest of `repeat` cold imports per module, with its heaviest imports by cumulative time."""
+	results = {}
+	for module in modules:
+		runs = [measure_import(module) for _ in range(repeat)]
+		best = min(runs, key=lambda entries: sum(entry["cumulative"] for entry in entries if entry["depth"] == 0))
+		heaviest = sorted((entry for entry in best if entry["name"] != module), key=lambda entry: entry["cumulative"], reverse=True)
+		results[module] = {
+			"total": sum(entry["cumulative"] for entry in best if entry["depth"] == 0),
+			"modules": len(best),
+			"heaviest": [{"name": entry["name"], "cumulative": entry["cumulative"]} for entry in heaviest[:top]],
+			"importtime": best,
+		}
+
+	return results
+
+
+def check_regressions(baseline: dict, current: dict, *, threshold: float) -> list[str]:
+	failures = []
+	for module, result in current["imports"].items():
+		base = baseline.get("imports", {}).get(module)
+		if base is not None and result["total"] > base["total"] * (1 + threshold):
+			failures.append(f"{module}: {result['total'] / 1000:.1f}ms, baseline {base['total'] / 1000:.1f}ms")
+
+	return failures
+
+
+def main(*, modules: tuple[str, ...], repeat: int, top: int, baseline_path: str, save_baseline: bool, check: bool, threshold: float, verbose: bool) -> int:
+	current = {
+		"commit": git_commit(),
+		"python": sys.version.split()[0],
+		"imports": bench_imports(modules, repeat=repeat, top=top),
+	}
+
+	print(f"{'module':<40}{'modules':>9}{'time':>11}")
+	for module, result in current["imports"].items():
+		print(f"{module:<40}{result['modules']:>9}{result['total'] / 1000:>9.1f}ms")
+		if verbose:
+			for entry in result["heaviest"]:
+				print(f"  {entry['name']:<38}{entry['cumulative'] / 1000:>18.1f}ms")
+
+	if save_baseline:
+		Path(baseline_path).parent.mkdir(parents=True, exist_ok=True)
+		with open(baseline_path, "w", encoding="utf-8") as f:
+			json.dump(current, f, indent="\t")
+		print(f"\nBaseline saved to {baseline_path}")
+
+	if check:
+		if not Path(baseline_path).exists():
+			print(f"\nNo baseline at {baseline_path}, run with --save-baseline first")
+			return 2
+
+		with open(baseline_path, encoding="utf-8") as f:
+			baseline = json.load(f)
+
+		failures = check_regressions(baseline, current, threshold=threshold)
+		if failures:
+			print(f"\nRegressed against the baseline from {baseline.get('commit') or 'unknown commit'}:")
+			print("\n".join(f"- {failure}" for failure in failures))
+			return 1
+
+		print("\nNo regressions against the baseline.")
+
+	return 0
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Cold import time of the bot and scripts, from -X importtime")
+	parser.add_argument("modules", nargs="*", default=ENTRY_MODULES)
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="heaviest imports to keep per module")
+	parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+	parser.add_argument("--save-baseline", action="store_true")
+	parser.add_argument("--check", action="store_true", help="exit with 1 when imports got slower than the baseline allows")
+	parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.25 is 25%%")
+	parser.add_argument("-v", "--verbose", action="store_true", help="list the heaviest imports of every module")
+	args = parser.parse_args()
+
+	sys.exit(
+		main(
+			modules=tuple(args.modules),
+			repeat=args.repeat,
+			top=args.top,
+			baseline_path=args.baseline,
+			save_baseline=args.save_baseline,
+			check=args.check,
+			threshold=args.threshold,
+			verbose=args.verbose,
+		)
+	)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from internal.contracts.seasons.SeasonX import SEASON_SPREADSHEET_ID, SEASON_SHEET_RANGES, FANTASY_SPREADSHEET_ID, FANTASY_SHEET_RANGE
+from internal.contracts.sheet import fetch_sheets_payload
+from pathlib import Path
+
+import argparse
+import asyncio
+
+RECORDINGS_DIRECTORY = "data/benchmarks/sheets"
+
+
+def recording_path(spreadsheet_id: str, directory: str = RECORDINGS_DIRECTORY) -> Path:
+	return Path(directory) / f"{spreadsheet_id}.json"
+
+
+async def main(directory: str):
+	Path(directory).mkdir(parents=True, exist_ok=True)
+
+	for spreadsheet_id, ranges in ((SEASON_SPREADSHEET_ID, SEASON_SHEET_RANGES), (FANTASY_SPREADSHEET_ID, [FANTASY_SHEET_RANGE])):
+		payload = await fetch_sheets_payload(spreadsheet_id, ranges)
+		recording_path(spreadsheet_id, directory).write_bytes(payload)
+		print(f"Recorded {spreadsheet_id} ({len(payload) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Save the Sheets API responses SeasonX syncs from, for the sync benchmark to replay")
+	parser.add_argument("--directory", default=RECORDINGS_DIRECTORY)
+	args = parser.parse_args()
+
+	asyncio.run(main(args.directory))
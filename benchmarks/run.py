@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from internal.contracts.loaders import load_season_contracts, load_season_stats, load_user_badge_leaderboard, load_badge_leaderboard
+from benchmarks.dataset import SCALES, DEFAULT_SEED, Dataset, DatasetSize, generate_dataset, dataset_path
+from benchmarks.harness import ScenarioResult, measure, write_results, format_results
+from benchmarks.record_sheets import RECORDINGS_DIRECTORY, recording_path
+from internal.contracts.order import OrderPlan, sort_contract_types
+from internal.contracts.sheet import parse_sheets
+from internal.contracts.seasons import SeasonX
+from internal.database import NatsuminDatabase
+from internal.contracts import sync_season
+from internal.functions import load_user_matcher, get_user_id
+from internal.metrics import sync_phase
+from typing import TYPE_CHECKING
+
+import argparse
+import datetime
+import asyncio
+import random
+import json
+
+if TYPE_CHECKING:
+	from internal.contracts.sheet import SheetBlock, Spreadsheet
+
+	import aiosqlite
+
+SAMPLE_SIZE = 200
+
+
+def _misspell(rng: random.Random, name: str) -> str:
+	"""Swap two neighbouring characters, close enough that the fuzzy fallback still finds the user."""
+	if len(name) < 4:
+		return name + name[-1]
+
+	i = rng.randrange(1, len(name) - 2)
+	return name[:i] + name[i + 1] + name[i] + name[i + 2 :]
+
+
+async def _user_contract_types(conn: aiosqlite.Connection, season_id: str) -> list[list[str]]:
+	async with conn.execute("SELECT json_group_array(type) AS types FROM season_contract WHERE season_id = ? GROUP BY contractee_id", (season_id,)) as cursor:
+		return [json.loads(row["types"]) for row in await cursor.fetchall()]
+
+
+async def run_query_scenarios(database: NatsuminDatabase, dataset: Dataset, *, iterations: int, seed: int) -> list[ScenarioResult]:
+	rng = random.Random(seed)
+	season_id = dataset.season_ids[0]
+
+	hits = rng.sample(dataset.usernames, min(SAMPLE_SIZE, len(dataset.usernames)))
+	alias_hits = rng.sample(dataset.aliases, min(SAMPLE_SIZE, len(dataset.aliases)))
+	fuzzy_hits = [_misspell(rng, name) for name in hits]
+	misses = [f"nobody_{i}_qqzz" for i in range(SAMPLE_SIZE)]
+	season_users = rng.sample(dataset.season_user_ids[season_id], min(SAMPLE_SIZE, len(dataset.season_user_ids[season_id])))
+
+	with open(f"assets/orders/{season_id}.json", encoding="utf-8") as f:
+		order_data = json.load(f)
+	shared_plan = OrderPlan(order_data)
+
+	results: list[ScenarioResult] = []
+	async with database.connect() as conn:
+		user_contract_types = await _user_contract_types(conn, season_id)
+
+		results.append(await measure("get_user_id.hit", lambda i: get_user_id(conn, hits[i % len(hits)]), iterations=iterations))
+		results.append(await measure("get_user_id.alias_hit", lambda i: get_user_id(conn, alias_hits[i % len(alias_hits)]), iterations=iterations))
+		results.append(await measure("get_user_id.fuzzy", lambda i: get_user_id(conn, fuzzy_hits[i % len(fuzzy_hits)]), iterations=max(iterations // 10, 5)))
+		results.append(await measure("get_user_id.miss", lambda i: get_user_id(conn, misses[i % len(misses)]), iterations=max(iterations // 10, 5)))
+
+		matcher = await load_user_matcher(conn)
+		results.append(
+			await measure("get_user_id.fuzzy_cached", lambda i: get_user_id(conn, fuzzy_hits[i % len(fuzzy_hits)], matcher=matcher), iterations=iterations)
+		)
+		results.append(await measure("get_user_id.miss_cached", lambda i: get_user_id(conn, misses[i % len(misses)], matcher=matcher), iterations=iterations))
+
+		results.append(
+			await measure(
+				"season_user_contracts.load", lambda i: load_season_contracts(conn, season_id, season_users[i % len(season_users)]), iterations=iterations
+			)
+		)
+		results.append(await measure("stats.season", lambda i: load_season_stats(conn, season_id), iterations=max(iterations // 4, 5)))
+		results.append(await measure("stats.rep", lambda i: load_season_stats(conn, season_id, "FRIEREN"), iterations=max(iterations // 4, 5)))
+		results.append(await measure("badge_leaderboard.users", lambda i: load_user_badge_leaderboard(conn), iterations=max(iterations // 4, 5)))
+		results.append(await measure("badge_leaderboard.badges", lambda i: load_badge_leaderboard(conn), iterations=max(iterations // 4, 5)))
+
+	async def sort_cold(i: int):
+		sort_contract_types(user_contract_types[i % len(user_contract_types)], OrderPlan(order_data))
+
+	async def sort_warm(i: int):
+		sort_contract_types(user_contract_types[i % len(user_contract_types)], shared_plan)
+
+	results.append(await measure("sort_contract_types.cold", sort_cold, iterations=iterations))
+	results.append(await measure("sort_contract_types.warm", sort_warm, iterations=iterations))
+	return results
+
+
+async def run_sync_scenario(database: NatsuminDatabase, *, iterations: int, recordings: str) -> list[ScenarioResult]:
+	"""Full SeasonX sync against recorded sheets, media lookups are skipped so nothing goes over the network."""
+	payloads = {
+		spreadsheet_id: recording_path(spreadsheet_id, recordings).read_bytes()
+		for spreadsheet_id in (SeasonX.SEASON_SPREADSHEET_ID, SeasonX.FANTASY_SPREADSHEET_ID)
+	}
+
+	async def replay_fetch_sheets(spreadsheet_id: str, range: str | list[str]) -> SheetBlock | Spreadsheet:
+		with sync_phase("JSON parse"):
+			return parse_sheets(spreadsheet_id, range, payloads[spreadsheet_id])
+
+	async def skip_media_sync(*args, **kwargs):
+		pass
+
+	original_fetch, original_media_sync = SeasonX.fetch_sheets, SeasonX.sync_media_data
+	SeasonX.fetch_sheets, SeasonX.sync_media_data = replay_fetch_sheets, skip_media_sync
+	try:
+		first = await measure("sync_season.first", lambda i: sync_season(database, SeasonX.SEASON_ID), iterations=1, warmup=0)
+		reports = []
+
+		async def repeat(i: int):
+			reports.append(await sync_season(database, SeasonX.SEASON_ID))
+
+		repeated = await measure("sync_season.repeat", repeat, iterations=iterations, warmup=0)
+		repeated.extra["phases"] = [phase.to_dict() for phase in reports[-1].phases.values()]
+	finally:
+		SeasonX.fetch_sheets, SeasonX.sync_media_data = original_fetch, original_media_sync
+
+	return [first, repeated]
+
+
+async def main(*, scale: str, seasons: int, seed: int, iterations: int, sync_iterations: int, recordings: str, output: str | None):
+	database_path = dataset_path(scale)
+	print(f"Generating {scale} dataset...")
+	dataset = generate_dataset(database_path, DatasetSize.from_scale(SCALES[scale], seasons=seasons), seed=seed)
+
+	database = NatsuminDatabase(path=database_path)
+	await database.setup()
+
+	results = await run_query_scenarios(database, dataset, iterations=iterations, seed=seed)
+
+	if sync_iterations > 0:
+		if recording_path(SeasonX.SEASON_SPREADSHEET_ID, recordings).exists() and recording_path(SeasonX.FANTASY_SPREADSHEET_ID, recordings).exists():
+			results.extend(await run_sync_scenario(database, iterations=sync_iterations, recordings=recordings))
+		else:
+			print(f"Skipping sync_season, no recorded sheets in {recordings} (record them with `python -m benchmarks.record_sheets`)")
+
+	await database.close()
+
+	print(format_results(results))
+
+	output = output or f"data/benchmarks/results-{scale}-{datetime.datetime.now(datetime.UTC):%Y%m%d-%H%M%S}.json"
+	write_results(output, results, scale=scale, dataset=dataset.summary())
+	print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Run the database and sync benchmarks against a synthetic dataset")
+	parser.add_argument("--scale", choices=SCALES.keys(), default="1x")
+	parser.add_argument("--seasons", type=int, default=2)
+	parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+	parser.add_argument("--iterations", type=int, default=200)
+	parser.add_argument("--sync-iterations", type=int, default=3, help="0 skips the sync benchmark")
+	parser.add_argument("--recordings", default=RECORDINGS_DIRECTORY)
+	parser.add_argument("--output", default=None)
+	args = parser.parse_args()
+
+	asyncio.run(
+		main(
+			scale=args.scale,
+			seasons=args.seasons,
+			seed=args.seed,
+			iterations=args.iterations,
+			sync_iterations=args.sync_iterations,
+			recordings=args.recordings,
+			output=args.output,
+		)
+	)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from internal.contracts.sheet import Row, Cell, parse_sheets, column_to_index, cell_to_indices
+from benchmarks.record_sheets import RECORDINGS_DIRECTORY
+from benchmarks.harness import git_commit
+from typing import TYPE_CHECKING, Any
+from pathlib import Path
+
+import tracemalloc
+import argparse
+import random
+import time
+import json
+import sys
+
+if TYPE_CHECKING:
+	from collections.abc import Callable
+
+PAYLOAD_SIZES = (100, 1_000, 10_000)  # rows, the SeasonX sync is around 5000 rows over all sheets
+PAYLOAD_COLUMNS = 20
+DEFAULT_BASELINE = "data/benchmarks/sheets-baseline.json"
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_MEMORY_THRESHOLD = 0.10
+ACCESSOR_CALLS = 100_000
+
+
+def synthetic_payload(rows: int, columns: int = PAYLOAD_COLUMNS, *, seed: int = 0) -> bytes:
+	"""Sheets API response shaped like the real ones: sparse rows, empty cells and some hyperlinks."""
+	rng = random.Random(seed)
+	raw_rows = []
+	for row_index in range(rows):
+		if rng.random() < 0.05:
+			raw_rows.append({})
+			continue
+
+		values = []
+		for column_index in range(rng.randint(columns // 2, columns)):
+			roll = rng.random()
+			if roll < 0.2:
+				values.append({})
+			elif roll < 0.3:
+				values.append({"formattedValue": f"Review {row_index}", "hyperlink": f"https://anilist.co/anime/{rng.randint(1, 180000)}/"})
+			else:
+				values.append({"formattedValue": rng.choice(("PASSED", "PENDING", "FAILED", f"{rng.randint(0, 10)}/10", f"user_{row_index}_{column_index}"))})
+		raw_rows.append({"values": values})
+
+	return json.dumps({"sheets": [{"properties": {"title": "Synthetic"}, "data": [{"rowData": raw_rows}]}]}).encode()
+
+
+def count_cells(payload: bytes) -> int:
+	data = json.loads(payload)
+	return sum(len(row.get("values", ())) for sheet in data["sheets"] for block in sheet["data"] for row in block.get("rowData", ()))
+
+
+def load_payloads(recordings: str | None) -> dict[str, tuple[bytes, list[str] | str]]:
+	"""Synthetic payloads of increasing size, plus any recorded sheets."""
+	payloads: dict[str, tuple[bytes, list[str] | str]] = {f"synthetic_{rows}": (synthetic_payload(rows), "Synthetic!A1:T") for rows in PAYLOAD_SIZES}
+	if recordings and Path(recordings).is_dir():
+		for path in sorted(Path(recordings).glob("*.json")):
+			payload = path.read_bytes()
+			ranges = [sheet["properties"]["title"] for sheet in json.loads(payload)["sheets"]]
+			payloads[f"recorded_{path.stem[:8]}"] = (payload, ranges)
+	return payloads
+
+
+def best_time(func: Callable[[], Any], *, repeat: int, number: int = 1) -> float:
+	"""Fastest of `repeat` runs, the least noisy number for comparing against a baseline."""
+	best = float("inf")
+	for _ in range(repeat):
+		start = time.perf_counter()
+		for _ in range(number):
+			func()
+		best = min(best, (time.perf_counter() - start) / number)
+	return best
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+	tracemalloc.start()
+	try:
+		result = func()
+		_, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+	del result
+	return peak
+
+
+def bench_parse(payloads: dict[str, tuple[bytes, list[str] | str]], *, repeat: int) -> dict[str, dict[str, float]]:
+	results = {}
+	for name, (payload, ranges) in payloads.items():
+		cells = count_cells(payload)
+		elapsed = best_time(lambda: parse_sheets("benchmark", ranges, payload), repeat=repeat)
+		results[name] = {
+			"cells": cells,
+			"seconds": elapsed,
+			"cells_per_second": cells / elapsed,
+			"peak_memory": peak_memory(lambda: parse_sheets("benchmark", ranges, payload)),
+		}
+	return results
+
+
+def bench_accessors(*, repeat: int) -> dict[str, float]:
+	"""Nanoseconds per call of the accessors the sheet handlers call for every row."""
+	row = Row(
+		cells=[
+			Cell(value="PASSED"),
+			Cell(value="some_user"),
+			None,
+			Cell(value="Review", hyperlink="https://anilist.co/anime/1/"),
+			Cell(value="see https://myanimelist.net/anime/1/ for details"),
+			Cell(value=None),
+		]
+	)
+	cases: dict[str, Callable[[], Any]] = {
+		"row.get_value": lambda: row.get_value(1, ""),
+		"row.get_value_column": lambda: row.get_value("B", ""),
+		"row.get_value_missing": lambda: row.get_value(40, ""),
+		"row.get_url_hyperlink": lambda: row.get_url(3),
+		"row.get_url_search": lambda: row.get_url(4),
+		"column_to_index": lambda: column_to_index("AC"),
+		"cell_to_indices": lambda: cell_to_indices("AB123"),
+	}
+	return {name: best_time(case, repeat=repeat, number=ACCESSOR_CALLS) * 1e9 for name, case in cases.items()}
+
+
+def check_regressions(baseline: dict, current: dict, *, threshold: float, memory_threshold: float) -> list[str]:
+	"""Messages for every measurement that got worse than the thresholds allow, compared to the baseline."""
+	failures = []
+	for name, result in current["parse"].items():
+		base = baseline.get("parse", {}).get(name)
+		if base is None:
+			continue
+
+		if result["cells_per_second"] < base["cells_per_second"] * (1 - threshold):
+			failures.append(f"parse {name}: {result['cells_per_second']:,.0f} cells/s, baseline {base['cells_per_second']:,.0f} cells/s")
+		if result["peak_memory"] > base["peak_memory"] * (1 + memory_threshold):
+			failures.append(f"parse {name}: peak {result['peak_memory'] / 1024:,.0f} KiB, baseline {base['peak_memory'] / 1024:,.0f} KiB")
+
+	for name, nanoseconds in current["accessors"].items():
+		base = baseline.get("accessors", {}).get(name)
+		if base is not None and nanoseconds > base * (1 + threshold):
+			failures.append(f"{name}: {nanoseconds:.0f}ns, baseline {base:.0f}ns")
+
+	return failures
+
+
+def main(*, repeat: int, recordings: str | None, baseline_path: str, save_baseline: bool, check: bool, threshold: float, memory_threshold: float) -> int:
+	current = {
+		"commit": git_commit(),
+		"parse": bench_parse(load_payloads(recordings), repeat=repeat),
+		"accessors": bench_accessors(repeat=repeat),
+	}
+
+	print(f"{'payload':<22}{'cells':>9}{'time':>11}{'cells/s':>13}{'peak':>11}")
+	for name, result in current["parse"].items():
+		print(
+			f"{name:<22}{result['cells']:>9}{result['seconds'] * 1000:>9.2f}ms{result['cells_per_second']:>13,.0f}{result['peak_memory'] / 1024:>8,.0f}KiB"
+		)
+	print()
+	for name, nanoseconds in current["accessors"].items():
+		print(f"{name:<26}{nanoseconds:>8.0f}ns")
+
+	if save_baseline:
+		Path(baseline_path).parent.mkdir(parents=True, exist_ok=True)
+		with open(baseline_path, "w", encoding="utf-8") as f:
+			json.dump(current, f, indent="\t")
+		print(f"\nBaseline saved to {baseline_path}")
+
+	if check:
+		if not Path(baseline_path).exists():
+			print(f"\nNo baseline at {baseline_path}, run with --save-baseline first")
+			return 2
+
+		with open(baseline_path, encoding="utf-8") as f:
+			baseline = json.load(f)
+
+		failures = check_regressions(baseline, current, threshold=threshold, memory_threshold=memory_threshold)
+		if failures:
+			print(f"\nRegressed against the baseline from {baseline.get('commit') or 'unknown commit'}:")
+			print("\n".join(f"- {failure}" for failure in failures))
+			return 1
+
+		print("\nNo regressions against the baseline.")
+
+	return 0
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Sheet parsing throughput, memory and accessor microbenchmarks")
+	parser.add_argument("--repeat", type=int, default=7)
+	parser.add_argument("--recordings", default=RECORDINGS_DIRECTORY, help="also parse recorded sheets found here")
+	parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+	parser.add_argument("--save-baseline", action="store_true")
+	parser.add_argument("--check", action="store_true", help="exit with 1 when slower or bigger than the baseline allows")
+	parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.15 is 15%%")
+	parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD)
+	args = parser.parse_args()
+
+	sys.exit(
+		main(
+			repeat=args.repeat,
+			recordings=args.recordings,
+			baseline_path=args.baseline,
+			save_baseline=args.save_baseline,
+			check=args.check,
+			threshold=args.threshold,
+			memory_threshold=args.memory_threshold,
+		)
+	)
@@ -19,3 +19,13 @@ CONTRIBUTOR_IDS = (961063229168164864,)
 REPOSITORY_URL = "https://github.com/TrhRichard/Natsumin"
 
 DISABLED_EXTENSIONS = ()
+
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_ROTATE_WHEN: str | None = None  # TimedRotatingFileHandler interval like "midnight", size based rotation when None
+LOG_COMPRESS = True
+
+QUERY_PROFILING = os.getenv("QUERY_PROFILING", "").lower() in ("1", "true", "yes")  # can also be toggled with the owner profiler command
+DATABASE_PRAGMA_PROFILE = os.getenv("DATABASE_PRAGMA_PROFILE", "balanced")  # one of internal.database.pragmas.PRAGMA_PROFILES
+DATABASE_MAINTENANCE_MINUTES = 60  # optimize, incremental vacuum and WAL checkpoint of the database
+METRICS_PORT: int | None = int(os.getenv("METRICS_PORT")) if os.getenv("METRICS_PORT") else None  # prometheus endpoint on localhost, off when unset
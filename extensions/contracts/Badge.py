@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from internal.checks import whitelist_channel_only, can_modify_badges
 from internal.base.paginator import CustomPaginator, V2Paginator, V2Page
+from internal.contracts.loaders import load_user_badge_leaderboard, load_badge_leaderboard
 from internal.contracts import usernames_autocomplete
 from internal.base.cog import NatsuminCog
 from typing import TYPE_CHECKING, Literal
@@ -16,6 +17,8 @@ from uuid import uuid4
 if TYPE_CHECKING:
 	from internal.base.bot import NatsuminBot
 
+	import aiosqlite
+
 import datetime
 import discord
 
@@ -25,19 +28,7 @@ BADGE_RARITIES = ["common", "uncommon", "rare", "epic", "legendary", "limited"]
 
 async def badge_autocomplete(ctx: discord.AutocompleteContext) -> list[discord.OptionChoice]:
 	bot: NatsuminBot = ctx.bot
-	async with bot.database.connect() as conn:
-		query = """
-			SELECT
-				id, name, type
-			FROM badge
-			WHERE id = ?1 OR name LIKE ?1
-			ORDER BY type, created_at DESC, name
-			LIMIT 25
-		"""
-		async with conn.execute(query, (f"%{ctx.value.strip()}%",)) as cursor:
-			badge_list = [discord.OptionChoice(name=f"{row['name']} ({row['type']})", value=row["id"]) for row in await cursor.fetchall()]
-
-	return badge_list
+	return bot.autocomplete.search_badges(ctx.value)
 
 
 async def get_badge_members_callback(badge_data: BadgeData, interaction: discord.Interaction):
@@ -156,7 +147,7 @@ class BadgeCog(NatsuminCog):
 		rarity: str | None = None,
 		hidden: bool = False,
 	) -> tuple[str | V2Paginator, bool]:
-		async with self.bot.database.connect() as conn:
+		async with self.bot.database.read() as conn:
 			select_list: list[str] = ["b.*"]
 			where_conditions: list[str] = []
 			where_params = []
@@ -359,61 +350,34 @@ class BadgeCog(NatsuminCog):
 	async def badge_leaderboard_handler(
 		self, invoker: discord.abc.User, leaderboard_type: Literal["badges", "users"], hidden: bool
 	) -> tuple[CustomPaginator, bool]:
-		async with self.bot.database.connect() as conn:
+		async with self.bot.database.read() as conn:
 			if leaderboard_type == "users":
-				query = """
-						SELECT
-							u.username,
-							u.discord_id,
-							COUNT(ub.badge_id) AS badge_count
-						FROM user u
-						JOIN user_badge ub ON 
-							ub.user_id = u.id
-						GROUP BY u.id, u.username
-						ORDER BY badge_count DESC, u.username ASC
-					"""
-
-				async with conn.execute(query) as cursor:
-					user_rows: list[tuple[str, int, int]] = [
-						(row["username"], row["discord_id"], row["badge_count"]) for row in await cursor.fetchall()
-					]
-
-					all_pages = []
-					for start in range(0, len(user_rows), 15):
-						lines = []
-						for i, (username, discord_id, badge_count) in enumerate(user_rows[start : start + 15], start=start):
-							full_name = f"<@{discord_id}> ({username})" if discord_id else username
-							line_to_add = f"{i + 1}. {full_name}: **{badge_count}**"
-
-							lines.append(line_to_add)
-
-						embed = discord.Embed(title="Users leaderboard", description="\n".join(lines), color=COLORS.DEFAULT)
-						all_pages.append(embed)
+				user_rows = await load_user_badge_leaderboard(conn)
+
+				all_pages = []
+				for start in range(0, len(user_rows), 15):
+					lines = []
+					for i, (username, discord_id, badge_count) in enumerate(user_rows[start : start + 15], start=start):
+						full_name = f"<@{discord_id}> ({username})" if discord_id else username
+						line_to_add = f"{i + 1}. {full_name}: **{badge_count}**"
+
+						lines.append(line_to_add)
+
+					embed = discord.Embed(title="Users leaderboard", description="\n".join(lines), color=COLORS.DEFAULT)
+					all_pages.append(embed)
 			else:
-				query = """
-						SELECT
-							b.name,
-							COUNT(ub.user_id) AS user_count
-						FROM badge b
-						LEFT JOIN user_badge ub
-							ON ub.badge_id = b.id
-						GROUP BY b.id, b.name
-						ORDER BY user_count DESC, b.created_at DESC, b.name ASC
-					"""
-
-				async with conn.execute(query) as cursor:
-					badge_rows: list[tuple[str, int]] = [(row["name"], row["user_count"]) for row in await cursor.fetchall()]
-
-					all_pages = []
-					for start in range(0, len(badge_rows), 15):
-						lines = []
-						for i, (badge_name, user_count) in enumerate(badge_rows[start : start + 15], start=start):
-							line_to_add = f"{i + 1}. {badge_name}: **{user_count}**"
-
-							lines.append(line_to_add)
-
-						embed = discord.Embed(title="Badges leaderboard", description="\n".join(lines), color=COLORS.DEFAULT)
-						all_pages.append(embed)
+				badge_rows = await load_badge_leaderboard(conn)
+
+				all_pages = []
+				for start in range(0, len(badge_rows), 15):
+					lines = []
+					for i, (badge_name, user_count) in enumerate(badge_rows[start : start + 15], start=start):
+						line_to_add = f"{i + 1}. {badge_name}: **{user_count}**"
+
+						lines.append(line_to_add)
+
+					embed = discord.Embed(title="Badges leaderboard", description="\n".join(lines), color=COLORS.DEFAULT)
+					all_pages.append(embed)
 
 			return CustomPaginator(all_pages), hidden
 
@@ -482,19 +446,19 @@ class BadgeCog(NatsuminCog):
 			if user_id is None:
 				return await ctx.respond("User not found!", ephemeral=True)
 
+		async def toggle_display_type(conn: aiosqlite.Connection) -> tuple[str, str]:
 			async with conn.execute("SELECT badge_display_type FROM user_config WHERE user_id = ?", (user_id,)) as cursor:
 				row = await cursor.fetchone()
-				if row is None:
-					async with conn.execute("INSERT INTO user_config (user_id) VALUES (?) RETURNING badge_display_type", (user_id,)) as cursor:
-						row = await cursor.fetchone()
-					await conn.commit()
+			if row is None:
+				async with conn.execute("INSERT INTO user_config (user_id) VALUES (?) RETURNING badge_display_type", (user_id,)) as cursor:
+					row = await cursor.fetchone()
 
-				badge_display_type: Literal["one", "list"] = row["badge_display_type"]
-				badge_display_type = "list" if badge_display_type == "one" else "one"
+			badge_display_type: Literal["one", "list"] = "list" if row["badge_display_type"] == "one" else "one"
+			await conn.execute("UPDATE user_config SET badge_display_type = ? WHERE user_id = ?", (badge_display_type, user_id))
+			return row["badge_display_type"], badge_display_type
 
-				await conn.execute("UPDATE user_config SET badge_display_type = ? WHERE user_id = ?", (badge_display_type, user_id))
-				await conn.commit()
-				await ctx.respond(f"Changed badge display type from `{row['badge_display_type']}` to `{badge_display_type}`!", ephemeral=True)
+		previous_display_type, badge_display_type = await self.bot.database.write(toggle_display_type)
+		await ctx.respond(f"Changed badge display type from `{previous_display_type}` to `{badge_display_type}`!", ephemeral=True)
 
 	@commands.group("badge", help="Badges related commands", aliases=["b", "badges"], invoke_without_command=True)
 	async def badge_textgroup(self, ctx: commands.Context, user: str | int = None):
@@ -553,22 +517,21 @@ class BadgeCog(NatsuminCog):
 		if badge_type not in BADGE_TYPES:
 			return await ctx.respond(f"Type must be set to one of the following: {frmt_iter(BADGE_TYPES, final='or')}")
 
-		async with self.bot.database.connect() as conn:
-			badge_id = uuid4()
-			await conn.execute(
-				"INSERT INTO badge (id, name, description, artist, url, type, created_at, rarity) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-				(
-					str(badge_id),
-					name,
-					description if description is not None else "",
-					artist if artist is not None else "",
-					image_url if image_url is not None else "",
-					badge_type,
-					datetime.datetime.now(datetime.UTC).isoformat(" "),
-					rarity,
-				),
-			)
-			await conn.commit()
+		badge_id = uuid4()
+		await self.bot.database.execute_write(
+			"INSERT INTO badge (id, name, description, artist, url, type, created_at, rarity) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+			(
+				str(badge_id),
+				name,
+				description if description is not None else "",
+				artist if artist is not None else "",
+				image_url if image_url is not None else "",
+				badge_type,
+				datetime.datetime.now(datetime.UTC).isoformat(" "),
+				rarity,
+			),
+		)
+		await self.bot.autocomplete.rebuild_badges()
 
 		await ctx.respond(f"Created badge **{name}** ({badge_id})", ephemeral=True)
 
@@ -604,38 +567,43 @@ class BadgeCog(NatsuminCog):
 					return await ctx.respond("Badge not found!", ephemeral=True)
 
 			modifications_done: list[str] = []
+			changes: dict[str, str] = {}
 
 			if name is not None:
-				await conn.execute("UPDATE badge SET name = ? WHERE id = ?", (name, id))
+				changes["name"] = name
 				modifications_done.append(f"Changed name to **{name}**")
 
 			if description is not None:
-				await conn.execute("UPDATE badge SET description = ? WHERE id = ?", (description, id))
+				changes["description"] = description
 				modifications_done.append(f"Changed description to **{description}**")
 
 			if artist is not None:
-				await conn.execute("UPDATE badge SET artist = ? WHERE id = ?", (artist, id))
+				changes["artist"] = artist
 				modifications_done.append(f"Changed artist to **{artist}**")
 
 			if image_url is not None:
-				await conn.execute("UPDATE badge SET url = ? WHERE id = ?", (image_url, id))
+				changes["url"] = image_url
 				modifications_done.append(f"Changed url to **{image_url}**")
 
 			if badge_type is not None:
-				await conn.execute("UPDATE badge SET type = ? WHERE id = ?", (badge_type, id))
+				changes["type"] = badge_type
 				modifications_done.append(f"Changed type to **{badge_type}**")
 
 			if rarity is not None:
 				if rarity not in BADGE_RARITIES:
 					modifications_done.append(f"Attempted to set rarity to a unknown one: **{rarity}**, no changes were made.")
 				else:
-					await conn.execute("UPDATE badge SET rarity = ? WHERE id = ?", (rarity, id))
+					changes["rarity"] = rarity
 					modifications_done.append(f"Changed rarity to **{rarity}**")
 
 			embed = discord.Embed(title="Modifications", color=COLORS.DEFAULT)
 			embed.set_footer(text=f"ID: {badge_row['id']}")
 			if modifications_done:
-				await conn.commit()
+				if changes:
+					await self.bot.database.execute_write(
+						f"UPDATE badge SET {', '.join(f'{column} = ?' for column in changes)} WHERE id = ?", (*changes.values(), id)
+					)
+					await self.bot.autocomplete.rebuild_badges(db_conn=conn)
 				embed.description = "\n".join(f"- {m}" for m in modifications_done)
 			else:
 				embed.description = "No modifications done."
@@ -652,10 +620,12 @@ class BadgeCog(NatsuminCog):
 				if not badge_exists:
 					return await ctx.respond("Badge not found.", ephemeral=True)
 
-			async with conn.execute("DELETE FROM badge WHERE id = ? RETURNING *", (id,)) as cursor:
-				badge_row = await cursor.fetchone()
+			async def delete_badge(write_conn: aiosqlite.Connection) -> aiosqlite.Row | None:
+				async with write_conn.execute("DELETE FROM badge WHERE id = ? RETURNING *", (id,)) as cursor:
+					return await cursor.fetchone()
 
-			await conn.commit()
+			badge_row = await self.bot.database.write(delete_badge)
+			await self.bot.autocomplete.rebuild_badges(db_conn=conn)
 
 		await ctx.respond(f"Deleted badge **{badge_row['name']}**", ephemeral=True)
 
@@ -722,8 +692,10 @@ class BadgeCog(NatsuminCog):
 					f"Attempted to give badge **{badge_row['name']}** to invalid users: {frmt_iter(invalid_users)}", ephemeral=True
 				)
 
-			await conn.executemany("INSERT INTO user_badge (user_id, badge_id) VALUES (?, ?)", [(user_id, id) for user_id in valid_users])
-			await conn.commit()
+		async def give_badge(write_conn: aiosqlite.Connection):
+			await write_conn.executemany("INSERT INTO user_badge (user_id, badge_id) VALUES (?, ?)", [(user_id, id) for user_id in valid_users])
+
+		await self.bot.database.write(give_badge)
 
 		message = f"Gave **{badge_row['name']}** to **{len(valid_users)}** users!"
 		if already_has_users:
@@ -750,7 +722,6 @@ class BadgeCog(NatsuminCog):
 				if (await cursor.fetchone()) is None:
 					return await ctx.respond(f"{username} doesn't have the badge!", ephemeral=True)
 
-			await conn.execute("DELETE FROM user_badge WHERE user_id = ? AND badge_id = ?", (user_id, id))
-			await conn.commit()
+		await self.bot.database.execute_write("DELETE FROM user_badge WHERE user_id = ? AND badge_id = ?", (user_id, id))
 
 		await ctx.respond(f"Removed **{badge_row['name']}** from {username}!", ephemeral=True)
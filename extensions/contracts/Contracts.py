@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from internal.functions import get_percentage_formatted, get_status_emote, frmt_iter
-from internal.enums import UserKind, UserStatus, ContractStatus, ContractKind
-from internal.contracts import get_deadline_footer, season_autocomplete
-from internal.contracts.order import sort_contract_types
+from internal.enums import UserStatus
+from internal.contracts import get_cached_deadline_footer, season_autocomplete
+from internal.contracts.loaders import load_season_stats
+from internal.contracts.order import EMPTY_ORDER_PLAN, sort_contract_types
 from internal.contracts.rep import get_rep, RepName
 from internal.base.paginator import CustomPaginator
 from internal.checks import whitelist_channel_only
 from internal.base.cog import NatsuminCog
+from internal.cache import RenderedView
 from internal.constants import COLORS
 from typing import TYPE_CHECKING
 from discord.ext import commands
@@ -22,17 +24,7 @@ if TYPE_CHECKING:
 
 async def reps_autocomplete(ctx: discord.AutocompleteContext) -> list[discord.OptionChoice | str]:
 	bot: NatsuminBot = ctx.bot
-	async with bot.database.connect() as conn:
-		active_season = await bot.get_config("contracts.active_season", db_conn=conn)
-		if active_season is None:
-			return []
-
-		async with conn.execute(
-			"SELECT DISTINCT(rep) as rep FROM season_user WHERE season_id = ? AND rep LIKE ? LIMIT 25", (active_season, f"%{ctx.value.strip()}%")
-		) as cursor:
-			reps_list = [row["rep"] for row in await cursor.fetchall()]
-
-	return reps_list
+	return bot.autocomplete.search_reps(ctx.value)
 
 
 class StatsFlags(commands.FlagConverter, delimiter=" ", prefix="-"):
@@ -68,103 +60,60 @@ class StatsView(ui.DesignerView):
 	async def create(cls, bot: NatsuminBot, invoker: discord.abc.User, season_id: str, rep: RepName | None = None):
 		self = cls(bot, invoker, season_id, rep)
 
-		async with bot.database.connect() as conn:
-			async with conn.execute("SELECT name FROM season WHERE id = ?", (season_id,)) as cursor:
-				row = await cursor.fetchone()
-				season_name = row["name"]
-
-			query = f"""
-				SELECT
-					SUM(su.kind = ?3 AND su.status = ?2) AS normal_passed,
-					SUM(su.kind = ?3) AS normal_total
-				FROM season_user su
-				WHERE su.season_id = ?1 {"AND su.rep = ?4" if rep else ""}
-			"""
-
-			params = [season_id, UserStatus.PASSED.value, UserKind.NORMAL.value]
-			if rep:
-				params.append(rep.value)
-			async with conn.execute(query, params) as cursor:
-				row = await cursor.fetchone()
-				normal_users_count: tuple[int, int] = (row["normal_passed"], row["normal_total"])
+		rendered: RenderedView = await bot.render_cache.get_or_render(
+			("stats", season_id, rep.value if rep else None, bot.database.get_data_version(season_id)), lambda: cls.render(bot, season_id, rep)
+		)
+		stats_text, categories_text = rendered.body
+
+		self.add_item(
+			ui.Container(
+				ui.TextDisplay(rendered.header),
+				ui.TextDisplay(stats_text),
+				ui.Separator(),
+				ui.TextDisplay(categories_text),
+				ui.TextDisplay(f"-# <:Kirburger:998705274074435584> {await get_cached_deadline_footer(bot, season_id)}"),
+				color=COLORS.DEFAULT,
+			)
+		)
 
-			query = f"""
-				SELECT
-					SUM(sc.kind = ?3 AND sc.status = ?2) AS normal_passed,
-					SUM(sc.kind = ?3) AS normal_total,
-					SUM(sc.kind = ?4 AND sc.status = ?2) AS aid_passed,
-					SUM(sc.kind = ?4) AS aid_total
-				FROM season_contract sc
-				JOIN season_user su ON 
-					su.user_id = sc.contractee_id AND su.season_id = sc.season_id
-				WHERE 
-					sc.season_id = ?1 
-					AND sc.optional = 0 
-					{"AND su.rep = ?5" if rep else ""}
-			"""
-			params = [season_id, ContractStatus.PASSED.value, ContractKind.NORMAL.value, ContractKind.AID.value]
-			if rep:
-				params.append(rep.value)
-			async with conn.execute(query, params) as cursor:
-				row = await cursor.fetchone()
-				normal_contracts_count: tuple[int, int] = (row["normal_passed"], row["normal_total"])
-				aid_contracts_count: tuple[int, int] = (row["aid_passed"], row["aid_total"])
+		return self
 
-			query = f"""
-				SELECT
-					sc.type,
-					SUM(sc.status = ?2) AS passed,
-					COUNT(*) AS total
-				FROM season_contract sc
-				{"JOIN season_user su ON su.user_id = sc.contractee_id AND su.season_id = sc.season_id" if rep else ""}
-				WHERE sc.season_id = ?1 {"AND su.rep = ?3" if rep else ""}
-				GROUP BY sc.type
-			"""
-			params = [season_id, ContractStatus.PASSED]
-			if rep:
-				params.append(rep.value)
-			async with conn.execute(query, params) as cursor:
-				type_completions: dict[str, tuple[int, int]] = {row["type"]: (row["passed"], row["total"]) for row in await cursor.fetchall()}
-
-			stats_display = ui.TextDisplay(
-				f"**Users passed**: {get_percentage_formatted(normal_users_count[0], normal_users_count[1])}\n"
-				f"**Contracts passed**: {get_percentage_formatted(normal_contracts_count[0], normal_contracts_count[1])}\n"
-				+ (
-					f"**Aid Contracts passed**: {get_percentage_formatted(aid_contracts_count[0], aid_contracts_count[1])}"
-					if aid_contracts_count[1] > 0
-					else ""
-				)
+	@staticmethod
+	async def render(bot: NatsuminBot, season_id: str, rep: RepName | None = None) -> RenderedView:
+		async with bot.database.snapshot() as conn:
+			stats = await load_season_stats(conn, season_id, rep.value if rep else None)
+
+		stats_text = (
+			f"**Users passed**: {get_percentage_formatted(stats.users[0], stats.users[1])}\n"
+			f"**Contracts passed**: {get_percentage_formatted(stats.contracts[0], stats.contracts[1])}\n"
+			+ (
+				f"**Aid Contracts passed**: {get_percentage_formatted(stats.aid_contracts[0], stats.aid_contracts[1])}"
+				if stats.aid_contracts[1] > 0
+				else ""
 			)
+		)
 
-			season_order_data = self.bot.season_orders.get(self.season_id, [])
-
-			category_texts: list[str] = []
-			for category in sort_contract_types(type_completions.keys(), season_order_data):
-				passed = 0
-				total = 0
-				type_texts: list[str] = []
+		season_order_data = bot.season_orders.get(season_id, EMPTY_ORDER_PLAN)
 
-				for cat_type in category["types"]:
-					type_status = type_completions.get(cat_type, (0, 0))
-					passed += type_status[0]
-					total += type_status[1]
+		category_texts: list[str] = []
+		for category in sort_contract_types(stats.type_completions.keys(), season_order_data):
+			passed = 0
+			total = 0
+			type_texts: list[str] = []
 
-					type_texts.append(f"> **{cat_type}**: {get_percentage_formatted(type_status[0], type_status[1])}")
+			for cat_type in category["types"]:
+				type_status = stats.type_completions.get(cat_type, (0, 0))
+				passed += type_status[0]
+				total += type_status[1]
 
-				category_texts.append(f"### {category['name']} ({passed}/{total})\n{'\n'.join(type_texts)}")
+				type_texts.append(f"> **{cat_type}**: {get_percentage_formatted(type_status[0], type_status[1])}")
 
-			self.add_item(
-				ui.Container(
-					ui.TextDisplay(f"## {rep.value} - {season_name}" if rep is not None else f"## Contracts {season_name}"),
-					stats_display,
-					ui.Separator(),
-					ui.TextDisplay("\n".join(category_texts)),
-					ui.TextDisplay(f"-# <:Kirburger:998705274074435584> {await get_deadline_footer(bot.database, season_id, db_conn=conn)}"),
-					color=COLORS.DEFAULT,
-				)
-			)
+			category_texts.append(f"### {category['name']} ({passed}/{total})\n{'\n'.join(type_texts)}")
 
-		return self
+		return RenderedView(
+			header=f"## {rep.value} - {stats.season_name}" if rep is not None else f"## Contracts {stats.season_name}",
+			body=(stats_text, "\n".join(category_texts)),
+		)
 
 	async def on_timeout(self):
 		try:
@@ -275,7 +224,7 @@ class ContractsCog(NatsuminCog):
 				user_statuses.append(VALID_USER_STATUSES.get(status_str))
 
 		rep = flags.rep
-		async with self.bot.database.connect() as conn:
+		async with self.bot.database.read() as conn:
 			if flags.season is None:
 				season_id = await self.bot.get_config("contracts.active_season", db_conn=conn)
 			else:
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from internal.functions import get_legacy_rank, get_rank_emoteid, get_status_emote, get_status_name, frmt_iter
-from internal.contracts import get_deadline_footer, season_autocomplete, usernames_autocomplete
-from internal.contracts.order import OrderContractData, sort_contract_types
+from internal.contracts.loaders import format_deadline_footer, load_season_profile, load_fantasy_profile, load_season_contracts, load_contract_info
+from internal.contracts import season_autocomplete, usernames_autocomplete, get_cached_deadline_footer, prime_deadline_cache
+from internal.contracts.order import EMPTY_ORDER_PLAN, OrderContractData, sort_contract_types
 from internal.enums import UserKind, UserStatus, ContractStatus
 from internal.checks import whitelist_channel_only
 from internal.base.view import BadgeDisplay
 from typing import TYPE_CHECKING, Literal
 from internal.base.cog import NatsuminCog
+from internal.cache import RenderedView
 from internal.schemas import BadgeData
 from internal.constants import COLORS
 from discord.ext import commands
@@ -23,44 +25,12 @@ FANTASY_SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1IRg3plGydWluh
 
 async def fantasy_usernames_autocomplete(ctx: discord.AutocompleteContext) -> list[str]:
 	bot: NatsuminBot = ctx.bot
-	async with bot.database.connect() as conn:
-		season_id = await bot.get_config("contracts.active_season", db_conn=conn)
-
-		query = """
-		SELECT u.username
-		FROM season_user_fantasy suf
-		JOIN user u ON u.id = suf.user_id
-		WHERE 
-			suf.season_id = ?
-			AND u.username LIKE ?
-		LIMIT 25
-		"""
-
-		async with conn.execute(query, (season_id, f"%{ctx.value.strip()}%")) as cursor:
-			username_list: list[str] = [row["username"] for row in await cursor.fetchall()]
-
-	return username_list
+	return bot.autocomplete.search_fantasy_usernames(ctx.value)
 
 
 async def contract_type_autocomplete(ctx: discord.AutocompleteContext) -> list[str]:
 	bot: NatsuminBot = ctx.bot
-	async with bot.database.connect() as conn:
-		season_id = await bot.get_config("contracts.active_season", db_conn=conn)
-
-		query = """
-		SELECT DISTINCT type
-		FROM season_contract
-		WHERE 
-			season_id = ?
-			AND type LIKE ?
-		ORDER BY type DESC
-		LIMIT 25
-		"""
-
-		async with conn.execute(query, (season_id, f"%{ctx.value.strip()}%")) as cursor:
-			type_list: list[str] = [row["type"] for row in await cursor.fetchall()]
-
-	return type_list
+	return bot.autocomplete.search_contract_types(ctx.value)
 
 
 class MasterUserProfile(ui.DesignerView):
@@ -85,7 +55,7 @@ class MasterUserProfile(ui.DesignerView):
 
 				return self
 
-			_, discord_user = await bot.fetch_user_from_database(user_id, db_conn=conn)
+			discord_user = await bot.resolver.resolve(user_row["discord_id"]) if user_row["discord_id"] else None
 
 			legacy_rank = get_legacy_rank(user_row["exp"])
 			username = f"<@{discord_user.id}>" if discord_user else user_row["username"]
@@ -163,89 +133,84 @@ class SeasonUserProfile(ui.DesignerView):
 	async def create(cls, bot: NatsuminBot, invoker: discord.abc.User, season_id: str, user_id: str):
 		self = cls(bot, invoker, season_id, user_id)
 
-		async with bot.database.connect() as conn:
-			async with conn.execute(
-				"SELECT u.username, u.discord_id, su.* FROM season_user su JOIN user u ON su.user_id = u.id WHERE su.season_id = ? AND su.user_id = ?",
-				(season_id, user_id),
-			) as cursor:
-				user_row = await cursor.fetchone()
-
-			if user_row is None:
-				self.add_item(ui.TextDisplay("User data not found!"))
-
-				return self
+		rendered: RenderedView = await bot.render_cache.get_or_render(
+			("season_profile", season_id, user_id, bot.database.get_data_version(season_id)), lambda: cls.render(bot, season_id, user_id)
+		)
 
-			if user_row["contractor_id"]:
-				async with conn.execute("SELECT username FROM user WHERE id = ?", (user_row["contractor_id"],)) as cursor:
-					row = await cursor.fetchone()
-					contractor_username: str | None = row["username"]
+		if rendered.not_found:
+			self.add_item(ui.TextDisplay(rendered.not_found))
 
-			_, discord_user = await bot.fetch_user_from_database(user_id, db_conn=conn)
+			return self
 
-			username = f"<@{discord_user.id}>" if discord_user else user_row["username"]
-			user_description = f"- **Status**: {get_status_name(UserStatus(user_row['status']))} {get_status_emote(UserStatus(user_row['status']))}\n"
-
-			if user_row["kind"] == UserKind.NORMAL:
-				user_description += f"- **Rep**: {user_row['rep'] or 'Unknown'}\n"
-				user_description += f"- **Contractor**: {contractor_username or 'None'}\n"
-
-				query = """
-					SELECT 
-						u.username
-					FROM season_user su 
-					JOIN user u ON su.user_id = u.id 
-					WHERE 
-						su.season_id = ? 
-						AND su.contractor_id = ? 
-					ORDER BY u.username
-				"""
-				async with conn.execute(query, (season_id, user_id)) as cursor:
-					contractees = tuple(row["username"] for row in await cursor.fetchall())
-
-				if contractees:
-					user_description += f"- **Contractee{'s' if len(contractees) > 1 else ''}**: {frmt_iter(contractees)}\n"
-
-				user_description += f"- **List**: {user_row['list_url'] or 'N/A'}\n"
-				user_description += f"- **Preferences**: {(user_row['preferences'] or 'N/A').replace('\n', ', ')}\n"
-				user_description += f"- **Bans**: {(user_row['bans'] or 'N/A').replace('\n', ', ')}\n"
-				user_description += (
-					f"- **Accepting**: LN={'Yes' if user_row['accepting_ln'] else 'No'} - MANHWA={'Yes' if user_row['accepting_manhwa'] else 'No'}\n"
-				)
-				user_description += f"- **Veto used**: {'Yes' if user_row['veto_used'] else 'No'}\n"
-			else:
-				user_description += "-# Information limited for people that joined this season for aids."
+		buttons = ui.ActionRow(
+			ui.Button(
+				style=discord.ButtonStyle.secondary,
+				label="Get Contractor",
+				disabled="no_contractor" in rendered.flags,
+				custom_id="get_contractor_profile",
+			),
+			ui.Button(style=discord.ButtonStyle.secondary, label="Get Contractee", custom_id="get_contractee_profile"),
+			ui.Button(style=discord.ButtonStyle.secondary, label="Check Contracts", custom_id="get_contracts"),
+		)
 
-			header_content = f"## {username}'s Profile\n{user_description}"
+		for button in buttons.children:
+			button.callback = self.button_callback
 
-			buttons = ui.ActionRow(
-				ui.Button(
-					style=discord.ButtonStyle.secondary,
-					label="Get Contractor",
-					disabled=user_row["contractor_id"] is None,
-					custom_id="get_contractor_profile",
+		self.add_item(
+			ui.Container(
+				(
+					ui.Section(ui.TextDisplay(rendered.header), accessory=ui.Thumbnail(rendered.thumbnail_url))
+					if rendered.thumbnail_url
+					else ui.TextDisplay(rendered.header)
 				),
-				ui.Button(style=discord.ButtonStyle.secondary, label="Get Contractee", custom_id="get_contractee_profile"),
-				ui.Button(style=discord.ButtonStyle.secondary, label="Check Contracts", custom_id="get_contracts"),
+				ui.Separator(),
+				buttons,
+				ui.TextDisplay(f"-# <:Kirburger:998705274074435584> {await get_cached_deadline_footer(bot, season_id)}"),
+				color=COLORS.DEFAULT,
 			)
+		)
 
-			for button in buttons.children:
-				button.callback = self.button_callback
+		return self
 
-			self.add_item(
-				ui.Container(
-					(
-						ui.Section(ui.TextDisplay(header_content), accessory=ui.Thumbnail(discord_user.display_avatar.url))
-						if discord_user and discord_user.display_avatar
-						else ui.TextDisplay(header_content)
-					),
-					ui.Separator(),
-					buttons,
-					ui.TextDisplay(f"-# <:Kirburger:998705274074435584> {await get_deadline_footer(self.bot.database, season_id, db_conn=conn)}"),
-					color=COLORS.DEFAULT,
-				)
+	@staticmethod
+	async def render(bot: NatsuminBot, season_id: str, user_id: str) -> RenderedView:
+		async with bot.database.snapshot() as conn:
+			profile = await load_season_profile(conn, season_id, user_id)
+
+		if profile is None:
+			return RenderedView(not_found="User data not found!")
+
+		prime_deadline_cache(bot, profile.deadline)
+
+		user_row = profile.user
+		discord_user = await bot.resolver.resolve(user_row["discord_id"]) if user_row["discord_id"] else None
+
+		username = f"<@{discord_user.id}>" if discord_user else user_row["username"]
+		user_description = f"- **Status**: {get_status_name(UserStatus(user_row['status']))} {get_status_emote(UserStatus(user_row['status']))}\n"
+
+		if user_row["kind"] == UserKind.NORMAL:
+			user_description += f"- **Rep**: {user_row['rep'] or 'Unknown'}\n"
+			user_description += f"- **Contractor**: {profile.contractor_username or 'None'}\n"
+
+			contractees = profile.contractees
+			if contractees:
+				user_description += f"- **Contractee{'s' if len(contractees) > 1 else ''}**: {frmt_iter(contractees)}\n"
+
+			user_description += f"- **List**: {user_row['list_url'] or 'N/A'}\n"
+			user_description += f"- **Preferences**: {(user_row['preferences'] or 'N/A').replace('\n', ', ')}\n"
+			user_description += f"- **Bans**: {(user_row['bans'] or 'N/A').replace('\n', ', ')}\n"
+			user_description += (
+				f"- **Accepting**: LN={'Yes' if user_row['accepting_ln'] else 'No'} - MANHWA={'Yes' if user_row['accepting_manhwa'] else 'No'}\n"
 			)
+			user_description += f"- **Veto used**: {'Yes' if user_row['veto_used'] else 'No'}\n"
+		else:
+			user_description += "-# Information limited for people that joined this season for aids."
 
-		return self
+		return RenderedView(
+			header=f"## {username}'s Profile\n{user_description}",
+			thumbnail_url=discord_user.display_avatar.url if discord_user and discord_user.display_avatar else None,
+			flags=frozenset({"no_contractor"}) if user_row["contractor_id"] is None else frozenset(),
+		)
 
 	async def on_timeout(self):
 		try:
@@ -329,90 +294,76 @@ class FantasyUserProfile(ui.DesignerView):
 	async def create(cls, bot: NatsuminBot, invoker: discord.abc.User, season_id: str, user_id: str):
 		self = cls(bot, invoker, season_id, user_id)
 
-		async with bot.database.connect() as conn:
-			async with conn.execute("SELECT * FROM season_user_fantasy WHERE season_id = ? AND user_id = ?", (season_id, user_id)) as cursor:
-				fantasy_row = await cursor.fetchone()
-
-			if fantasy_row is None:
-				self.add_item(ui.TextDisplay("Fantasy data not found!"))
-
-				return self
+		async with bot.database.snapshot() as conn:
+			fantasy = await load_fantasy_profile(conn, season_id, user_id)
 
-			fantasy_row = dict(fantasy_row)
+		if fantasy is None:
+			self.add_item(ui.TextDisplay("Fantasy data not found!"))
 
-			USER_DATA_QUERY = "SELECT u.username, u.discord_id, su.status FROM season_user su JOIN user u ON su.user_id = u.id WHERE su.season_id = ? AND su.user_id = ?"
+			return self
 
-			async with conn.execute(USER_DATA_QUERY, (season_id, user_id)) as cursor:
-				user_row = await cursor.fetchone()
+		user_row = fantasy.user
+		if user_row["status"] is None:
+			self.add_item(ui.TextDisplay("User data not found!"))
 
-			if user_row is None:
-				self.add_item(ui.TextDisplay("User data not found!"))
+			return self
 
-				return self
-
-			if user_row["status"] in (UserStatus.FAILED.value, UserStatus.INCOMPLETE.value):
-				self.add_item(
-					ui.TextDisplay(
-						f"{'You have' if invoker.id == user_row['discord_id'] else 'This user has'} been disqualified due to failing the season."
-					)
+		if user_row["status"] in (UserStatus.FAILED.value, UserStatus.INCOMPLETE.value):
+			self.add_item(
+				ui.TextDisplay(
+					f"{'You have' if invoker.id == user_row['discord_id'] else 'This user has'} been disqualified due to failing the season."
 				)
+			)
 
-				return self
-
-			_, discord_user = await bot.fetch_user_from_database(user_id, db_conn=conn)
+			return self
 
-			username = f"<@{discord_user.id}>" if discord_user else user_row["username"]
+		discord_user = await bot.resolver.resolve(user_row["discord_id"]) if user_row["discord_id"] else None
 
-			user_status = UserStatus(user_row["status"])
-			status_name = get_status_name(user_status)
-			if user_status in (UserStatus.FAILED, UserStatus.INCOMPLETE):
-				status_name = "Disqualified"
+		username = f"<@{discord_user.id}>" if discord_user else user_row["username"]
 
-			user_description = (
-				f"- **Status**: {status_name} {get_status_emote(UserStatus(user_row['status']))}\n"
-				+ f"- **Total Score**: {fantasy_row['total_score']}\n"
-			)
+		user_status = UserStatus(user_row["status"])
+		status_name = get_status_name(user_status)
+		if user_status in (UserStatus.FAILED, UserStatus.INCOMPLETE):
+			status_name = "Disqualified"
 
-			header_content = f"## {username}'s Fantasy Team\n{user_description}"
+		user_description = (
+			f"- **Status**: {status_name} {get_status_emote(UserStatus(user_row['status']))}\n" + f"- **Total Score**: {user_row['total_score']}\n"
+		)
 
-			buttons: list[ui.Button] = [ui.Button(label="Get members contracts", custom_id="get_member_contracts")]
-			body_content: list[str] = []
-			for i in range(1, 6):
-				member_id: str = fantasy_row.get(f"member{i}_id")
-				member_score: int = fantasy_row.get(f"member{i}_score")
+		header_content = f"## {username}'s Fantasy Team\n{user_description}"
 
-				self.member_ids.append(member_id)
+		buttons: list[ui.Button] = [ui.Button(label="Get members contracts", custom_id="get_member_contracts")]
+		body_content: list[str] = []
+		for member in fantasy.members:
+			self.member_ids.append(member.user_id)
 
-				async with conn.execute(USER_DATA_QUERY, (season_id, member_id)) as cursor:
-					member_row = await cursor.fetchone()
-
-				if member_row is None:
-					text_content = f"{i}. User data for member {i} not found."
-				else:
-					member_name = f"<@{member_row['discord_id']}>" if member_row["discord_id"] else member_row["username"]
-					text_content = f"{i}. {member_name} | **Status**: {get_status_name(UserStatus(member_row['status']))} {get_status_emote(UserStatus(member_row['status']))} | **Score**: {member_score}"
+			if member.status is None:
+				text_content = f"{member.slot}. User data for member {member.slot} not found."
+			else:
+				member_name = f"<@{member.discord_id}>" if member.discord_id else member.username
+				text_content = f"{member.slot}. {member_name} | **Status**: {get_status_name(UserStatus(member.status))} {get_status_emote(UserStatus(member.status))} | **Score**: {member.score}"
 
-				body_content.append(text_content)
+			body_content.append(text_content)
 
-			for button in buttons:
-				button.callback = self.button_callback
+		for button in buttons:
+			button.callback = self.button_callback
 
-			header_display = ui.TextDisplay(header_content + f"### Members\n{'\n'.join(body_content)}")
+		header_display = ui.TextDisplay(header_content + f"### Members\n{'\n'.join(body_content)}")
 
-			self.add_item(
-				ui.Container(
-					(
-						ui.Section(header_display, accessory=ui.Thumbnail(discord_user.display_avatar.url))
-						if discord_user and discord_user.display_avatar
-						else header_display
-					),
-					ui.TextDisplay(f"-# More information on the [spreadsheet]({FANTASY_SPREADSHEET_URL})."),
-					ui.Separator(),
-					# ui.ActionRow(*buttons),
-					ui.TextDisplay(f"-# <:Kirburger:998705274074435584> {await get_deadline_footer(self.bot.database, season_id, db_conn=conn)}"),
-					color=COLORS.DEFAULT,
-				)
+		self.add_item(
+			ui.Container(
+				(
+					ui.Section(header_display, accessory=ui.Thumbnail(discord_user.display_avatar.url))
+					if discord_user and discord_user.display_avatar
+					else header_display
+				),
+				ui.TextDisplay(f"-# More information on the [spreadsheet]({FANTASY_SPREADSHEET_URL})."),
+				ui.Separator(),
+				# ui.ActionRow(*buttons),
+				ui.TextDisplay(f"-# <:Kirburger:998705274074435584> {format_deadline_footer(fantasy.deadline)}"),
+				color=COLORS.DEFAULT,
 			)
+		)
 
 		return self
 
@@ -446,87 +397,78 @@ class SeasonContractInfo(ui.DesignerView):
 	async def create(cls, bot: NatsuminBot, invoker: discord.abc.User, season_id: str, user_id: str, contract_type: str):
 		self = cls(bot, invoker, season_id, user_id, contract_type)
 
-		async with bot.database.connect() as conn:
-			async with conn.execute(
-				"SELECT * FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type LIKE ?", (season_id, user_id, contract_type)
-			) as cursor:
-				contract_row = await cursor.fetchone()
+		rendered: RenderedView = await bot.render_cache.get_or_render(
+			("contract_info", season_id, (user_id, contract_type.lower()), bot.database.get_data_version(season_id)),
+			lambda: cls.render(bot, season_id, user_id, contract_type),
+		)
 
-			if contract_row is None:
-				self.add_item(ui.TextDisplay("Contract info not found!"))
+		if rendered.not_found:
+			self.add_item(ui.TextDisplay(rendered.not_found))
 
-				return self
+			return self
 
-			description_fields: list[str] = []
-			description_fields.append(
-				f"- **Status**: {get_status_name(ContractStatus(contract_row['status']), bool(contract_row['optional']))} {get_status_emote(ContractStatus(contract_row['status']), bool(contract_row['optional']))}"
+		self.add_item(
+			ui.Container(
+				(
+					ui.Section(ui.TextDisplay(rendered.header), accessory=ui.Thumbnail(rendered.thumbnail_url))
+					if rendered.thumbnail_url
+					else ui.TextDisplay(rendered.header)
+				),
+				ui.Separator(),
+				ui.TextDisplay(f"-# <:Kirburger:998705274074435584> {await get_cached_deadline_footer(bot, season_id)}"),
+				color=discord.Colour(rendered.color) if rendered.color is not None else COLORS.DEFAULT,
 			)
-			if contract_row["review_url"]:
-				description_fields.append(f"- **Review**: [Review]({contract_row['review_url']})")
-			if contract_row["contractor"]:
-				description_fields.append(f"- **Contractor**: {contract_row['contractor']}")
-			if contract_row["progress"]:
-				description_fields.append(f"- **Progress**: {contract_row['progress']}")
-			if contract_row["rating"]:
-				description_fields.append(f"- **Rating**: {contract_row['rating']}")
-			if contract_row["medium"]:
-				description_fields.append(f"- **Medium**: {contract_row['medium']}")
-
-			container_color = COLORS.DEFAULT
-
-			media_name: str | None = None
-			media_description: str | None = None
-			media_medium: str | None = None
-			media_url: str | None = None
-			media_data: dict[str] = None
-			table_name = None
-			if contract_row["media_type"] == "steam":
-				table_name = "media_steam"
-			elif contract_row["media_type"] == "anilist":
-				table_name = "media_anilist"
-
-			if table_name is not None:
-				async with conn.execute(
-					"SELECT name, description, medium, url FROM media WHERE type = ? AND id = ?",
-					(contract_row["media_type"], contract_row["media_id"]),
-				) as cursor:
-					row = await cursor.fetchone()
-					media_name, media_description, media_medium, media_url = row["name"], row["description"], row["medium"], row["url"]
-
-				async with conn.execute(f"SELECT * FROM {table_name} WHERE id = ?", (contract_row["media_id"],)) as cursor:
-					media_data = dict(await cursor.fetchone())
-
-			if contract_row["media_type"] == "anilist":
-				if media_data["cover_color"]:
-					container_color = discord.Colour(int(f"0x{media_data['cover_color'].lstrip('#')}", 16))
-			if media_name is not None:
-				header_content = (
-					f"## [{media_name} ({media_medium.title()})]({media_url})\n{media_description}" + f"\n{'\n'.join(description_fields)}"
-				)
-			else:
-				header_content = f"## {contract_row['name']}\n" + f"\n{'\n'.join(description_fields)}"
+		)
 
-			if contract_row["media_type"] == "anilist":
-				header_item = (
-					ui.Section(ui.TextDisplay(header_content), accessory=ui.Thumbnail(media_data.get("cover_image")))
-					if not media_data["is_adult"]
-					else ui.TextDisplay(header_content)
-				)
-			elif contract_row["media_type"] == "steam":
-				header_item = ui.Section(ui.TextDisplay(header_content), accessory=ui.Thumbnail(media_data.get("header_image")))
-			else:
-				header_item = ui.TextDisplay(header_content)
+		return self
 
-			self.add_item(
-				ui.Container(
-					header_item,
-					ui.Separator(),
-					ui.TextDisplay(f"-# <:Kirburger:998705274074435584> {await get_deadline_footer(self.bot.database, season_id, db_conn=conn)}"),
-					color=container_color,
-				)
+	@staticmethod
+	async def render(bot: NatsuminBot, season_id: str, user_id: str, contract_type: str) -> RenderedView:
+		async with bot.database.snapshot() as conn:
+			contract_info = await load_contract_info(conn, season_id, user_id, contract_type)
+
+		if contract_info is None:
+			return RenderedView(not_found="Contract info not found!")
+
+		prime_deadline_cache(bot, contract_info.deadline)
+
+		contract_row = contract_info.contract
+		description_fields: list[str] = []
+		description_fields.append(
+			f"- **Status**: {get_status_name(ContractStatus(contract_row['status']), bool(contract_row['optional']))} {get_status_emote(ContractStatus(contract_row['status']), bool(contract_row['optional']))}"
+		)
+		if contract_row["review_url"]:
+			description_fields.append(f"- **Review**: [Review]({contract_row['review_url']})")
+		if contract_row["contractor"]:
+			description_fields.append(f"- **Contractor**: {contract_row['contractor']}")
+		if contract_row["progress"]:
+			description_fields.append(f"- **Progress**: {contract_row['progress']}")
+		if contract_row["rating"]:
+			description_fields.append(f"- **Rating**: {contract_row['rating']}")
+		if contract_row["medium"]:
+			description_fields.append(f"- **Medium**: {contract_row['medium']}")
+
+		container_color: int | None = None
+		thumbnail_url: str | None = None
+		media = contract_info.media
+
+		if media is not None:
+			if contract_row["media_type"] == "anilist" and media["cover_color"]:
+				container_color = int(f"0x{media['cover_color'].lstrip('#')}", 16)
+
+			header_content = (
+				f"## [{media['name']} ({(media['medium'] or '').title()})]({media['url']})\n{media['description']}"
+				+ f"\n{'\n'.join(description_fields)}"
 			)
 
-		return self
+			if contract_row["media_type"] == "anilist" and not media["is_adult"]:
+				thumbnail_url = media["cover_image"]
+			elif contract_row["media_type"] == "steam":
+				thumbnail_url = media["header_image"]
+		else:
+			header_content = f"## {contract_row['name']}\n" + f"\n{'\n'.join(description_fields)}"
+
+		return RenderedView(header=header_content, thumbnail_url=thumbnail_url, color=container_color)
 
 	async def on_timeout(self):
 		try:
@@ -559,108 +501,115 @@ class SeasonUserContracts(ui.DesignerView):
 	async def create(cls, bot: NatsuminBot, invoker: discord.abc.User, season_id: str, user_id: str):
 		self = cls(bot, invoker, season_id, user_id)
 
-		async with bot.database.connect() as conn:
-			async with conn.execute(
-				"SELECT u.username, u.discord_id, su.contractor_id, su.status, su.kind FROM season_user su JOIN user u ON su.user_id = u.id WHERE su.season_id = ? AND su.user_id = ?",
-				(season_id, user_id),
-			) as cursor:
-				user_row = await cursor.fetchone()
+		rendered: RenderedView = await bot.render_cache.get_or_render(
+			("season_contracts", season_id, user_id, bot.database.get_data_version(season_id)),
+			lambda: cls.render(bot, season_id, user_id),
+		)
 
-			if user_row is None:
-				self.add_item(ui.TextDisplay("User data not found!"))
+		if rendered.not_found:
+			self.add_item(ui.TextDisplay(rendered.not_found))
 
-				return self
+			return self
 
-			if user_row["contractor_id"]:
-				async with conn.execute("SELECT username FROM user WHERE id = ?", (user_row["contractor_id"],)) as cursor:
-					row = await cursor.fetchone()
-					contractor_username: str | None = row["username"]
+		footer_messages = rendered.self_footer if invoker.name == rendered.owner_name else rendered.footer
 
-			_, discord_user = await bot.fetch_user_from_database(user_id, db_conn=conn)
+		container = ui.Container(
+			(
+				ui.Section(ui.TextDisplay(rendered.header), accessory=ui.Thumbnail(rendered.thumbnail_url))
+				if rendered.thumbnail_url
+				else ui.TextDisplay(rendered.header)
+			),
+			ui.Separator(),
+			ui.TextDisplay("\n".join(rendered.body)),
+			color=COLORS.DEFAULT,
+		)
 
-			username = f"<@{discord_user.id}>" if discord_user else user_row["username"]
-			user_description = f"- **Status**: {get_status_name(UserStatus(user_row['status']))} {get_status_emote(UserStatus(user_row['status']))}\n"
+		if footer_messages:
+			container.add_text("\n".join([f"-# {msg}" for msg in footer_messages]))
+		container.add_separator()
+		container.add_text(f"-# <:Kirburger:998705274074435584> {await get_cached_deadline_footer(bot, season_id)}")
 
-			if user_row["kind"] == UserKind.NORMAL:
-				user_description += f"- **Contractor**: {contractor_username or 'None'}\n"
+		self.add_item(container)
+		return self
 
-			header_content = f"## {username}'s Contracts\n{user_description}"
+	@staticmethod
+	async def render(bot: NatsuminBot, season_id: str, user_id: str) -> RenderedView:
+		async with bot.database.snapshot() as conn:
+			contracts_data = await load_season_contracts(conn, season_id, user_id)
 
-			async with conn.execute(
-				"SELECT name, type, kind, status, optional, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ?",
-				(season_id, user_id),
-			) as cursor:
-				user_contracts: dict[str, OrderContractData] = {row["type"]: dict(row) for row in await cursor.fetchall()}
+		if contracts_data is None:
+			return RenderedView(not_found="User data not found!")
 
-			async with conn.execute(
-				"SELECT COUNT(*) as count FROM season_contract WHERE season_id = ? AND contractee_id = ? AND (review_url IS NOT NULL AND review_url != '')",
-				(season_id, user_id),
-			) as cursor:
-				total_contracts_with_reviews: int = (await cursor.fetchone())["count"]
-
-			season_order_data = self.bot.season_orders.get(self.season_id, [])
-			footer_messages: list[str] = []
-			unselected_types: list[str] = []
-
-			category_texts: list[str] = []
-			include_reviews: bool = total_contracts_with_reviews <= 20
-			for category in sort_contract_types(user_contracts.keys(), season_order_data):
-				passed = 0
-				total = 0
-				type_texts: list[str] = []
-
-				for cat_type in category["types"]:
-					contract = user_contracts.get(cat_type)
-					if contract is None:
-						continue
-					total += 1
-					if contract["status"] == ContractStatus.PASSED or contract["status"] == ContractStatus.LATE_PASS:
-						passed += 1
-
-					is_unselected = False
-					if contract["name"].strip().lower() in ("please select", "undecided", "pending"):
-						unselected_types.append(contract["type"])
-						is_unselected = True
-
-					type_texts.append(get_formatted_contract(contract, is_unselected=is_unselected, include_review_url=include_reviews))
-
-				if passed == total:
-					footer_messages.append(
-						f"{'You have' if invoker.name == user_row['username'] else 'This user has'} finished all **{category['name']}**!"
-					)
+		prime_deadline_cache(bot, contracts_data.deadline)
+
+		user_row = contracts_data.user
+		discord_user = await bot.resolver.resolve(user_row["discord_id"]) if user_row["discord_id"] else None
+
+		username = f"<@{discord_user.id}>" if discord_user else user_row["username"]
+		user_description = f"- **Status**: {get_status_name(UserStatus(user_row['status']))} {get_status_emote(UserStatus(user_row['status']))}\n"
+
+		if user_row["kind"] == UserKind.NORMAL:
+			user_description += f"- **Contractor**: {contracts_data.contractor_username or 'None'}\n"
+
+		header_content = f"## {username}'s Contracts\n{user_description}"
+
+		user_contracts: dict[str, OrderContractData] = contracts_data.contracts
 
-				category_texts.append(f"### {category['name']} ({passed}/{total})\n{'\n'.join(type_texts)}")
+		season_order_data = bot.season_orders.get(season_id, EMPTY_ORDER_PLAN)
+		finished_categories: list[str] = []
+		unselected_types: list[str] = []
 
-			sorted_categories_text = "\n".join(category_texts)
+		category_texts: list[str] = []
+		include_reviews: bool = contracts_data.contracts_with_reviews <= 20
+		for category in sort_contract_types(user_contracts.keys(), season_order_data):
+			passed = 0
+			total = 0
+			type_texts: list[str] = []
+
+			for cat_type in category["types"]:
+				contract = user_contracts.get(cat_type)
+				if contract is None:
+					continue
+				total += 1
+				if contract["status"] == ContractStatus.PASSED or contract["status"] == ContractStatus.LATE_PASS:
+					passed += 1
+
+				is_unselected = False
+				if contract["name"].strip().lower() in ("please select", "undecided", "pending"):
+					unselected_types.append(contract["type"])
+					is_unselected = True
+
+				type_texts.append(get_formatted_contract(contract, is_unselected=is_unselected, include_review_url=include_reviews))
+
+			if passed == total:
+				finished_categories.append(category["name"])
+
+			category_texts.append(f"### {category['name']} ({passed}/{total})\n{'\n'.join(type_texts)}")
+
+		footers: dict[bool, list[str]] = {}
+		for is_self in (True, False):
+			footer_messages = [f"{'You have' if is_self else 'This user has'} finished all **{name}**!" for name in finished_categories]
 
 			if not include_reviews:
 				footer_messages.append(
-					f"{'You have' if invoker.name == user_row['username'] else 'This user has'} way too many contracts to display in one message, review urls have been disabled."
+					f"{'You have' if is_self else 'This user has'} way too many contracts to display in one message, review urls have been disabled."
 				)
 
 			if unselected_types:
 				footer_messages.append(
-					f"{"You haven't" if invoker.name == user_row['username'] else "This user hasn't"} picked anything for {frmt_iter(f'**{type}**' for type in unselected_types)}!"
+					f"{"You haven't" if is_self else "This user hasn't"} picked anything for {frmt_iter(f'**{type}**' for type in unselected_types)}!"
 				)
 
-			container = ui.Container(
-				(
-					ui.Section(ui.TextDisplay(header_content), accessory=ui.Thumbnail(discord_user.display_avatar.url))
-					if discord_user and discord_user.display_avatar
-					else ui.TextDisplay(header_content)
-				),
-				ui.Separator(),
-				ui.TextDisplay(sorted_categories_text),
-				color=COLORS.DEFAULT,
-			)
+			footers[is_self] = footer_messages
 
-			if footer_messages:
-				container.add_text("\n".join([f"-# {msg}" for msg in footer_messages]))
-			container.add_separator()
-			container.add_text(f"-# <:Kirburger:998705274074435584> {await get_deadline_footer(self.bot.database, season_id, db_conn=conn)}")
-
-		self.add_item(container)
-		return self
+		return RenderedView(
+			header=header_content,
+			body=tuple(category_texts),
+			footer=tuple(footers[False]),
+			self_footer=tuple(footers[True]),
+			owner_name=user_row["username"],
+			thumbnail_url=discord_user.display_avatar.url if discord_user and discord_user.display_avatar else None,
+		)
 
 	async def on_timeout(self):
 		try:
@@ -1,16 +1,15 @@
 from __future__ import annotations
 
-from internal.constants import FILE_LOGGING_FORMATTER
 from internal.checks import whitelist_channel_only
 from internal.enums import UserStatus, UserKind
 from config import BOT_PREFIX, DEV_BOT_PREFIX
 from internal.contracts import sync_season
+from internal.log import get_logger
 from discord.ext import commands, tasks
 from typing import TYPE_CHECKING
 
 import datetime
 import discord
-import logging
 
 if TYPE_CHECKING:
 	from internal.base.bot import NatsuminBot
@@ -25,14 +24,8 @@ class ContractsExt(UserCog, BadgeCog, ContractsCog, name="Contracts"):
 
 	def __init__(self, bot: NatsuminBot):
 		super().__init__(bot)
-		self.logger = logging.getLogger("bot.contracts")
+		self.logger = get_logger("bot.contracts", "logs/contracts.log")
 		self.is_syncing_enabled = True
-		if not self.logger.handlers:
-			file_handler = logging.FileHandler("logs/contracts.log", encoding="utf-8")
-			file_handler.setFormatter(FILE_LOGGING_FORMATTER)
-			self.logger.addHandler(file_handler)
-
-			self.logger.setLevel(logging.INFO)
 
 		self.sync_database.start()
 		self.change_user_status.start()
@@ -62,6 +55,13 @@ class ContractsExt(UserCog, BadgeCog, ContractsCog, name="Contracts"):
 			except Exception as err:
 				self.is_syncing_enabled = False
 				self.logger.error(f"Automatic syncing of {active_season} has failed!", exc_info=err)
+				return
+
+			self.bot.resolver.clear_discord_ids()
+			try:
+				await self.bot.autocomplete.rebuild()
+			except Exception as err:  # the sync itself went through, only autocomplete is stale until the next one
+				self.logger.error(f"Rebuilding autocomplete after syncing {active_season} has failed!", exc_info=err)
 
 	@tasks.loop(minutes=30)
 	async def change_user_status(self):
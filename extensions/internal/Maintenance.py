@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from config import DATABASE_MAINTENANCE_MINUTES
+from internal.base.cog import NatsuminCog
+from discord.ext import tasks
+
+
+class Maintenance(NatsuminCog):
+	@tasks.loop(minutes=DATABASE_MAINTENANCE_MINUTES)
+	async def database_maintenance(self):
+		database = self.bot.database
+		try:
+			result = await database.maintain()
+		except Exception as err:
+			self.logger.error(f"Maintenance of {database.path} failed", exc_info=err)
+			return
+
+		self.logger.info(f"Maintenance of {database.path}: {result.format()}")
+
+	@database_maintenance.before_loop
+	async def before_maintenance(self):
+		await self.bot.wait_until_ready()
+		await self.bot.database.wait_until_ready()
@@ -1,28 +1,23 @@
 from __future__ import annotations
 
-from internal.constants import FILE_LOGGING_FORMATTER
+from internal.log import get_logger
 from typing import TYPE_CHECKING
 
-import logging
-
 if TYPE_CHECKING:
 	from internal.base.bot import NatsuminBot
 
+from .Maintenance import Maintenance
 from .Errors import Errors
 
 
-class InternalExt(Errors, name="Internal", command_attrs=dict(hidden=True)):
+class InternalExt(Errors, Maintenance, name="Internal", command_attrs=dict(hidden=True)):
 	"""Internal related commands and listeners"""
 
 	def __init__(self, bot: NatsuminBot):
 		super().__init__(bot)
-		self.logger = logging.getLogger("bot.internal")
-		if not self.logger.handlers:
-			file_handler = logging.FileHandler("logs/internal.log", encoding="utf-8")
-			file_handler.setFormatter(FILE_LOGGING_FORMATTER)
-			self.logger.addHandler(file_handler)
+		self.logger = get_logger("bot.internal", "logs/internal.log")
 
-			self.logger.setLevel(logging.INFO)
+		self.database_maintenance.start()
 
 
 def setup(bot: NatsuminBot):
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 from config import OWNER_IDS, CONTRIBUTOR_IDS, BOT_PREFIX, DEV_BOT_PREFIX, REPOSITORY_URL
-from internal.constants import FILE_LOGGING_FORMATTER, COLORS
+from internal.constants import COLORS
+from internal.log import get_logger
 from internal.base.cog import NatsuminCog
 from discord.ext import commands
 from typing import TYPE_CHECKING
 
 import discord
-import logging
 
 if TYPE_CHECKING:
 	from internal.base.bot import NatsuminBot
@@ -18,13 +18,7 @@ class OtherExt(NatsuminCog, name="Other"):
 
 	def __init__(self, bot: NatsuminBot):
 		super().__init__(bot)
-		self.logger = logging.getLogger("bot.other")
-		if not self.logger.handlers:
-			file_handler = logging.FileHandler("logs/other.log", encoding="utf-8")
-			file_handler.setFormatter(FILE_LOGGING_FORMATTER)
-			self.logger.addHandler(file_handler)
-
-			self.logger.setLevel(logging.INFO)
+		self.logger = get_logger("bot.other", "logs/other.log")
 
 	def get_bot_info_container(self) -> discord.ui.Container:
 		ping_ms = round(self.bot.latency * 1000)
@@ -1,17 +1,18 @@
 from __future__ import annotations
 
 from internal.functions import frmt_iter, get_user_id, get_legacy_rank
-from internal.constants import FILE_LOGGING_FORMATTER, COLORS
-from internal.contracts import sync_season
+from internal.constants import COLORS
+from internal.log import get_logger
+from internal.contracts import sync_season, get_sync_history, get_sync_run
 from internal.base.cog import NatsuminCog
 from discord.ext import commands
 from typing import TYPE_CHECKING
 from discord import ui
 
 import aiosqlite
+import datetime
 import sqlite3
 import discord
-import logging
 import json
 import io
 import re
@@ -33,6 +34,7 @@ class SQLOutputView(ui.DesignerView):
 
 
 CODEBLOCK_PATTERN = r"(?<!\\)(?P<start>```)(?<=```)(?:(?P<lang>[a-z][a-z0-9]*)\s)?(?P<content>.*?)(?<!\\)(?=```)(?P<end>(?:\\\\)*```)"
+READ_ONLY_STATEMENTS = ("SELECT", "EXPLAIN")  # run on a read-only connection, anything else goes through the writer
 
 
 class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
@@ -40,13 +42,7 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 
 	def __init__(self, bot: NatsuminBot):
 		super().__init__(bot)
-		self.logger = logging.getLogger("bot.owner")
-		if not self.logger.handlers:
-			file_handler = logging.FileHandler("logs/owner.log", encoding="utf-8")
-			file_handler.setFormatter(FILE_LOGGING_FORMATTER)
-			self.logger.addHandler(file_handler)
-
-			self.logger.setLevel(logging.INFO)
+		self.logger = get_logger("bot.owner", "logs/owner.log")
 
 	async def cog_check(self, ctx: commands.Context | discord.ApplicationContext):
 		if await self.bot.is_owner(ctx.author):
@@ -105,7 +101,8 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 	async def config_set(self, ctx: commands.Context, key: str, *, value: str):
 		async with self.bot.database.connect() as conn:
 			previous_value = await self.bot.get_config(key, db_conn=conn)
-			await self.bot.set_config(key, value, db_conn=conn)
+			await self.bot.set_config(key, value)
+			await self.bot.autocomplete.rebuild(db_conn=conn)
 
 		if previous_value is None:
 			await ctx.reply(f"Set **`{key}`** to `{value}`")
@@ -126,24 +123,19 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 		removed_succesfully = await self.bot.remove_config(key)
 
 		if removed_succesfully:
+			await self.bot.autocomplete.rebuild()
 			await ctx.reply(f"Deleted **`{key}`** from the config")
 		else:
 			await ctx.reply(f"Key **`{key}`** not found in config!")
 
 	@commands.group(name="whitelist", invoke_without_command=True)
 	async def whitelist(self, ctx: commands.Context):
-		async with self.bot.database.connect() as conn:
-			async with conn.execute("SELECT guild_id, channel_id FROM whitelist_channel LIMIT 25") as cursor:
-				rows = await cursor.fetchall()
-
-		per_guild_channels: dict[int, list[int]] = {}
-		for row in rows:
-			per_guild_channels.setdefault(row["guild_id"], []).append(row["channel_id"])
+		per_guild_channels = self.bot.access_lists.whitelisted_channels
 
 		embed = discord.Embed(description="", color=COLORS.DEFAULT)
 		embed.set_author(name=f"{self.bot.user.name}'s whitelisted channels", icon_url=self.bot.user.display_avatar.url)
 
-		for guild_id, channel_ids in per_guild_channels.items():
+		for guild_id, channel_ids in list(per_guild_channels.items())[:25]:
 			guild = await self.bot.get_or_fetch(discord.Guild, guild_id)
 
 			embed.add_field(name=str(guild.name if guild else guild_id), value=frmt_iter(f"<#{c}>" for c in channel_ids), inline=False)
@@ -152,12 +144,12 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 
 	@whitelist.command(name="add")
 	async def whitelist_add(self, ctx: commands.Context, channel: discord.abc.GuildChannel):
-		async with self.bot.database.connect() as conn:
-			async with conn.execute("SELECT COUNT(*) as count FROM whitelist_channel WHERE guild_id = ?", (channel.guild.id,)) as cursor:
-				server_had_whitelist = (await cursor.fetchone())["count"] == 0
+		server_had_whitelist = len(self.bot.access_lists.get_whitelisted_channels(channel.guild.id)) == 0
+		await self.bot.database.execute_write(
+			"INSERT OR IGNORE INTO whitelist_channel (guild_id, channel_id) VALUES (?, ?)", (channel.guild.id, channel.id)
+		)
 
-			await conn.execute("INSERT OR IGNORE INTO whitelist_channel (guild_id, channel_id) VALUES (?, ?)", (channel.guild.id, channel.id))
-			await conn.commit()
+		self.bot.access_lists.add_whitelisted(channel.guild.id, channel.id)
 
 		if not server_had_whitelist:
 			await ctx.reply(f"Added {channel.mention} as a whitelisted channel in **{channel.guild.name}**")
@@ -166,12 +158,10 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 
 	@whitelist.command(name="remove")
 	async def whitelist_remove(self, ctx: commands.Context, channel: discord.abc.GuildChannel):
-		async with self.bot.database.connect() as conn:
-			async with conn.execute("SELECT COUNT(*) as count FROM whitelist_channel WHERE guild_id = ?", (channel.guild.id,)) as cursor:
-				server_had_whitelist = (await cursor.fetchone())["count"] - 1 == 0
+		server_had_whitelist = len(self.bot.access_lists.get_whitelisted_channels(channel.guild.id)) - 1 == 0
+		await self.bot.database.execute_write("DELETE FROM whitelist_channel WHERE guild_id = ? AND channel_id = ?", (channel.guild.id, channel.id))
 
-			await conn.execute("DELETE FROM whitelist_channel WHERE guild_id = ? AND channel_id = ?", (channel.guild.id, channel.id))
-			await conn.commit()
+		self.bot.access_lists.remove_whitelisted(channel.guild.id, channel.id)
 
 		if not server_had_whitelist:
 			await ctx.reply(f"Removed {channel.mention} as a whitelisted channel in **{channel.guild.name}**")
@@ -182,9 +172,7 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 
 	@commands.group(name="blacklist", invoke_without_command=True)
 	async def blacklist(self, ctx: commands.Context):
-		async with self.bot.database.connect() as conn:
-			async with conn.execute("SELECT discord_id, reason FROM blacklist_user LIMIT 25") as cursor:
-				rows: dict[int, str | None] = {row["discord_id"]: row["reason"] for row in await cursor.fetchall()}
+		rows = dict(list(self.bot.access_lists.blacklisted_users.items())[:25])
 
 		embed = discord.Embed(description="", color=COLORS.DEFAULT)
 		embed.set_author(name=f"{self.bot.user.name}'s blacklisted users", icon_url=self.bot.user.display_avatar.url)
@@ -196,13 +184,11 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 
 	@blacklist.command(name="add")
 	async def blacklist_add(self, ctx: commands.Context, user: discord.User, *, reason: str = None):
-		async with self.bot.database.connect() as conn:
-			async with conn.execute("SELECT 1 FROM blacklist_user WHERE discord_id = ?", (user.id,)) as cursor:
-				is_user_already_blacklisted = (await cursor.fetchone()) is not None
+		is_user_already_blacklisted = self.bot.access_lists.is_blacklisted(user.id)
+		if not is_user_already_blacklisted:
+			await self.bot.database.execute_write("INSERT OR IGNORE INTO blacklist_user (discord_id, reason) VALUES (?, ?)", (user.id, reason))
 
-			if not is_user_already_blacklisted:
-				await conn.execute("INSERT OR IGNORE INTO blacklist_user (discord_id, reason) VALUES (?, ?)", (user.id, reason))
-				await conn.commit()
+			self.bot.access_lists.add_blacklisted(user.id, reason)
 
 		if not is_user_already_blacklisted:
 			await ctx.reply(f"Added {user.mention} to the blacklist{f' with the reason: `{reason}`' if reason else ''}!")
@@ -211,12 +197,9 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 
 	@blacklist.command(name="remove")
 	async def blacklist_remove(self, ctx: commands.Context, user: discord.User):
-		async with self.bot.database.connect() as conn:
-			async with conn.execute("SELECT 1 FROM blacklist_user WHERE discord_id = ?", (user.id,)) as cursor:
-				is_user_already_blacklisted = (await cursor.fetchone()) is not None
+		await self.bot.database.execute_write("DELETE FROM blacklist_user WHERE discord_id = ?", (user.id,))
 
-			await conn.execute("DELETE FROM blacklist_user WHERE discord_id = ?", (user.id,))
-			await conn.commit()
+		is_user_already_blacklisted = self.bot.access_lists.remove_blacklisted(user.id)
 
 		if is_user_already_blacklisted:
 			await ctx.reply(f"Removed {user.mention} from the blacklist.")
@@ -318,8 +301,7 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 			async with conn.execute("SELECT username, id FROM user WHERE id = ?", (user_id,)) as cursor:
 				user_row = await cursor.fetchone()
 
-			await conn.execute("INSERT OR IGNORE INTO user_alias (username, user_id) VALUES (?, ?)", (alias, user_id))
-			await conn.commit()
+		await self.bot.database.execute_write("INSERT OR IGNORE INTO user_alias (username, user_id) VALUES (?, ?)", (alias, user_id))
 
 		await ctx.reply(f"Succesfully added alias `{alias}` to {user_row['username']} ({user_row['id']})")
 
@@ -332,8 +314,7 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 			if row is None:
 				return await ctx.reply("Alias not found.")
 
-			await conn.execute("DELETE FROM user_alias WHERE username = ?", (alias,))
-			await conn.commit()
+		await self.bot.database.execute_write("DELETE FROM user_alias WHERE username = ?", (alias,))
 
 		await ctx.reply(f"Removed alias `{alias}`")
 
@@ -375,14 +356,66 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 
 		async with ctx.typing():
 			try:
-				duration = await sync_season(self.bot.database, season_id)
-				self.logger.info(f"{season_id} has been manually synced by {ctx.author.name} in {duration:.2f} seconds.")
-				await ctx.reply(
-					embed=discord.Embed(description=f"✅ **{season_name}** has been synced in {duration:.2f} seconds!", color=COLORS.DEFAULT)
-				)
+				report = await sync_season(self.bot.database, season_id)
 			except Exception as e:
 				self.logger.error(f"Manual sync of {season_id} invoked by {ctx.author.name} failed.", exc_info=e)
-				await ctx.reply(embed=discord.Embed(description=f"❌ Failed to sync **{season_name}**:\n```{e}```", color=COLORS.ERROR))
+				return await ctx.reply(embed=discord.Embed(description=f"❌ Failed to sync **{season_name}**:\n```{e}```", color=COLORS.ERROR))
+
+			self.bot.resolver.clear_discord_ids()
+			try:
+				await self.bot.autocomplete.rebuild()
+			except Exception as e:
+				self.logger.error(f"Rebuilding autocomplete after the manual sync of {season_id} failed.", exc_info=e)
+
+			self.logger.info(f"{season_id} has been manually synced by {ctx.author.name} in {report.duration:.2f} seconds.")
+			await ctx.reply(
+				embed=discord.Embed(
+					description=f"✅ **{season_name}** has been synced in {report.duration:.2f} seconds!\n```\n{report.format()}```",
+					color=COLORS.DEFAULT,
+				)
+			)
+
+	@commands.group(name="sync", invoke_without_command=True)
+	async def sync(self, ctx: commands.Context, run_id: int | None = None):
+		if run_id is None:
+			reports = await get_sync_history(self.bot.database, limit=1)
+			report = reports[0] if reports else None
+		else:
+			report = await get_sync_run(self.bot.database, run_id)
+
+		if report is None:
+			return await ctx.reply("No sync runs found.")
+
+		description = f"**{report.season_id}** synced {discord.utils.format_dt(datetime.datetime.fromtimestamp(report.started_at, datetime.UTC), 'R')}"
+		if report.error:
+			description += f"\n❌ `{report.error}`"
+
+		embed = discord.Embed(description=f"{description}\n```\n{report.format()}```", color=COLORS.ERROR if report.error else COLORS.DEFAULT)
+		embed.set_author(name=f"Sync run #{report.id}")
+		await ctx.reply(embed=embed)
+
+	@sync.command(name="history")
+	async def sync_history(self, ctx: commands.Context, limit: int = 10, season: str | None = None):
+		reports = await get_sync_history(self.bot.database, season_id=season, limit=min(limit, 15))
+		if not reports:
+			return await ctx.reply("No sync runs found.")
+
+		lines: list[str] = []
+		for report in reports:
+			sheet_phases = [phase for phase in report.phases.values() if not phase.nested]
+			slowest = max(sheet_phases, key=lambda phase: phase.duration, default=None)
+			lines.append(
+				f"- `#{report.id}` {'✅' if report.error is None else '❌'} **{report.season_id}** "
+				f"{discord.utils.format_dt(datetime.datetime.fromtimestamp(report.started_at, datetime.UTC), 'R')}: {report.duration:.2f}s, "
+				f"{report.total('inserted')} inserted, {report.total('updated')} updated, {report.total('unchanged')} unchanged, "
+				f"{report.total('fuzzy_fallbacks')} fuzzy"
+				+ (f", slowest **{slowest.name}** ({slowest.duration:.2f}s)" if slowest else "")
+			)
+
+		embed = discord.Embed(description="\n".join(lines), color=COLORS.DEFAULT)
+		embed.set_author(name="Sync history")
+		embed.set_footer(text=f"Use {ctx.clean_prefix}sync <id> for the phase breakdown of a run")
+		await ctx.reply(embed=embed)
 
 	@commands.command()
 	async def sql(self, ctx: commands.Context, *, query: str):
@@ -391,20 +424,33 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 			return await ctx.reply("Queries must be inside codeblocks, like:\n```sql\nSELECT * FROM user LIMIT 1\n```")
 
 		query = codeblock_match.group("content").strip()
-		async with self.bot.database.connect() as conn:
-			try:
-				statements = [s.strip() for s in query.split(";") if s.strip()]
-				rows = []
-
-				for i, statement in enumerate(statements, start=1):
-					async with conn.execute(statement) as cursor:
-						if i == len(statements):
-							rows = await cursor.fetchall()
-
-				await conn.commit()
-			except (aiosqlite.Error, sqlite3.Error) as err:
-				await conn.rollback()
-				return await ctx.reply(view=SQLOutputView(err))
+		statements = [s.strip() for s in query.split(";") if s.strip()]
+
+		async def run_statements(conn: aiosqlite.Connection) -> list[aiosqlite.Row]:
+			rows = []
+			for i, statement in enumerate(statements, start=1):
+				async with conn.execute(statement) as cursor:
+					if i == len(statements):
+						rows = await cursor.fetchall()
+			return rows
+
+		is_read_only = all(statement.split(None, 1)[0].upper() in READ_ONLY_STATEMENTS for statement in statements)
+		try:
+			if is_read_only:
+				async with self.bot.database.read() as conn:
+					rows = await run_statements(conn)
+			else:
+				# the statements run as one write, a failing one rolls back all of them
+				rows = await self.bot.database.write(run_statements)
+		except (aiosqlite.Error, sqlite3.Error) as err:
+			return await ctx.reply(view=SQLOutputView(err))
+
+		if not is_read_only:
+			async with self.bot.database.connect() as conn:
+				await self.bot.autocomplete.rebuild(db_conn=conn)
+				await self.bot.access_lists.load(self.bot.database, db_conn=conn)
+				self.bot.resolver.clear()
+				self.bot.database.bump_data_version()
 
 		formatted_rows = (dict(row) for row in rows)
 		str_output = json.dumps(list(formatted_rows), indent=4)
@@ -415,9 +461,78 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 			file = discord.File(io.BytesIO(str_output.encode("utf-8")), filename="result.json")
 			await ctx.reply("", file=file)
 
+	@commands.group(name="metrics", invoke_without_command=True)
+	async def metrics(self, ctx: commands.Context, limit: int = 15):
+		metrics = self.bot.metrics
+		command_stats = sorted(metrics.commands.items(), key=lambda item: item[1].latency.count, reverse=True)[:limit]
+
+		lines: list[str] = []
+		for command, stats in command_stats:
+			count = stats.latency.count
+			lines.append(
+				f"- **`{command}`**: {count}x, avg {stats.latency.total / count * 1000:.0f}ms, "
+				f"p50 ≤{stats.latency.quantile(0.5) * 1000:.0f}ms, p95 ≤{stats.latency.quantile(0.95) * 1000:.0f}ms, "
+				f"{stats.queries.count / count:.1f} queries ({stats.queries.time / count * 1000:.1f}ms), "
+				f"{stats.http.count / count:.1f} http, {stats.errors} errors"
+			)
+
+		embed = discord.Embed(description="\n".join(lines) or "No commands recorded yet.", color=COLORS.DEFAULT)
+		embed.set_author(name=f"{self.bot.user.name}'s metrics", icon_url=self.bot.user.display_avatar.url)
+		embed.add_field(name="Database", value=f"{metrics.queries.count} queries, {metrics.queries.time:.2f}s total", inline=False)
+		embed.add_field(
+			name="HTTP",
+			value="\n".join(f"**{target}**: {stats.count} requests, {stats.time:.2f}s total" for target, stats in sorted(metrics.http.items()))
+			or "None",
+			inline=False,
+		)
+		embed.set_footer(text="Recorded since")
+		embed.timestamp = datetime.datetime.fromtimestamp(metrics.started_at, datetime.UTC)
+
+		await ctx.reply(embed=embed)
+
+	@metrics.command(name="reset")
+	async def metrics_reset(self, ctx: commands.Context):
+		self.bot.metrics.reset()
+		await ctx.reply("Reset metrics.")
+
+	@commands.group(name="profiler", invoke_without_command=True)
+	async def profiler(self, ctx: commands.Context, limit: int = 10):
+		report = self.bot.database.profiler.report(limit)
+
+		if len(report) < 1900:
+			await ctx.reply(f"```\n{report}```", mention_author=False)
+		else:
+			file = discord.File(io.BytesIO(report.encode("utf-8")), filename="queries.txt")
+			await ctx.reply("", file=file, mention_author=False)
+
+	@profiler.command(name="enable", aliases=["on"])
+	async def profiler_enable(self, ctx: commands.Context):
+		self.bot.database.profiler.enabled = True
+		await ctx.reply("Query profiling enabled.")
+
+	@profiler.command(name="disable", aliases=["off"])
+	async def profiler_disable(self, ctx: commands.Context):
+		self.bot.database.profiler.enabled = False
+		await ctx.reply("Query profiling disabled.")
+
+	@profiler.command(name="reset")
+	async def profiler_reset(self, ctx: commands.Context):
+		self.bot.database.profiler.reset()
+		await ctx.reply("Reset query profiler.")
+
+	@commands.group(name="dbstats", invoke_without_command=True)
+	async def dbstats(self, ctx: commands.Context):
+		stats = await self.bot.database.stats()
+		await ctx.reply(f"```\n{stats.format()}```", mention_author=False)
+
+	@dbstats.command(name="maintain", aliases=["optimize"])
+	async def dbstats_maintain(self, ctx: commands.Context):
+		result = await self.bot.database.maintain()
+		await ctx.reply(f"```\n{self.bot.database.path}: {result.format()}```", mention_author=False)
+
 	@commands.command()  # temporary
 	async def cleanup_media(self, ctx: commands.Context, media_type: str = "anilist"):
-		async with self.bot.database.connect() as conn:
+		async def clean_descriptions(conn: aiosqlite.Connection) -> int:
 			async with conn.execute("SELECT type, id, description FROM media WHERE type = ?", (media_type,)) as cursor:
 				rows = await cursor.fetchall()
 
@@ -432,8 +547,10 @@ class OwnerExt(NatsuminCog, name="Owner", command_attrs=dict(hidden=True)):
 
 				await conn.execute("UPDATE media SET description = ? WHERE type = ? AND id = ?", (new_desc, row["type"], row["id"]))
 
-			await conn.commit()
-			await ctx.reply(f"Cleaned up {len(rows)} rows!")
+			return len(rows)
+
+		cleaned = await self.bot.database.write(clean_descriptions)
+		await ctx.reply(f"Cleaned up {cleaned} rows!")
 
 
 def setup(bot: NatsuminBot):
@@ -1,44 +1,73 @@
 from __future__ import annotations
 
-from internal.constants import FILE_LOGGING_FORMATTER, COLORS
-from internal.functions import shorten, diff_to_str
+from internal.constants import COLORS
+from internal.log import get_logger
+from internal.functions import shorten, diff_to_str, frmt_iter
+from internal.database.Reminder import FailedReminder
 from internal.base.cog import NatsuminCog
 from discord.ext import commands, tasks
 from typing import TYPE_CHECKING
 from discord import ui
 
 import parsedatetime
+import dataclasses
 import datetime
+import asyncio
 import discord
-import logging
 import re
 
 if TYPE_CHECKING:
-	from internal.database.Reminder import ReminderDatabase, Reminder
+	from internal.database.Reminder import Reminder
+	from internal.scheduler import ReminderScheduler
 	from internal.base.bot import NatsuminBot
 
 
 TIMESTAMP_PATTERN = r"<t:(\d+):(\w+)>"
+DELIVERY_CONCURRENCY = 8
+CLAIM_RETRY_SECONDS = 5
+REMINDER_MENTIONS = discord.AllowedMentions(everyone=False, roles=False, users=True, replied_user=False)
+
+
+def format_reminder(reminder: Reminder, *, mention: bool) -> str:
+	message = f": `{reminder.message}`" if reminder.message.strip() else ""
+	if mention:
+		return f"<@{reminder.user_id}>, reminder from <t:{reminder.created_timestamp()}:R>{message}"
+
+	return f"Reminder from <t:{reminder.created_timestamp()}:R>{message}"
+
+
+def chunk_lines(lines: list[str], limit: int = 2000) -> list[tuple[str, int]]:
+	"""Join lines into messages of at most `limit` characters, as (content, number of lines in it) in order."""
+	chunks: list[tuple[str, int]] = []
+	current = ""
+	count = 0
+	for line in lines:
+		line = line[:limit]
+		if current and len(current) + len(line) + 1 > limit:
+			chunks.append((current, count))
+			current, count = "", 0
+		current = f"{current}\n{line}" if current else line
+		count += 1
+
+	if current:
+		chunks.append((current, count))
+
+	return chunks
 
 
 async def get_user_reminders(ctx: discord.AutocompleteContext):
-	db: ReminderDatabase = ctx.cog.db
-	if not db:
-		return []
-	user_reminders: list[Reminder] = sorted(await db.get_reminders(user_id=ctx.interaction.user.id), key=lambda r: r.remind_at)
+	scheduler: ReminderScheduler = ctx.cog.scheduler
+	now = datetime.datetime.now(datetime.UTC)
 
 	return [
-		discord.OptionChoice(
-			name=f"{shorten(reminder.message, 24)} ({diff_to_str(reminder.remind_at, datetime.datetime.now(datetime.UTC))})", value=reminder.id
-		)
-		for reminder in user_reminders
+		discord.OptionChoice(name=f"{shorten(reminder.message, 24)} ({diff_to_str(reminder.remind_at, now)})", value=reminder.id)
+		for reminder in scheduler.get_user_reminders(ctx.interaction.user.id)[:25]
 	]
 
 
 class RemindersList(ui.DesignerView):
 	def __init__(self, bot: NatsuminBot, invoker: discord.User, reminders: list[Reminder], show_hidden: bool):
 		super().__init__(store=False)
-		reminders = sorted(reminders, key=lambda r: r.remind_at)
 
 		reminder_str_list: list[str] = []
 		for reminder in reminders:
@@ -62,17 +91,16 @@ class ReminderExt(NatsuminCog, name="Reminder"):
 
 	def __init__(self, bot: NatsuminBot):
 		super().__init__(bot)
-		self.logger = logging.getLogger("bot.reminder")
+		self.logger = get_logger("bot.reminder", "logs/reminder.log")
 		self.db = bot.reminders
-		if not self.logger.handlers:
-			file_handler = logging.FileHandler("logs/reminder.log", encoding="utf-8")
-			file_handler.setFormatter(FILE_LOGGING_FORMATTER)
-			self.logger.addHandler(file_handler)
-
-			self.logger.setLevel(logging.INFO)
+		self.scheduler = bot.reminder_scheduler
+		self._deliveries: set[asyncio.Task] = set()
 
 		self.reminder_loop.start()
 
+	def cog_unload(self):
+		self.reminder_loop.cancel()
+
 	async def create_reminder(
 		self, user: discord.User, channel: discord.TextChannel, remind_in: str, message: str, hidden: bool = False
 	) -> tuple[str, bool]:
@@ -99,6 +127,7 @@ class ReminderExt(NatsuminCog, name="Reminder"):
 			return "Invalid timestamp, it seems that you've attempted to set the reminder to end in the past.", True
 
 		new_reminder = await self.db.create_reminder(user.id, channel.id, remind_at, message, hidden)
+		self.scheduler.schedule(new_reminder)
 
 		time_diff_str = diff_to_str(new_reminder.remind_at, new_reminder.created_at)
 		response = f"Done! Reminding in {time_diff_str}: `{new_reminder.message}`"
@@ -109,15 +138,11 @@ class ReminderExt(NatsuminCog, name="Reminder"):
 		return response, hidden
 
 	async def delete_reminder(self, user: discord.User, id: int, hidden: bool = False) -> tuple[str, bool]:
-		user_reminders = await self.db.get_reminders(user_id=user.id)
-
-		has_reminder_with_id = any([reminder.id == id for reminder in user_reminders])
-
-		if not has_reminder_with_id:
+		deleted_reminder = await self.db.delete_reminder(user.id, id)
+		if deleted_reminder is None:
 			return f"Could not find any reminder with id {id}", True
 
-		deleted_reminder = [r for r in user_reminders if r.id == id][0]
-		await self.db.delete_reminder(id)
+		self.scheduler.cancel(id)
 
 		time_diff_str = diff_to_str(deleted_reminder.remind_at, datetime.datetime.now(datetime.UTC))
 
@@ -129,7 +154,7 @@ class ReminderExt(NatsuminCog, name="Reminder"):
 			return f"Deleted reminder that's due in {time_diff_str}", hidden
 
 	async def list_reminders(self, user: discord.User, hidden: bool, show_hidden: bool) -> tuple[str | RemindersList, bool]:
-		user_reminders = await self.db.get_reminders(user_id=user.id)
+		user_reminders = self.scheduler.get_user_reminders(user.id)
 		hidden_reminders = [r for r in user_reminders if r.hidden]
 		channel_reminders = [r for r in user_reminders if not r.hidden]
 		show_hidden = show_hidden if not hidden else hidden
@@ -141,10 +166,6 @@ class ReminderExt(NatsuminCog, name="Reminder"):
 
 		return RemindersList(self.bot, user, user_reminders, show_hidden), hidden
 
-	@commands.Cog.listener()
-	async def on_ready(self):
-		await self.db.setup()
-
 	reminder_group = discord.SlashCommandGroup("reminder", "Reminder commands")
 
 	@reminder_group.command(description="Create a new reminder.")
@@ -211,47 +232,145 @@ class ReminderExt(NatsuminCog, name="Reminder"):
 		else:
 			await ctx.reply(response)
 
-	@tasks.loop(seconds=15)
-	async def reminder_loop(self):
-		due_reminders = await self.db.get_due_reminders()
-
-		for reminder in due_reminders:
+	async def _resolve[T](self, semaphore: asyncio.Semaphore, object_type: type[T], object_id: int) -> T | None:
+		async with semaphore:
 			try:
-				user = await self.bot.get_or_fetch(discord.User, reminder.user_id)
-				if not user:
-					continue
+				return await self.bot.get_or_fetch(object_type, object_id)
+			except discord.HTTPException:
+				return None
+
+	async def _send_batch(
+		self, semaphore: asyncio.Semaphore, destination: discord.abc.Messageable, reminders: list[Reminder], lines: list[str]
+	) -> list[tuple[Reminder, str]]:
+		"""Send a batch one message at a time, acknowledging each message's reminders once it's sent. Returns the ones never sent."""
+		async with semaphore:
+			sent = 0
+			for content, line_count in chunk_lines(lines):
+				try:
+					await destination.send(content, allowed_mentions=REMINDER_MENTIONS)
+				except Exception as err:
+					return [(reminder, repr(err)) for reminder in reminders[sent:]]
+
+				await self._ack_sent(reminders[sent : sent + line_count])
+				sent += line_count
+
+			return []
+
+	async def _ack_sent(self, reminders: list[Reminder]):
+		try:
+			await self.db.ack_reminders([reminder.id for reminder in reminders])
+		except Exception as err:
+			# already sent, releasing them would send them again, so they're left claimed
+			self.logger.error(f"Could not acknowledge sent reminders {frmt_iter(r.id for r in reminders)}", exc_info=err)
+			return
 
-				channel = await self.bot.get_or_fetch(discord.TextChannel, reminder.channel_id)
+		for reminder in reminders:
+			self.scheduler.cancel(reminder.id)
+
+	async def _release_failed(self, reminder: Reminder, error: str):
+		outcome, retried = await self.db.fail_reminder(reminder, error)
+		match outcome:
+			case FailedReminder.DEAD:
+				self.scheduler.cancel(reminder.id)
+				self.logger.error(f"Reminder {reminder.id} for user {reminder.user_id} failed {reminder.attempts} times, moved to dead letters: {error}")
+			case FailedReminder.DELETED:
+				self.scheduler.cancel(reminder.id)
+				self.logger.info(f"Reminder {reminder.id} for user {reminder.user_id} was deleted while its delivery failed: {error}")
+			case FailedReminder.RETRYING:
+				self.logger.warning(f"Could not emit reminder {reminder.id} to user {reminder.user_id} (attempt {reminder.attempts}): {error}")
+				self.scheduler.schedule(retried)
+
+	async def deliver_reminders(self, reminders: list[Reminder]):
+		"""
+		Deliver claimed reminders, reminders going to the same channel (or DM) in the same minute are merged into one message.
+
+		Every sent message acknowledges the reminders in it right away, only reminders that were never sent are released for a retry.
+		"""
+		semaphore = asyncio.Semaphore(DELIVERY_CONCURRENCY)
+
+		user_ids = list({reminder.user_id for reminder in reminders})
+		channel_ids = list({reminder.channel_id for reminder in reminders if not reminder.hidden})
+		resolved = await asyncio.gather(
+			*(self._resolve(semaphore, discord.User, user_id) for user_id in user_ids),
+			*(self._resolve(semaphore, discord.TextChannel, channel_id) for channel_id in channel_ids),
+		)
+		users: dict[int, discord.User | None] = dict(zip(user_ids, resolved[: len(user_ids)]))
+		channels: dict[int, discord.TextChannel | None] = dict(zip(channel_ids, resolved[len(user_ids) :]))
 
-				channelless_response = (
-					f"Reminder from <t:{reminder.created_timestamp()}:R>{f': `{reminder.message}`' if reminder.message.strip() else ''}"
-				)
+		failed: list[tuple[Reminder, str]] = []
+		batches: dict[tuple[str, int, int], tuple[discord.abc.Messageable, list[Reminder], list[str]]] = {}
+		for reminder in reminders:
+			user = users.get(reminder.user_id)
+			if not user:
+				failed.append((reminder, "Could not resolve user"))
+				continue
 
-				if (not channel) or reminder.hidden:
-					await user.send(
-						channelless_response, allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True, replied_user=False)
-					)
-					continue
-
-				if not hasattr(channel, "guild"):
-					await user.send(
-						channelless_response, allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True, replied_user=False)
-					)
-					continue
-
-				bot_perms_in_channel = channel.permissions_for(channel.guild.me)
-				if not bot_perms_in_channel.send_messages:
-					await user.send(
-						channelless_response, allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True, replied_user=False)
-					)
-					continue
-
-				await channel.send(
-					f"<@{user.id}>, reminder from <t:{reminder.created_timestamp()}:R>{f': `{reminder.message}`' if reminder.message.strip() else ''}",
-					allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True, replied_user=False),
-				)
+			minute = reminder.remind_timestamp() // 60
+			channel = channels.get(reminder.channel_id)
+			if (not reminder.hidden) and channel and hasattr(channel, "guild") and channel.permissions_for(channel.guild.me).send_messages:
+				key, destination, line = ("channel", channel.id, minute), channel, format_reminder(reminder, mention=True)
+			else:
+				key, destination, line = ("dm", user.id, minute), user, format_reminder(reminder, mention=False)
+
+			_, batch_reminders, lines = batches.setdefault(key, (destination, [], []))
+			batch_reminders.append(reminder)
+			lines.append(line)
+
+		unsent = await asyncio.gather(
+			*(self._send_batch(semaphore, destination, batch_reminders, lines) for destination, batch_reminders, lines in batches.values())
+		)
+		for batch_unsent in unsent:
+			failed.extend(batch_unsent)
+
+		for reminder, error in failed:
+			await self._release_failed(reminder, error)
+
+	async def _run_delivery(self, reminders: list[Reminder]):
+		try:
+			await self.deliver_reminders(reminders)
+		except Exception as err:
+			# claims expire on their own so the reminders are retried once the lease runs out
+			self.logger.error(f"Delivery of reminders {frmt_iter(r.id for r in reminders)} failed", exc_info=err)
+			for reminder in reminders:
+				if (current := await self.db.get_reminder(reminder.id)) is not None:
+					self.scheduler.schedule(current)
+				else:
+					self.scheduler.cancel(reminder.id)
+
+	@tasks.loop()
+	async def reminder_loop(self):
+		due_reminders = await self.scheduler.wait_for_due()
+		try:
+			claimed = await self.db.claim_reminders([reminder.id for reminder in due_reminders])
+		except Exception as err:
+			# an exception would stop the loop, and the popped reminders would never be due again
+			self.logger.error(f"Could not claim reminders {frmt_iter(r.id for r in due_reminders)}, retrying in {CLAIM_RETRY_SECONDS}s", exc_info=err)
+			await asyncio.sleep(CLAIM_RETRY_SECONDS)
+			for reminder in due_reminders:
+				self.scheduler.schedule(reminder)
+			return
+
+		if claimed:
+			task = asyncio.create_task(self._run_delivery(claimed))
+			self._deliveries.add(task)
+			task.add_done_callback(self._deliveries.discard)
+
+		claimed_ids = {reminder.id for reminder in claimed}
+		for reminder in due_reminders:
+			if reminder.id in claimed_ids:
+				continue
+
+			# held by another worker, gets picked back up after its lease expires
+			try:
+				current = await self.db.get_reminder(reminder.id)
 			except Exception as err:
-				self.logger.error(f"Could not emit reminder {reminder.id} to user {reminder.user_id}", exc_info=err)
+				# treated as claimed until the lease would run out, rather than retrying it right away
+				self.logger.error(f"Could not reload unclaimed reminder {reminder.id}", exc_info=err)
+				current = dataclasses.replace(reminder, claimed_at=datetime.datetime.now(datetime.UTC))
+			if current is not None:
+				self.scheduler.schedule(current)
+			else:
+				self.scheduler.cancel(reminder.id)
 
 	@reminder_loop.before_loop
 	async def before_loop(self):
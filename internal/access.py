@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from internal.database import NatsuminDatabase
+
+	import aiosqlite
+
+
+class AccessLists:
+	"""
+	In-memory copy of the `blacklist_user` and `whitelist_channel` tables, used by the global command checks.
+
+	Loaded on ready, the owner commands keep it in sync after writing to the database.
+	"""
+
+	def __init__(self):
+		self.blacklisted_users: dict[int, str | None] = {}
+		self.whitelisted_channels: dict[int, set[int]] = {}
+
+	async def load(self, database: NatsuminDatabase, *, db_conn: aiosqlite.Connection | None = None):
+		async with database.connect(db_conn) as conn:
+			async with conn.execute("SELECT discord_id, reason FROM blacklist_user") as cursor:
+				blacklisted_users = {row["discord_id"]: row["reason"] for row in await cursor.fetchall()}
+
+			whitelisted_channels: dict[int, set[int]] = {}
+			async with conn.execute("SELECT guild_id, channel_id FROM whitelist_channel") as cursor:
+				for row in await cursor.fetchall():
+					whitelisted_channels.setdefault(row["guild_id"], set()).add(row["channel_id"])
+
+		self.blacklisted_users = blacklisted_users
+		self.whitelisted_channels = whitelisted_channels
+
+	def is_blacklisted(self, discord_id: int) -> bool:
+		return discord_id in self.blacklisted_users
+
+	def get_blacklist_reason(self, discord_id: int) -> str | None:
+		return self.blacklisted_users.get(discord_id)
+
+	def add_blacklisted(self, discord_id: int, reason: str | None = None):
+		self.blacklisted_users[discord_id] = reason
+
+	def remove_blacklisted(self, discord_id: int) -> bool:
+		if discord_id not in self.blacklisted_users:
+			return False
+
+		del self.blacklisted_users[discord_id]
+		return True
+
+	def get_whitelisted_channels(self, guild_id: int) -> set[int]:
+		return self.whitelisted_channels.get(guild_id, set())
+
+	def add_whitelisted(self, guild_id: int, channel_id: int):
+		self.whitelisted_channels.setdefault(guild_id, set()).add(channel_id)
+
+	def remove_whitelisted(self, guild_id: int, channel_id: int):
+		channels = self.whitelisted_channels.get(guild_id)
+		if channels is None:
+			return
+
+		channels.discard(channel_id)
+		if not channels:
+			del self.whitelisted_channels[guild_id]
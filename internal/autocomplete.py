@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from internal.functions import load_user_matcher
+from internal.matching import FuzzyMatcher
+from typing import TYPE_CHECKING
+from bisect import bisect_left
+
+import asyncio
+import discord
+
+if TYPE_CHECKING:
+	from internal.database import NatsuminDatabase
+	from collections.abc import Iterable
+
+	import aiosqlite
+
+MAX_CHOICES = 25
+GRAM_SIZES = (1, 2, 3)
+FUZZY_MIN_QUERY_LENGTH = 3
+FUZZY_SCORE_CUTOFF = 80
+
+
+def _grams(text: str, size: int) -> set[str]:
+	return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def _renamed(index: AutocompleteIndex[str], old: str, new: str) -> AutocompleteIndex[str] | None:
+	"""Copy of a username index with `old` swapped for `new`, None when `old` isn't in it."""
+	if old not in index.values:
+		return None
+
+	return AutocompleteIndex((value, value) for value in sorted(new if value == old else value for value in index.values))
+
+
+class AutocompleteIndex[T]:
+	"""
+	In-memory index used to answer autocomplete queries without touching the database.
+
+	Entries keep the order they were given in, matches are ranked prefix first, then substring,
+	and each rank keeps that original order. When those don't fill the limit the rest is filled
+	with fuzzy matches, so small typos still autocomplete.
+	"""
+
+	def __init__(self, entries: Iterable[tuple[str | tuple[str, ...], T]] = ()):
+		self.values: list[T] = []
+		self.keys: list[tuple[str, ...]] = []
+		self._prefixes: list[tuple[str, int]] = []
+		self._grams: dict[str, set[int]] = {}
+
+		for index, (keys, value) in enumerate(entries):
+			if isinstance(keys, str):
+				keys = (keys,)
+			keys = tuple(key.lower() for key in keys if key)
+
+			self.values.append(value)
+			self.keys.append(keys)
+			for key in keys:
+				self._prefixes.append((key, index))
+				for size in GRAM_SIZES:
+					for gram in _grams(key, size):
+						self._grams.setdefault(gram, set()).add(index)
+
+		self._prefixes.sort()
+		self._fuzzy: FuzzyMatcher[int] | None = None
+
+	def __len__(self) -> int:
+		return len(self.values)
+
+	def _prefix_matches(self, query: str) -> set[int]:
+		matches: set[int] = set()
+		for i in range(bisect_left(self._prefixes, (query,)), len(self._prefixes)):
+			key, index = self._prefixes[i]
+			if not key.startswith(query):
+				break
+			matches.add(index)
+
+		return matches
+
+	def _substring_candidates(self, query: str) -> set[int]:
+		size = min(len(query), GRAM_SIZES[-1])
+		gram_sets: list[set[int]] = []
+		for gram in _grams(query, size):
+			indexes = self._grams.get(gram)
+			if not indexes:
+				return set()
+			gram_sets.append(indexes)
+
+		gram_sets.sort(key=len)
+		return gram_sets[0].intersection(*gram_sets[1:])
+
+	def search(self, query: str | None, limit: int = MAX_CHOICES) -> list[T]:
+		query = (query or "").strip().lower()
+		if not query:
+			return self.values[:limit]
+
+		prefix_matches = self._prefix_matches(query)
+		substring_matches = [
+			index
+			for index in self._substring_candidates(query)
+			if index not in prefix_matches and any(query in key for key in self.keys[index])
+		]
+
+		ordered = sorted(prefix_matches)
+		if len(ordered) < limit:
+			ordered.extend(sorted(substring_matches))
+		if len(ordered) < limit and len(query) >= FUZZY_MIN_QUERY_LENGTH:
+			ordered.extend(self._fuzzy_matches(query, limit, exclude=set(ordered)))
+
+		return [self.values[index] for index in ordered[:limit]]
+
+	def _fuzzy_matches(self, query: str, limit: int, *, exclude: set[int]) -> list[int]:
+		if self._fuzzy is None:  # built on first use, most indexes never get here
+			self._fuzzy = FuzzyMatcher((key, index) for index, keys in enumerate(self.keys) for key in keys)
+
+		matches: list[int] = []
+		for index, _, _ in self._fuzzy.extract(query, limit=limit + len(exclude), score_cutoff=FUZZY_SCORE_CUTOFF):
+			if index not in exclude:
+				exclude.add(index)
+				matches.append(index)
+
+		return matches
+
+
+class AutocompleteService:
+	"""
+	Holds every autocomplete index used by the bot, rebuilt after syncs and badge edits.
+
+	Also keeps the username and alias matcher get_user_id falls back to, so a miss doesn't read every user again.
+	"""
+
+	def __init__(self, database: NatsuminDatabase):
+		self.database = database
+		self.active_season: str | None = None
+
+		self.seasons: AutocompleteIndex[discord.OptionChoice] = AutocompleteIndex()
+		self.usernames: AutocompleteIndex[str] = AutocompleteIndex()
+		self.badges: AutocompleteIndex[discord.OptionChoice] = AutocompleteIndex()
+		self.season_usernames: dict[str, AutocompleteIndex[str]] = {}
+		self.fantasy_usernames: dict[str, AutocompleteIndex[str]] = {}
+		self.contract_types: dict[str, AutocompleteIndex[str]] = {}
+		self.reps: dict[str, AutocompleteIndex[str]] = {}
+		self.user_matcher: FuzzyMatcher[str] | None = None
+
+		self._lock = asyncio.Lock()
+
+	def _seasonal(self, indexes: dict[str, AutocompleteIndex[str]], query: str | None, season_id: str | None = None) -> list[str]:
+		index = indexes.get(season_id or self.active_season)
+		return index.search(query) if index is not None else []
+
+	def search_seasons(self, query: str | None) -> list[discord.OptionChoice]:
+		return self.seasons.search(query)
+
+	def search_usernames(self, query: str | None, *, season_id: str | None = None, seasonal: bool = True) -> list[str]:
+		if not seasonal:
+			return self.usernames.search(query)
+		return self._seasonal(self.season_usernames, query, season_id)
+
+	def search_fantasy_usernames(self, query: str | None, *, season_id: str | None = None) -> list[str]:
+		return self._seasonal(self.fantasy_usernames, query, season_id)
+
+	def search_contract_types(self, query: str | None, *, season_id: str | None = None) -> list[str]:
+		return self._seasonal(self.contract_types, query, season_id)
+
+	def search_reps(self, query: str | None, *, season_id: str | None = None) -> list[str]:
+		return self._seasonal(self.reps, query, season_id)
+
+	def search_badges(self, query: str | None) -> list[discord.OptionChoice]:
+		return self.badges.search(query)
+
+	async def rebuild(self, *, db_conn: aiosqlite.Connection | None = None):
+		async with self._lock, self.database.connect(db_conn) as conn:
+			self.active_season = await self.database.get_config("contracts.active_season", db_conn=conn)
+
+			async with conn.execute("SELECT id, name FROM season") as cursor:
+				self.seasons = AutocompleteIndex(
+					((row["name"], row["id"]), discord.OptionChoice(name=row["name"], value=row["id"])) for row in await cursor.fetchall()
+				)
+
+			async with conn.execute("SELECT username FROM user ORDER BY username") as cursor:
+				self.usernames = AutocompleteIndex((row["username"], row["username"]) for row in await cursor.fetchall())
+			self.user_matcher = await load_user_matcher(conn)
+
+			query = "SELECT su.season_id, u.username FROM season_user su JOIN user u ON su.user_id = u.id ORDER BY su.season_id, u.username"
+			async with conn.execute(query) as cursor:
+				self.season_usernames = self._group_by_season(await cursor.fetchall(), "username")
+
+			query = "SELECT suf.season_id, u.username FROM season_user_fantasy suf JOIN user u ON u.id = suf.user_id ORDER BY suf.season_id, u.username"
+			async with conn.execute(query) as cursor:
+				self.fantasy_usernames = self._group_by_season(await cursor.fetchall(), "username")
+
+			async with conn.execute("SELECT DISTINCT season_id, type FROM season_contract ORDER BY season_id, type DESC") as cursor:
+				self.contract_types = self._group_by_season(await cursor.fetchall(), "type")
+
+			async with conn.execute("SELECT DISTINCT season_id, rep FROM season_user WHERE rep IS NOT NULL ORDER BY season_id, rep") as cursor:
+				self.reps = self._group_by_season(await cursor.fetchall(), "rep")
+
+			await self._rebuild_badges(conn)
+
+	async def rename_user(self, user_id: str, old: str, new: str):
+		"""Swaps a renamed user in the username indexes that have them, every other index is left as is."""
+		async with self._lock:
+			if self.user_matcher is not None:  # the old name stays in it, it's an alias now
+				self.user_matcher.add(new, user_id)
+
+			if (usernames := _renamed(self.usernames, old, new)) is not None:
+				self.usernames = usernames
+
+			for indexes in (self.season_usernames, self.fantasy_usernames):
+				for season_id, index in indexes.items():
+					if (renamed := _renamed(index, old, new)) is not None:
+						indexes[season_id] = renamed
+
+	async def rebuild_badges(self, *, db_conn: aiosqlite.Connection | None = None):
+		async with self._lock, self.database.connect(db_conn) as conn:
+			await self._rebuild_badges(conn)
+
+	async def _rebuild_badges(self, conn: aiosqlite.Connection):
+		async with conn.execute("SELECT id, name, type FROM badge ORDER BY type, created_at DESC, name") as cursor:
+			self.badges = AutocompleteIndex(
+				((row["name"], row["id"]), discord.OptionChoice(name=f"{row['name']} ({row['type']})", value=row["id"]))
+				for row in await cursor.fetchall()
+			)
+
+	@staticmethod
+	def _group_by_season(rows: Iterable[aiosqlite.Row], column: str) -> dict[str, AutocompleteIndex[str]]:
+		grouped: dict[str, list[tuple[str, str]]] = {}
+		for row in rows:
+			grouped.setdefault(row["season_id"], []).append((row[column], row[column]))
+
+		return {season_id: AutocompleteIndex(entries) for season_id, entries in grouped.items()}
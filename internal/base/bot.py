@@ -1,29 +1,44 @@
 from __future__ import annotations
 
-from internal.constants import FILE_LOGGING_FORMATTER, CONSOLE_LOGGING_FORMATTER, COLORS
-from config import BOT_PREFIX, DEV_BOT_PREFIX, OWNER_IDS, DISABLED_EXTENSIONS
+from internal.constants import COLORS
+from internal.metrics import metrics, meter_discord_http, start_metrics_server, current_invocation
+from config import BOT_PREFIX, DEV_BOT_PREFIX, OWNER_IDS, DISABLED_EXTENSIONS, METRICS_PORT, QUERY_PROFILING, DATABASE_PRAGMA_PROFILE
 from internal.exceptions import BlacklistedUser, NotWhitelistedChannel
 from internal.database.Reminder import ReminderDatabase
+from internal.database.pragmas import get_pragma_profile
+from internal.scheduler import ReminderScheduler
+from internal.autocomplete import AutocompleteService
+from internal.cache import RenderCache
+from internal.resolver import UserResolver
+from internal.log import get_logger
+from internal.access import AccessLists
 from typing import TYPE_CHECKING, Literal, overload
-from internal.contracts.order import OrderCategory
+from internal.contracts.order import OrderPlan
 from internal.database import NatsuminDatabase
 from internal.functions import get_user_id
 from discord.ext import commands
+from aiohttp import web
 from pathlib import Path
 
 import aiosqlite
 import aiofiles
 import datetime
+import asyncio
 import discord
-import logging
 import json
-import os
+import time
+import sys
 import re
 
 if TYPE_CHECKING:
+	from collections.abc import Awaitable
 	from typing import Mapping, Optional
 
 
+def format_timings(timings: dict[str, float]) -> str:
+	return ", ".join(f"{name} {duration * 1000:.0f}ms" for name, duration in sorted(timings.items(), key=lambda item: item[1], reverse=True))
+
+
 class NatsuminBot(commands.Bot):
 	def __init__(self, production: bool = False):
 		super().__init__(
@@ -38,68 +53,149 @@ class NatsuminBot(commands.Bot):
 		self.is_production = production
 		self.started_at = datetime.datetime.now(datetime.UTC)
 		self.color = COLORS.DEFAULT
-		self.database = NatsuminDatabase(production)
-		self.reminders = ReminderDatabase(production)
+		pragmas = get_pragma_profile(DATABASE_PRAGMA_PROFILE)
+		self.database = NatsuminDatabase(production, profile=QUERY_PROFILING, pragmas=pragmas)
+		self.reminders = ReminderDatabase(self.database)
+		self.reminder_scheduler = ReminderScheduler()
+		self.autocomplete = AutocompleteService(self.database)
+		self.access_lists = AccessLists()
+		self.resolver = UserResolver(self)
+		self.render_cache = RenderCache()
+		self.metrics = metrics
+		self.metrics_server: web.AppRunner | None = None
 		self.anicord: discord.Guild | None = None
-		self.season_orders: dict[str, list[OrderCategory]] = {}
+		self.season_orders: dict[str, OrderPlan] = {}
+		# seconds spent loading each extension (import and setup) and on each part of the one-time initialization
+		self.extension_load_times: dict[str, float] = {}
+		self.init_times: dict[str, float] = {}
+		self._setup_task: asyncio.Task | None = None
+		self._ready_once = False
 
-		self.logger = logging.getLogger("bot")
-		if not self.logger.hasHandlers():
-			file_handler = logging.FileHandler("logs/bot.log", encoding="utf-8")
-			file_handler.setFormatter(FILE_LOGGING_FORMATTER)
-			console_handler = logging.StreamHandler()
-			console_handler.setFormatter(CONSOLE_LOGGING_FORMATTER)
-			self.logger.addHandler(file_handler)
-			self.logger.addHandler(console_handler)
+		self.logger = get_logger("bot", "logs/bot.log", console=True)
 
-			self.logger.setLevel(logging.INFO)
+		self.http.request = meter_discord_http(self.http.request)
+		self.before_invoke(self.metrics_before_invoke)
+		self.after_invoke(self.metrics_after_invoke)
 
 		for extension in Path("extensions").iterdir():
 			if not extension.is_dir() or extension.stem in DISABLED_EXTENSIONS:
 				continue
 
 			extension_path = f"extensions.{extension.stem}"
+			start = time.perf_counter()
 			try:
 				self.load_extension(extension_path)
 			except discord.ExtensionFailed as err:
 				self.logger.error(f"An exception occured while loading extension: {extension_path}", exc_info=err)
+				continue
+			self.extension_load_times[extension_path] = time.perf_counter() - start
+
+		self.logger.info(f"Loaded extensions: {format_timings(self.extension_load_times)}")
+
+	async def login(self, token: str):
+		await super().login(token)
+		if self._setup_task is None:
+			# runs while the gateway connects, on_ready waits for it
+			self._setup_task = asyncio.create_task(self.setup_hook(), name="bot-setup")
+
+	async def setup_hook(self):
+		"""One-time initialization, unlike on_ready this doesn't run again after reconnects."""
+		start = time.perf_counter()
+		await self._timed_init("database", self.database.setup())
+		await asyncio.gather(
+			self._timed_init("reminders", self.load_reminders()),
+			self._timed_init("season orders", self.load_season_orders()),
+			self._timed_init("autocomplete", self.autocomplete.rebuild()),
+			self._timed_init("access lists", self.access_lists.load(self.database)),
+			self._timed_init("metrics server", self.start_metrics_server()),
+		)
+		self.add_check(self.user_blacklist_check)
+		self.logger.info(f"Initialized in {(time.perf_counter() - start) * 1000:.0f}ms: {format_timings(self.init_times)}")
 
-	async def on_ready(self):
-		print("server successfully started")
-		os.system("cls" if os.name == "nt" else "clear")
-		self.logger.info(f"Logged in as {self.user.name}#{self.user.discriminator}!")
-		await self.database.setup()
+	async def _timed_init(self, name: str, init: Awaitable):
+		start = time.perf_counter()
+		await init
+		self.init_times[name] = time.perf_counter() - start
+
+	async def load_reminders(self):
 		await self.reminders.setup()
+		# loaded here rather than by the reminder loop, so listing reminders works before the bot is ready
+		self.reminder_scheduler.load(await self.reminders.get_reminders())
+
+	async def load_season_orders(self):
+		async def load_order(season_id: str):
+			order_path = Path(f"assets/orders/{season_id}.json")
+			if order_path.is_file():
+				async with aiofiles.open(order_path, "r") as f:
+					self.season_orders[season_id] = OrderPlan(json.loads(await f.read()))
+
+		await asyncio.gather(*(load_order(season_id) for season_id in self.database.available_seasons))
+
+	async def start_metrics_server(self):
+		if METRICS_PORT is None or self.metrics_server is not None:
+			return
+
+		try:
+			self.metrics_server = await start_metrics_server(METRICS_PORT)
+		except OSError as err:
+			self.logger.error(f"Failed to start metrics server on port {METRICS_PORT}", exc_info=err)
+
+	async def on_ready(self):
 		self.anicord = self.get_guild(994071728017899600)
-		async with self.database.connect() as conn:
-			async with conn.execute("SELECT id FROM season") as cursor:
-				season_ids: list[str] = [row["id"] for row in await cursor.fetchall()]
+		if self._ready_once:
+			self.logger.info("Reconnected to Discord")
+			return
 
-			for season_id in season_ids:
-				order_path = Path(f"assets/orders/{season_id}.json")
-				if order_path.is_file():
-					async with aiofiles.open(order_path, "r") as f:
-						self.season_orders[season_id] = json.loads(await f.read())
+		self._ready_once = True
+		print("\x1b[2J\x1b[H", end="", flush=True)  # clears the console without spawning a shell
+		self.logger.info(f"Logged in as {self.user.name}#{self.user.discriminator}!")
+		if self._setup_task is not None:
+			await self._setup_task
 
-		self.add_check(self.user_blacklist_check)
+	async def close(self):
+		await super().close()
+		# queued writes are finished before the connections close
+		await self.database.close()
+
+	async def metrics_before_invoke(self, ctx: commands.Context | discord.ApplicationContext):
+		prefix = "/" if isinstance(ctx, discord.ApplicationContext) else ""
+		self.metrics.start_invocation(f"{prefix}{ctx.command.qualified_name}")
+
+	async def metrics_after_invoke(self, ctx: commands.Context | discord.ApplicationContext):
+		invocation = current_invocation.get()
+		if invocation is None:
+			return
+
+		# after hooks run in a finally block, so a failed command still has its exception in flight here
+		failed = getattr(ctx, "command_failed", False) or sys.exc_info()[1] is not None
+		self.metrics.finish_invocation(invocation, failed=failed)
 
 	async def user_blacklist_check(self, ctx: commands.Context):
 		is_blacklisted, _ = await self.is_blacklisted(ctx, raise_exception=True, ignore_channel=True)
 		return not is_blacklisted
 
+	async def on_member_update(self, before: discord.Member, after: discord.Member):
+		self.resolver.invalidate(after.id)
+
 	async def on_user_update(self, old: discord.User, new: discord.User):
+		self.resolver.invalidate(new.id)
 		if old.name == new.name:
 			return
 
 		async with self.database.connect() as conn:
-			user_id = await get_user_id(conn, old.name)
+			user_id = await get_user_id(conn, old.name, matcher=self.autocomplete.user_matcher)
+
+		if not user_id:
+			return
+
+		async def rename_user(write_conn: aiosqlite.Connection):
+			await write_conn.execute("UPDATE user SET username = ? WHERE id = ?", (new.name, user_id))
+			await write_conn.execute("INSERT OR IGNORE INTO user_alias (username, user_id) VALUES (?, ?)", (old.name, user_id))
 
-			if not user_id:
-				return
+		await self.database.write(rename_user)
 
-			await conn.execute("UPDATE user SET username = ? WHERE id = ?", (new.name, user_id))
-			await conn.execute("INSERT OR IGNORE INTO user_alias (username, user_id) VALUES (?, ?)", (old.name, user_id))
-			await conn.commit()
+		self.database.bump_data_version()
+		await self.autocomplete.rename_user(user_id, old.name, new.name)
 
 	async def is_owner(self, user: discord.abc.User) -> bool:
 		if user.id in OWNER_IDS:
@@ -110,11 +206,11 @@ class NatsuminBot(commands.Bot):
 	async def get_config(self, key: str, *, db_conn: aiosqlite.Connection | None = None) -> str | None:  # Shortcut
 		return await self.database.get_config(key, db_conn=db_conn)
 
-	async def set_config(self, key: str, value: str, *, db_conn: aiosqlite.Connection | None = None):  # Shortcut
-		return await self.database.set_config(key, value, db_conn=db_conn)
+	async def set_config(self, key: str, value: str):  # Shortcut
+		return await self.database.set_config(key, value)
 
-	async def remove_config(self, key: str, *, db_conn: aiosqlite.Connection | None = None) -> bool:  # Shortcut
-		return await self.database.remove_config(key, db_conn=db_conn)
+	async def remove_config(self, key: str) -> bool:  # Shortcut
+		return await self.database.remove_config(key)
 
 	async def is_blacklisted(
 		self, ctx: commands.Context | discord.ApplicationContext | discord.abc.User, *, raise_exception: bool = False, ignore_channel: bool = False
@@ -126,39 +222,31 @@ class NatsuminBot(commands.Bot):
 			if await self.is_owner(ctx):
 				return False, None
 
-		async with self.database.connect() as conn:
-			if isinstance(ctx, (commands.Context, discord.ApplicationContext)):
-				discord_id = ctx.author.id
-
-				if ctx.guild is not None and not ignore_channel:
-					author_perms = ctx.channel.permissions_for(ctx.author)
-					if author_perms and author_perms.administrator:
-						return False, None
-
-					async with conn.execute("SELECT channel_id FROM whitelist_channel WHERE guild_id = ?", (ctx.guild.id,)) as cursor:
-						rows = await cursor.fetchall()
-
-						if rows:
-							valid_channel_ids: list[int] = list(row["channel_id"] for row in rows)
-
-							if ctx.channel.id not in valid_channel_ids:
-								if raise_exception:
-									raise NotWhitelistedChannel(valid_channel_ids)
-								else:
-									return True, None
-			else:
-				discord_id = ctx.id
+		if isinstance(ctx, (commands.Context, discord.ApplicationContext)):
+			discord_id = ctx.author.id
 
-			async with conn.execute("SELECT reason FROM blacklist_user WHERE discord_id = ?", (discord_id,)) as cursor:
-				row = await cursor.fetchone()
+			if ctx.guild is not None and not ignore_channel:
+				author_perms = ctx.channel.permissions_for(ctx.author)
+				if author_perms and author_perms.administrator:
+					return False, None
 
-				if row is not None:
+				valid_channel_ids = self.access_lists.get_whitelisted_channels(ctx.guild.id)
+				if valid_channel_ids and ctx.channel.id not in valid_channel_ids:
 					if raise_exception:
-						raise BlacklistedUser(row["reason"])
+						raise NotWhitelistedChannel(list(valid_channel_ids))
 					else:
-						return True, row["reason"]
+						return True, None
+		else:
+			discord_id = ctx.id
 
-			return False, None
+		if self.access_lists.is_blacklisted(discord_id):
+			reason = self.access_lists.get_blacklist_reason(discord_id)
+			if raise_exception:
+				raise BlacklistedUser(reason)
+			else:
+				return True, reason
+
+		return False, None
 
 	async def fetch_user_from_database(
 		self,
@@ -187,11 +275,8 @@ class NatsuminBot(commands.Bot):
 			elif user.isdigit():
 				discord_id = int(user)
 
-			if self.anicord and discord_id:
-				discord_user = await self.anicord.get_or_fetch(discord.Member, discord_id)
-
-			if not discord_user and discord_id:
-				discord_user = await self.get_or_fetch(discord.User, discord_id)  # lol
+			if discord_id:
+				discord_user = await self.resolver.resolve(discord_id)
 
 			if discord_user:
 				user = discord_user.name
@@ -200,7 +285,7 @@ class NatsuminBot(commands.Bot):
 			user = discord_user.name
 
 		async with self.database.connect(db_conn) as conn:
-			user_id = await get_user_id(conn, user, score_cutoff=90)
+			user_id = await get_user_id(conn, user, score_cutoff=90, matcher=self.autocomplete.user_matcher)
 
 			if user_id is None:
 				return None, None
@@ -236,15 +321,9 @@ class NatsuminBot(commands.Bot):
 						return None, None
 
 			if discord_user is None:
-				async with conn.execute("SELECT discord_id FROM user WHERE id = ?", (user_id,)) as cursor:
-					row = await cursor.fetchone()
-					user_discord_id: int | None = row["discord_id"] if row is not None else None
-
-				if user_discord_id is not None and self.anicord:
-					discord_user = await self.anicord.get_or_fetch(discord.Member, user_discord_id)
-
-				if discord_user is None and user_discord_id:
-					discord_user = await self.get_or_fetch(discord.User, user_discord_id)
+				user_discord_id = await self.resolver.get_discord_id(user_id, db_conn=conn)
+				if user_discord_id is not None:
+					discord_user = await self.resolver.resolve(user_discord_id)
 
 		return user_id, discord_user
 
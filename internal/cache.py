@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, is_dataclass
+from typing import TYPE_CHECKING, Any
+from collections import OrderedDict
+
+import sys
+
+if TYPE_CHECKING:
+	from collections.abc import Awaitable, Callable, Hashable
+
+RENDER_CACHE_MAX_BYTES = 16 * 1024 * 1024
+RENDER_CACHE_MAX_ENTRIES = 4096
+
+
+def estimate_size(value: Any) -> int:
+	"""Rough deep size of a cached value, only follows the containers render results are made of."""
+	size = sys.getsizeof(value)
+	if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+		return size
+	if isinstance(value, dict):
+		return size + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+	if isinstance(value, (list, tuple, set, frozenset)):
+		return size + sum(estimate_size(item) for item in value)
+	if is_dataclass(value):
+		return size + sum(estimate_size(getattr(value, field.name)) for field in fields(value))
+
+	return size
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class RenderedView:
+	"""
+	Everything a view renders from database data, without the time dependant deadline footer.
+
+	`not_found` is set instead of the content when the view had nothing to show, `self_footer` is the footer
+	worded for `owner_name` looking at their own data so both phrasings share one entry.
+	"""
+
+	not_found: str | None = None
+	header: str = ""
+	body: tuple[str, ...] = ()
+	footer: tuple[str, ...] = ()
+	self_footer: tuple[str, ...] = ()
+	owner_name: str | None = None
+	thumbnail_url: str | None = None
+	color: int | None = None
+	flags: frozenset[str] = frozenset()
+
+
+class RenderCache:
+	"""
+	LRU cache of rendered content, capped by both entry count and an estimated memory size.
+
+	Keys should include a data version so that writes naturally make old entries unreachable.
+	"""
+
+	def __init__(self, *, max_bytes: int = RENDER_CACHE_MAX_BYTES, max_entries: int = RENDER_CACHE_MAX_ENTRIES):
+		self.max_bytes = max_bytes
+		self.max_entries = max_entries
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+
+		self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def get(self, key: Hashable) -> Any | None:
+		entry = self._entries.get(key)
+		if entry is None:
+			self.misses += 1
+			return None
+
+		self._entries.move_to_end(key)
+		self.hits += 1
+		return entry[0]
+
+	def set(self, key: Hashable, value: Any):
+		size = estimate_size(value)
+		if size > self.max_bytes:
+			return
+
+		if (previous := self._entries.pop(key, None)) is not None:
+			self.size -= previous[1]
+
+		self._entries[key] = (value, size)
+		self.size += size
+
+		while self._entries and (self.size > self.max_bytes or len(self._entries) > self.max_entries):
+			_, (_, evicted_size) = self._entries.popitem(last=False)
+			self.size -= evicted_size
+
+	def clear(self):
+		self._entries.clear()
+		self.size = 0
+
+	async def get_or_render[T](self, key: Hashable, render: Callable[[], Awaitable[T]]) -> T:
+		value = self.get(key)
+		if value is None:
+			value = await render()
+			self.set(key, value)
+
+		return value
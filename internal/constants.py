@@ -1,13 +1,36 @@
-import discord
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import logging
 import time
 
+if TYPE_CHECKING:
+	import discord
+
 FILE_LOGGING_FORMATTER = logging.Formatter("[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s", "%Y-%m-%d %H:%M:%S")
 FILE_LOGGING_FORMATTER.converter = time.gmtime
 CONSOLE_LOGGING_FORMATTER = logging.Formatter("[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s", "%H:%M:%S")
 CONSOLE_LOGGING_FORMATTER.converter = time.gmtime
 
 
+class _LazyColour:
+	"""Creates the `discord.Colour` on first access, so importing the logging formatters from here doesn't import discord."""
+
+	def __init__(self, value: int):
+		self.value = value
+
+	def __set_name__(self, owner: type, name: str):
+		self.name = name
+
+	def __get__(self, instance: object, owner: type) -> discord.Colour:
+		import discord
+
+		colour = discord.Colour(self.value)
+		setattr(owner, self.name, colour)  # replaces the descriptor, later reads are plain attribute lookups
+		return colour
+
+
 class COLORS:
-	DEFAULT = discord.Colour(0x434F5D)
-	ERROR = discord.Colour(0xE74C3C)
+	DEFAULT = _LazyColour(0x434F5D)
+	ERROR = _LazyColour(0xE74C3C)
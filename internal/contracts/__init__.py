@@ -1,30 +1,97 @@
 from __future__ import annotations
 
-from internal.contracts.seasons import SeasonX
-from internal.functions import diff_to_str
+from internal.contracts.loaders import DeadlineData, format_deadline_footer, load_deadline
+from internal.metrics import SyncReport, SyncPhase, current_sync_report
+from internal.contracts.seasons import SEASON_MODULES, load_season
 from typing import TYPE_CHECKING
 
-import aiosqlite
-import datetime
-import discord
+import json
 import time
 
 if TYPE_CHECKING:
 	from internal.database import NatsuminDatabase
 	from internal.base.bot import NatsuminBot
 
+	import aiosqlite
+	import discord
 
-async def sync_season(database: NatsuminDatabase, season_id: str) -> float:
+
+SYNC_RUN_HISTORY = 500
+
+
+async def sync_season(database: NatsuminDatabase, season_id: str) -> SyncReport:
+	"""Sync a season from its sheets, the per phase report is also stored in `sync_run` whether the sync succeeds or not."""
 	if season_id not in database.available_seasons:
 		raise ValueError(f"Invalid season: {season_id}")
 
+	report = SyncReport(season_id=season_id)
+	token = current_sync_report.set(report)
 	start = time.perf_counter()
 
-	match season_id:
-		case "season_x":
-			await SeasonX.sync_season(database)
+	try:
+		if season_id in SEASON_MODULES:
+			await load_season(season_id).sync_season(database)
+
+		database.bump_data_version(season_id)
+	except Exception as err:
+		report.error = f"{err.__class__.__name__}: {err}"
+		raise
+	finally:
+		report.duration = time.perf_counter() - start
+		current_sync_report.reset(token)
+		await save_sync_report(database, report)
+
+	return report
+
+
+async def save_sync_report(database: NatsuminDatabase, report: SyncReport):
+	async def insert_report(conn: aiosqlite.Connection):
+		async with conn.execute(
+			"INSERT INTO sync_run (season_id, started_at, duration, status, error, phases) VALUES (?, ?, ?, ?, ?, ?)",
+			(
+				report.season_id,
+				report.started_at,
+				report.duration,
+				report.status,
+				report.error,
+				json.dumps([phase.to_dict() for phase in report.phases.values()]),
+			),
+		) as cursor:
+			report.id = cursor.lastrowid
+
+		await conn.execute("DELETE FROM sync_run WHERE id <= ?", (report.id - SYNC_RUN_HISTORY,))
+
+	await database.write(insert_report)
 
-	return time.perf_counter() - start
+
+def _row_to_sync_report(row: aiosqlite.Row) -> SyncReport:
+	phases = (SyncPhase.from_dict(data) for data in json.loads(row["phases"]))
+	return SyncReport(
+		id=row["id"],
+		season_id=row["season_id"],
+		started_at=row["started_at"],
+		duration=row["duration"],
+		error=row["error"],
+		phases={phase.name: phase for phase in phases},
+	)
+
+
+async def get_sync_history(database: NatsuminDatabase, *, season_id: str | None = None, limit: int = 10) -> list[SyncReport]:
+	"""Latest sync runs first, optionally only of one season."""
+	async with database.connect() as conn:
+		async with conn.execute(
+			"SELECT * FROM sync_run WHERE ?1 IS NULL OR season_id = ?1 ORDER BY id DESC LIMIT ?2",
+			(season_id, limit),
+		) as cursor:
+			return [_row_to_sync_report(row) for row in await cursor.fetchall()]
+
+
+async def get_sync_run(database: NatsuminDatabase, run_id: int) -> SyncReport | None:
+	async with database.connect() as conn:
+		async with conn.execute("SELECT * FROM sync_run WHERE id = ?", (run_id,)) as cursor:
+			row = await cursor.fetchone()
+
+	return _row_to_sync_report(row) if row else None
 
 
 async def get_deadline_footer(database: NatsuminDatabase, season_id: str, *, db_conn: aiosqlite.Connection = None) -> str:
@@ -32,68 +99,37 @@ async def get_deadline_footer(database: NatsuminDatabase, season_id: str, *, db_
 		raise ValueError(f"Invalid season: {season_id}")
 
 	async with database.connect(db_conn) as conn:
-		active_season = await database.get_config("contracts.active_season", db_conn=conn)
-		if active_season is None:
-			raise RuntimeError("Active season not found!")
+		return format_deadline_footer(await load_deadline(conn, season_id))
 
-		deadline_datetime = await database.get_config("contracts.deadline_datetime", db_conn=conn)
-		deadline_datetime = datetime.datetime.fromisoformat(deadline_datetime) if deadline_datetime else None
 
-		deadline_footer = await database.get_config("contracts.deadline_footer", db_conn=conn)
-		if deadline_footer is None:
-			deadline_footer = "Season deadline in {time_till}."
+def _deadline_cache_key(database: NatsuminDatabase, season_id: str) -> tuple:
+	return ("deadline", season_id, database.config_version, database.get_data_version(season_id))
 
-		async with conn.execute("SELECT name FROM season WHERE id = ?", (season_id,)) as cursor:
-			season_name: str = (await cursor.fetchone())["name"]
 
-		if season_id == active_season:
-			if deadline_datetime is None:
-				return f"Deadline for {season_name} unknown."
+def prime_deadline_cache(bot: NatsuminBot, deadline: DeadlineData):
+	"""Store deadline data a view loader already fetched, so the footer of cached views doesn't need a query."""
+	bot.render_cache.set(_deadline_cache_key(bot.database, deadline.season_id), deadline)
 
-			current_datetime = datetime.datetime.now(datetime.UTC)
-			difference = deadline_datetime - current_datetime
-			difference_seconds = max(difference.total_seconds(), 0)
 
-			if difference_seconds > 0:
-				return deadline_footer.format(time_till=diff_to_str(deadline_datetime, current_datetime, include_seconds=False))
-			else:
-				season_ended_footer = await database.get_config("contracts.season_ended_footer", db_conn=conn)
-				if season_ended_footer is None:
-					season_ended_footer = "{season_name} has ended."
+async def get_cached_deadline_footer(bot: NatsuminBot, season_id: str) -> str:
+	"""Same as `get_deadline_footer` but the deadline data is cached, only the time remaining is formatted on every call."""
 
-				return season_ended_footer.format(season_name=season_name)
-		else:
-			archived_season_footer = await database.get_config("contracts.archived_season_footer", db_conn=conn)
-			if archived_season_footer is None:
-				archived_season_footer = "Archived data from {season_name}."
+	async def load() -> DeadlineData:
+		async with bot.database.connect() as conn:
+			return await load_deadline(conn, season_id)
 
-			return archived_season_footer.format(season_name=season_name)
+	deadline: DeadlineData = await bot.render_cache.get_or_render(_deadline_cache_key(bot.database, season_id), load)
+	return format_deadline_footer(deadline)
 
 
 async def season_autocomplete(ctx: discord.AutocompleteContext) -> list[discord.OptionChoice]:
 	bot: NatsuminBot = ctx.bot
-	async with bot.database.connect() as conn:
-		async with conn.execute("SELECT id, name FROM season WHERE id LIKE ?1 OR name LIKE ?1", (f"%{ctx.value.strip()}%",)) as cursor:
-			season_list = [discord.OptionChoice(name=row["name"], value=row["id"]) for row in await cursor.fetchall()]
-
-	return season_list
+	return bot.autocomplete.search_seasons(ctx.value)
 
 
 def usernames_autocomplete(seasonal: bool = True):
 	async def callback(ctx: discord.AutocompleteContext) -> list[str]:
 		bot: NatsuminBot = ctx.bot
-		async with bot.database.connect() as conn:
-			params = []
-			query = "SELECT username FROM user WHERE username LIKE ?"
-			if seasonal:
-				query = "SELECT u.username FROM season_user su JOIN user u ON su.user_id = u.id WHERE su.season_id = ? AND u.username LIKE ?"
-				params.append(await bot.get_config("contracts.active_season", db_conn=conn))
-			query += " LIMIT 25"
-			params.append(f"%{ctx.value.strip()}%")
-
-			async with conn.execute(query, params) as cursor:
-				username_list: list[str] = [row["username"] for row in await cursor.fetchall()]
-
-		return username_list
+		return bot.autocomplete.search_usernames(ctx.value, seasonal=seasonal)
 
 	return callback
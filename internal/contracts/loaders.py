@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+from internal.enums import UserKind, UserStatus, ContractKind, ContractStatus
+from internal.functions import diff_to_str
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import datetime
+import json
+
+if TYPE_CHECKING:
+	import aiosqlite
+
+DEADLINE_CONFIG_KEYS = (
+	"contracts.active_season",
+	"contracts.deadline_datetime",
+	"contracts.deadline_footer",
+	"contracts.season_ended_footer",
+	"contracts.archived_season_footer",
+)
+
+# scalar subqueries appended to every loader query so the deadline footer doesn't need its own round trip
+DEADLINE_COLUMNS = f"""
+	(SELECT name FROM season WHERE id = :season_id) AS deadline_season_name,
+	(SELECT json_group_object(key, value) FROM bot_config WHERE key IN ({", ".join(f"'{key}'" for key in DEADLINE_CONFIG_KEYS)})) AS deadline_config
+"""
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class DeadlineData:
+	season_id: str
+	season_name: str
+	active_season: str | None
+	deadline_datetime: datetime.datetime | None
+	deadline_footer: str
+	season_ended_footer: str
+	archived_season_footer: str
+
+	@classmethod
+	def from_row(cls, season_id: str, row: aiosqlite.Row | dict[str, Any]) -> DeadlineData:
+		config: dict[str, str] = json.loads(row["deadline_config"] or "{}")
+		deadline_datetime = config.get("contracts.deadline_datetime")
+
+		return cls(
+			season_id=season_id,
+			season_name=row["deadline_season_name"],
+			active_season=config.get("contracts.active_season"),
+			deadline_datetime=datetime.datetime.fromisoformat(deadline_datetime) if deadline_datetime else None,
+			deadline_footer=config.get("contracts.deadline_footer", "Season deadline in {time_till}."),
+			season_ended_footer=config.get("contracts.season_ended_footer", "{season_name} has ended."),
+			archived_season_footer=config.get("contracts.archived_season_footer", "Archived data from {season_name}."),
+		)
+
+
+def format_deadline_footer(data: DeadlineData, current_datetime: datetime.datetime | None = None) -> str:
+	if data.active_season is None:
+		raise RuntimeError("Active season not found!")
+
+	if data.season_id != data.active_season:
+		return data.archived_season_footer.format(season_name=data.season_name)
+
+	if data.deadline_datetime is None:
+		return f"Deadline for {data.season_name} unknown."
+
+	current_datetime = current_datetime or datetime.datetime.now(datetime.UTC)
+	if (data.deadline_datetime - current_datetime).total_seconds() > 0:
+		return data.deadline_footer.format(time_till=diff_to_str(data.deadline_datetime, current_datetime, include_seconds=False))
+
+	return data.season_ended_footer.format(season_name=data.season_name)
+
+
+async def load_deadline(conn: aiosqlite.Connection, season_id: str) -> DeadlineData:
+	async with conn.execute(f"SELECT {DEADLINE_COLUMNS}", {"season_id": season_id}) as cursor:
+		return DeadlineData.from_row(season_id, await cursor.fetchone())
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class SeasonProfileData:
+	user: dict[str, Any]
+	contractor_username: str | None
+	contractees: tuple[str, ...]
+	deadline: DeadlineData
+
+
+SEASON_PROFILE_QUERY = f"""
+	SELECT
+		u.username, u.discord_id, su.*,
+		cu.username AS contractor_username,
+		(
+			SELECT json_group_array(username) FROM (
+				SELECT ceu.username
+				FROM season_user ce
+				JOIN user ceu ON ce.user_id = ceu.id
+				WHERE ce.season_id = su.season_id AND ce.contractor_id = su.user_id
+				ORDER BY ceu.username
+			)
+		) AS contractees,
+		{DEADLINE_COLUMNS}
+	FROM season_user su
+	JOIN user u ON su.user_id = u.id
+	LEFT JOIN user cu ON su.contractor_id = cu.id
+	WHERE su.season_id = :season_id AND su.user_id = :user_id
+"""
+
+
+async def load_season_profile(conn: aiosqlite.Connection, season_id: str, user_id: str) -> SeasonProfileData | None:
+	async with conn.execute(SEASON_PROFILE_QUERY, {"season_id": season_id, "user_id": user_id}) as cursor:
+		row = await cursor.fetchone()
+
+	if row is None:
+		return None
+
+	return SeasonProfileData(
+		user=dict(row),
+		contractor_username=row["contractor_username"],
+		contractees=tuple(json.loads(row["contractees"])),
+		deadline=DeadlineData.from_row(season_id, row),
+	)
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class FantasyMemberData:
+	slot: int
+	user_id: str
+	score: int
+	username: str | None
+	discord_id: int | None
+	status: int | None
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class FantasyProfileData:
+	user: dict[str, Any]
+	members: tuple[FantasyMemberData, ...]
+	deadline: DeadlineData
+
+
+FANTASY_PROFILE_QUERY = f"""
+	SELECT
+		suf.total_score, u.username, u.discord_id, su.status,
+		(
+			SELECT json_group_array(json_object('slot', slot, 'user_id', user_id, 'score', score, 'username', username, 'discord_id', discord_id, 'status', status))
+			FROM (
+				SELECT
+					m.key + 1 AS slot,
+					m.value AS user_id,
+					json_extract(json_array(suf.member1_score, suf.member2_score, suf.member3_score, suf.member4_score, suf.member5_score), '$[' || m.key || ']') AS score,
+					mu.username, mu.discord_id, msu.status
+				FROM json_each(json_array(suf.member1_id, suf.member2_id, suf.member3_id, suf.member4_id, suf.member5_id)) m
+				LEFT JOIN season_user msu ON msu.season_id = suf.season_id AND msu.user_id = m.value
+				LEFT JOIN user mu ON mu.id = m.value
+				ORDER BY m.key
+			)
+		) AS members,
+		{DEADLINE_COLUMNS}
+	FROM season_user_fantasy suf
+	LEFT JOIN season_user su ON su.season_id = suf.season_id AND su.user_id = suf.user_id
+	LEFT JOIN user u ON u.id = suf.user_id
+	WHERE suf.season_id = :season_id AND suf.user_id = :user_id
+"""
+
+
+async def load_fantasy_profile(conn: aiosqlite.Connection, season_id: str, user_id: str) -> FantasyProfileData | None:
+	async with conn.execute(FANTASY_PROFILE_QUERY, {"season_id": season_id, "user_id": user_id}) as cursor:
+		row = await cursor.fetchone()
+
+	if row is None:
+		return None
+
+	return FantasyProfileData(
+		user=dict(row),
+		members=tuple(FantasyMemberData(**member) for member in json.loads(row["members"])),
+		deadline=DeadlineData.from_row(season_id, row),
+	)
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class SeasonContractsData:
+	user: dict[str, Any]
+	contractor_username: str | None
+	contracts: dict[str, dict[str, Any]]
+	deadline: DeadlineData
+
+	@property
+	def contracts_with_reviews(self) -> int:
+		return sum(1 for contract in self.contracts.values() if contract["review_url"])
+
+
+SEASON_CONTRACTS_QUERY = f"""
+	SELECT
+		u.username, u.discord_id, su.contractor_id, su.status, su.kind,
+		cu.username AS contractor_username,
+		(
+			SELECT json_group_array(
+				json_object('name', sc.name, 'type', sc.type, 'kind', sc.kind, 'status', sc.status, 'optional', sc.optional, 'review_url', sc.review_url)
+			)
+			FROM season_contract sc
+			WHERE sc.season_id = su.season_id AND sc.contractee_id = su.user_id
+		) AS contracts,
+		{DEADLINE_COLUMNS}
+	FROM season_user su
+	JOIN user u ON su.user_id = u.id
+	LEFT JOIN user cu ON su.contractor_id = cu.id
+	WHERE su.season_id = :season_id AND su.user_id = :user_id
+"""
+
+
+async def load_season_contracts(conn: aiosqlite.Connection, season_id: str, user_id: str) -> SeasonContractsData | None:
+	async with conn.execute(SEASON_CONTRACTS_QUERY, {"season_id": season_id, "user_id": user_id}) as cursor:
+		row = await cursor.fetchone()
+
+	if row is None:
+		return None
+
+	return SeasonContractsData(
+		user=dict(row),
+		contractor_username=row["contractor_username"],
+		contracts={contract["type"]: contract for contract in json.loads(row["contracts"])},
+		deadline=DeadlineData.from_row(season_id, row),
+	)
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class ContractInfoData:
+	contract: dict[str, Any]
+	media: dict[str, Any] | None
+	deadline: DeadlineData
+
+
+CONTRACT_INFO_QUERY = f"""
+	SELECT
+		sc.*,
+		m.name AS media_name, m.description AS media_description, m.medium AS media_medium, m.url AS media_url,
+		ma.cover_color, ma.cover_image, ma.is_adult, ms.header_image,
+		{DEADLINE_COLUMNS}
+	FROM season_contract sc
+	LEFT JOIN media m ON m.type = sc.media_type AND m.id = sc.media_id
+	LEFT JOIN media_anilist ma ON sc.media_type = 'anilist' AND ma.id = sc.media_id
+	LEFT JOIN media_steam ms ON sc.media_type = 'steam' AND ms.id = sc.media_id
+	WHERE sc.season_id = :season_id AND sc.contractee_id = :user_id AND sc.type LIKE :contract_type
+"""
+
+
+async def load_contract_info(conn: aiosqlite.Connection, season_id: str, user_id: str, contract_type: str) -> ContractInfoData | None:
+	async with conn.execute(CONTRACT_INFO_QUERY, {"season_id": season_id, "user_id": user_id, "contract_type": contract_type}) as cursor:
+		row = await cursor.fetchone()
+
+	if row is None:
+		return None
+
+	row = dict(row)
+	media = None
+	if row["media_type"] in ("anilist", "steam") and row["media_name"] is not None:
+		media = {
+			"name": row["media_name"],
+			"description": row["media_description"],
+			"medium": row["media_medium"],
+			"url": row["media_url"],
+			"cover_color": row["cover_color"],
+			"cover_image": row["cover_image"],
+			"is_adult": bool(row["is_adult"]),
+			"header_image": row["header_image"],
+		}
+
+	return ContractInfoData(contract=row, media=media, deadline=DeadlineData.from_row(season_id, row))
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class SeasonStatsData:
+	season_name: str
+	users: tuple[int, int]
+	contracts: tuple[int, int]
+	aid_contracts: tuple[int, int]
+	type_completions: dict[str, tuple[int, int]]
+
+
+async def load_season_stats(conn: aiosqlite.Connection, season_id: str, rep: str | None = None) -> SeasonStatsData:
+	"""Passed/total counts of a season, optionally only of one rep."""
+	async with conn.execute("SELECT name FROM season WHERE id = ?", (season_id,)) as cursor:
+		row = await cursor.fetchone()
+		season_name = row["name"]
+
+	query = f"""
+		SELECT
+			SUM(su.kind = ?3 AND su.status = ?2) AS normal_passed,
+			SUM(su.kind = ?3) AS normal_total
+		FROM season_user su
+		WHERE su.season_id = ?1 {"AND su.rep = ?4" if rep else ""}
+	"""
+	params = [season_id, UserStatus.PASSED.value, UserKind.NORMAL.value]
+	if rep:
+		params.append(rep)
+	async with conn.execute(query, params) as cursor:
+		row = await cursor.fetchone()
+		users_count: tuple[int, int] = (row["normal_passed"], row["normal_total"])
+
+	query = f"""
+		SELECT
+			SUM(sc.kind = ?3 AND sc.status = ?2) AS normal_passed,
+			SUM(sc.kind = ?3) AS normal_total,
+			SUM(sc.kind = ?4 AND sc.status = ?2) AS aid_passed,
+			SUM(sc.kind = ?4) AS aid_total
+		FROM season_contract sc
+		JOIN season_user su ON 
+			su.user_id = sc.contractee_id AND su.season_id = sc.season_id
+		WHERE 
+			sc.season_id = ?1 
+			AND sc.optional = 0 
+			{"AND su.rep = ?5" if rep else ""}
+	"""
+	params = [season_id, ContractStatus.PASSED.value, ContractKind.NORMAL.value, ContractKind.AID.value]
+	if rep:
+		params.append(rep)
+	async with conn.execute(query, params) as cursor:
+		row = await cursor.fetchone()
+		contracts_count: tuple[int, int] = (row["normal_passed"], row["normal_total"])
+		aid_contracts_count: tuple[int, int] = (row["aid_passed"], row["aid_total"])
+
+	query = f"""
+		SELECT
+			sc.type,
+			SUM(sc.status = ?2) AS passed,
+			COUNT(*) AS total
+		FROM season_contract sc
+		{"JOIN season_user su ON su.user_id = sc.contractee_id AND su.season_id = sc.season_id" if rep else ""}
+		WHERE sc.season_id = ?1 {"AND su.rep = ?3" if rep else ""}
+		GROUP BY sc.type
+	"""
+	params = [season_id, ContractStatus.PASSED]
+	if rep:
+		params.append(rep)
+	async with conn.execute(query, params) as cursor:
+		type_completions: dict[str, tuple[int, int]] = {row["type"]: (row["passed"], row["total"]) for row in await cursor.fetchall()}
+
+	return SeasonStatsData(
+		season_name=season_name,
+		users=users_count,
+		contracts=contracts_count,
+		aid_contracts=aid_contracts_count,
+		type_completions=type_completions,
+	)
+
+
+USER_BADGE_LEADERBOARD_QUERY = """
+	SELECT
+		u.username,
+		u.discord_id,
+		COUNT(ub.badge_id) AS badge_count
+	FROM user u
+	JOIN user_badge ub ON 
+		ub.user_id = u.id
+	GROUP BY u.id, u.username
+	ORDER BY badge_count DESC, u.username ASC
+"""
+
+BADGE_LEADERBOARD_QUERY = """
+	SELECT
+		b.name,
+		COUNT(ub.user_id) AS user_count
+	FROM badge b
+	LEFT JOIN user_badge ub
+		ON ub.badge_id = b.id
+	GROUP BY b.id, b.name
+	ORDER BY user_count DESC, b.created_at DESC, b.name ASC
+"""
+
+
+async def load_user_badge_leaderboard(conn: aiosqlite.Connection) -> list[tuple[str, int | None, int]]:
+	"""(username, discord_id, badge_count) of every user with a badge, most badges first."""
+	async with conn.execute(USER_BADGE_LEADERBOARD_QUERY) as cursor:
+		return [(row["username"], row["discord_id"], row["badge_count"]) for row in await cursor.fetchall()]
+
+
+async def load_badge_leaderboard(conn: aiosqlite.Connection) -> list[tuple[str, int]]:
+	"""(badge name, user_count) of every badge, most owned first."""
+	async with conn.execute(BADGE_LEADERBOARD_QUERY) as cursor:
+		return [(row["name"], row["user_count"]) for row in await cursor.fetchall()]
@@ -1,7 +1,15 @@
-from typing import TypedDict, Literal
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, TypedDict, Literal
 
 import re
 
+if TYPE_CHECKING:
+	from collections.abc import Iterable
+
+ORDER_PLAN_CACHE_SIZE = 1024
+LAST_NUMBER_PATTERN = re.compile(r"\d+$")
+
 
 class OrderType(TypedDict):
 	type: Literal["regex"]
@@ -28,35 +36,88 @@ class SortedOrderCategory(TypedDict):  # im great at naming
 	types: list[str]
 
 
-def sort_contract_types(contract_types: list[str], order_data: list[OrderCategory]) -> list[SortedOrderCategory]:
-	result: list[SortedOrderCategory] = []
-	used: set[str] = set()
+class OrderPlan:
+	"""
+	Precompiled form of a season's order file.
+
+	Every contract type is classified once into a (category, rule, number) sort key, cached by its lowercase name,
+	and full sort results are memoized per input sequence of types.
+	"""
+
+	def __init__(self, order_data: list[OrderCategory]):
+		self.category_names: tuple[str, ...] = tuple(category["name"] for category in order_data)
+
+		self._exact_rules: dict[str, tuple[int, int]] = {}
+		self._regex_rules: list[tuple[int, int, re.Pattern[str], bool]] = []
+		for category_index, category in enumerate(order_data):
+			for rule_index, rule in enumerate(category["order"]):
+				if isinstance(rule, str):
+					self._exact_rules.setdefault(rule.lower(), (category_index, rule_index))
+				elif rule["type"] == "regex":
+					self._regex_rules.append(
+						(category_index, rule_index, re.compile(rule["pattern"], re.IGNORECASE), rule.get("order_by") == "last_number")
+					)
+
+		self._keys: dict[str, tuple[int, int, int] | None] = {}
+		self._results: dict[tuple[str, ...], list[SortedOrderCategory]] = {}
+
+	def _classify(self, contract_type: str) -> tuple[int, int, int] | None:
+		lowered = contract_type.lower()
+		if lowered in self._keys:
+			return self._keys[lowered]
+
+		# same precedence as walking the order file, the first category and rule that matches wins
+		key: tuple[int, int, int] | None = None
+		if (exact := self._exact_rules.get(lowered)) is not None:
+			key = (*exact, 0)
+
+		for category_index, rule_index, pattern, by_last_number in self._regex_rules:
+			if key is not None and (category_index, rule_index) > key[:2]:
+				break
+			if pattern.fullmatch(contract_type):
+				number = 0
+				if by_last_number and (match := LAST_NUMBER_PATTERN.search(contract_type)):
+					number = int(match.group())
+				key = (category_index, rule_index, number)
+				break
+
+		self._keys[lowered] = key
+		return key
+
+	def sort(self, contract_types: Iterable[str]) -> list[SortedOrderCategory]:
+		"""Group and sort contract types into categories, the returned list is shared between calls and should not be mutated."""
+		contract_types = tuple(contract_types)
+		if (result := self._results.get(contract_types)) is not None:
+			return result
+
+		categories: list[list[tuple[tuple[int, int, int], str]]] = [[] for _ in self.category_names]
+		other: list[str] = []
+		for index, contract_type in enumerate(contract_types):
+			key = self._classify(contract_type)
+			if key is None:
+				other.append(contract_type)
+			else:
+				categories[key[0]].append(((key[1], key[2], index), contract_type))
 
-	for category in order_data:
-		matched: list[str] = []
+		result = [
+			{"name": name, "types": [contract_type for _, contract_type in sorted(matched)]}
+			for name, matched in zip(self.category_names, categories)
+			if matched
+		]
+		if other:
+			result.append({"name": "Other", "types": other})
 
-		for rule in category["order"]:
-			if isinstance(rule, str):
-				for ct in contract_types:
-					if ct.lower() == rule.lower() and ct not in used:
-						matched.append(ct)
-						used.add(ct)
-			else:
-				if rule["type"] == "regex":
-					regex_matches = [ct for ct in contract_types if ct not in used and re.fullmatch(rule["pattern"], ct, re.IGNORECASE)]
+		if len(self._results) >= ORDER_PLAN_CACHE_SIZE:
+			self._results.clear()
+		self._results[contract_types] = result
+		return result
 
-					if rule.get("order_by") == "last_number":
-						regex_matches.sort(key=lambda s: int(re.search(r"\d+$", s).group()))
 
-					for ct in regex_matches:
-						matched.append(ct)
-						used.add(ct)
+EMPTY_ORDER_PLAN = OrderPlan([])
 
-		if matched:
-			result.append({"name": category["name"], "types": matched})
 
-	other = [ct for ct in contract_types if ct not in used]
-	if other:
-		result.append({"name": "Other", "types": other})
+def sort_contract_types(contract_types: Iterable[str], order: OrderPlan | list[OrderCategory]) -> list[SortedOrderCategory]:
+	if not isinstance(order, OrderPlan):
+		order = OrderPlan(order)
 
-	return result
+	return order.sort(contract_types)
@@ -1,6 +1,7 @@
-from enum import StrEnum
-from thefuzz import process
+from internal.matching import FuzzyMatcher, process_choice
 from typing import overload, Literal, Union
+from functools import lru_cache
+from enum import StrEnum
 
 # jesus christ its insane how many times a name is written differently on these sheets,
 # anyway this script basically only has 1 useful thing, get_rep, which attempts to get
@@ -105,13 +106,75 @@ ALTERNATIVE_NAMES: dict[RepName, list[str]] = {
 	RepName.NOKOTAN: ["my deer friend nokotan", "shikanoko nokonoko koshitantan"],
 }
 
-rep_fuzzy_choices: dict[str, RepName] = {}
-for rep in RepName:
-	rep_fuzzy_choices[rep.value.lower()] = rep
-	rep_fuzzy_choices[rep.name.lower()] = rep
+REP_MATCH_CACHE_SIZE = 512
+
+
+def build_rep_choices(reps: list[RepName]) -> dict[str, RepName]:
+	choices: dict[str, RepName] = {}
+	for rep in reps:
+		if isinstance(rep, str):
+			rep = RepName(rep)
+		choices[rep.value.lower()] = rep
+		choices[rep.name.lower()] = rep
+
+		for alt in ALTERNATIVE_NAMES.get(rep, []):
+			choices[alt.lower()] = rep
+
+	return choices
+
+
+rep_fuzzy_choices = build_rep_choices(list(RepName))
+
+
+class RepMatcher:
+	"""
+	Matches names written on the sheets to a rep.
+
+	Exact names and aliases are a dict lookup, everything else is fuzzy matched against every choice at once,
+	with the most recent queries cached.
+	"""
+
+	def __init__(self, choices: dict[str, RepName]):
+		self._exact: dict[str, RepName] = {}
+		for choice, rep in choices.items():
+			self._exact.setdefault(choice, rep)
+			if processed := process_choice(choice):
+				self._exact.setdefault(processed, rep)
+
+		self._fuzzy = FuzzyMatcher(choices.items())
+		self.match = lru_cache(maxsize=REP_MATCH_CACHE_SIZE)(self._match)
+
+	def _match(self, name: str) -> tuple[RepName | None, int | None]:
+		"""Best match for a name regardless of confidence."""
+		lowered = name.lower()
+		if (rep := self._exact.get(lowered)) is not None:
+			return rep, 100
+
+		if (rep := self._exact.get(process_choice(lowered))) is not None:
+			return rep, 100
+
+		result = self._fuzzy.extract_one(lowered)
+		if result is None:
+			return None, None
+
+		return result[0], result[1]
+
+
+_rep_matcher = RepMatcher(rep_fuzzy_choices)
+_filtered_rep_matchers: dict[frozenset[RepName], RepMatcher] = {}
+
+
+def get_rep_matcher(only_include_reps: list[RepName] | None = None) -> RepMatcher:
+	"""Matcher over every rep, or a cached one limited to `only_include_reps`."""
+	if only_include_reps is None:
+		return _rep_matcher
+
+	reps = frozenset(RepName(rep) for rep in only_include_reps)
+	matcher = _filtered_rep_matchers.get(reps)
+	if matcher is None:
+		matcher = _filtered_rep_matchers[reps] = RepMatcher(build_rep_choices(list(only_include_reps)))
 
-	for alt in ALTERNATIVE_NAMES.get(rep, []):
-		rep_fuzzy_choices[alt.lower()] = rep
+	return matcher
 
 
 # python typing sucks what the hell is all of this it makes my head hurt when i look at it
@@ -129,25 +192,9 @@ def get_rep(
 	if name is None:
 		return (None, None) if include_confidence else None
 
-	if only_include_reps is not None:  # incase you only want to match the name from a specific list of reps instead of all
-		new_choices: dict[str, RepName] = {}
-		for rep in only_include_reps:
-			if isinstance(rep, str):
-				rep = RepName(rep)
-			new_choices[rep.value.lower()] = rep
-			new_choices[rep.name.lower()] = rep
-			for alt in ALTERNATIVE_NAMES.get(rep, []):
-				new_choices[alt.lower()] = rep
-		choices = new_choices
-	else:
-		choices = rep_fuzzy_choices
-
-	fuzzy_results: list[tuple[str, int]] = process.extract(name.lower(), [k for k in choices.keys()], limit=1)
-	if fuzzy_results:
-		rep_name, confidence = fuzzy_results[0]
-		if confidence >= min_confidence:
-			found_rep = choices[rep_name]
-			return (found_rep, confidence) if include_confidence else found_rep
+	found_rep, confidence = get_rep_matcher(only_include_reps).match(name)
+	if found_rep is not None and confidence >= min_confidence:
+		return (found_rep, confidence) if include_confidence else found_rep
 
 	return (None, None) if include_confidence else None
 
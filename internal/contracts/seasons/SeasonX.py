@@ -1,25 +1,47 @@
 from __future__ import annotations
 
-from internal.contracts.sheet import sync_media_data, fetch_sheets, PATTERNS, SyncContext, Spreadsheet, SheetBlock, Row
+from internal.contracts.sheet import sync_media_data, fetch_sheets, PATTERNS, SyncChanges, SyncContext, Spreadsheet, SheetBlock, Row
+from internal.metrics import begin_sync_row, sync_timing, sync_phase, track_rows
 from internal.enums import UserStatus, UserKind, ContractStatus, ContractKind
-from internal.functions import get_user_id
 from internal.contracts.rep import get_rep
+from internal.functions import UserLookup
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 from collections import defaultdict
-from typing import TYPE_CHECKING
 from uuid import uuid4
 
-import aiosqlite
 import aiohttp
+import asyncio
 import re
 
 if TYPE_CHECKING:
 	from internal.database import NatsuminDatabase
 	from typing import Literal
 
+	import aiosqlite
+
 SEASON_SPREADSHEET_ID = "1ZuhNuejQ3gTKuZPzkGg47-upLUlcgNfdW2Jrpeq8cak"
 FANTASY_SPREADSHEET_ID = "1IRg3plGydWluhIIxM4uQfwzb5xdQdDF83ETVTcnUKRo"
 SEASON_ID = "season_x"
 
+SEASON_SHEET_RANGES: list[str] = [
+	"Dashboard!A2:AC508",
+	"Base!A2:AI516",
+	"Duality Special!A2:K291",
+	"Veteran Special!A2:J280",
+	"Epoch Special!A2:K237",
+	"Honzuki Special!A2:I171",
+	"Aria Special!A2:G149",
+	"Arcana Special!A2:N1539",
+	"Buddying!A2:N100",
+	"Sumira's Challenge!A2:F508",
+	"Hitome's Challenge!A2:F508",
+	"Sae's Challenge!A2:F508",
+	"Christmas Challenge!A2:E36",
+	"Aid Parade!A4:H120",
+]
+FANTASY_SHEET_RANGE = "Draft Picks!A1:L312"
+
 DASHBOARD_ROW_INDEXES: dict[int, tuple[str, int]] = {
 	2: ("Base Contract", 15),
 	3: ("Challenge Contract", 16),
@@ -37,28 +59,153 @@ DASHBOARD_ROW_INDEXES: dict[int, tuple[str, int]] = {
 OPTIONAL_CONTRACTS: tuple[str, ...] = ("Aria Special", "Sumira's Challenge", "Hitome's Challenge", "Sae's Challenge", "Christmas Challenge")
 
 
-async def _sync_dashboard_sheet(dashboard_sheet: SheetBlock, conn: aiosqlite.Connection, ctx: SyncContext):
-	async with conn.execute("SELECT id, mal_id FROM media_anilist") as cursor:
-		rows = await cursor.fetchall()
-		existing_anilist_ids: list[str] = [row["id"] for row in rows]
-		mal_id_to_anilist: dict[str, str] = {row["mal_id"]: row["id"] for row in rows if "mal_id" in dict(row)}
-	async with conn.execute("SELECT type, id FROM media_no_match") as cursor:
-		rows = await cursor.fetchall()
-		impossible_ids: defaultdict[str, list[str]] = defaultdict(list)
-		for row in rows:
-			impossible_ids[row["type"]].append(row["id"])
-	async with conn.execute("SELECT id FROM media WHERE type = ?", ("steam",)) as cursor:
-		rows = await cursor.fetchall()
-		existing_steam_ids: list[str] = [row["id"] for row in rows]
-
-	for row in dashboard_sheet.rows:
+SEASON_USER_DEFAULTS: dict[str, Any] = {
+	"rep": None,
+	"contractor_id": None,
+	"list_url": None,
+	"veto_used": 0,
+	"accepting_manhwa": 0,
+	"accepting_ln": 0,
+	"preferences": None,
+	"bans": None,
+}
+CONTRACT_DEFAULTS: dict[str, Any] = {
+	"contractor": None,
+	"optional": 0,
+	"progress": None,
+	"rating": None,
+	"review_url": None,
+	"medium": None,
+	"media_type": None,
+	"media_id": None,
+}
+
+_sync_lock = asyncio.Lock()
+
+
+@dataclass(kw_only=True, slots=True)
+class _SeasonState:
+	"""
+	The season the sheets are compared against, read once from a snapshot.
+
+	Handlers look rows up here instead of querying, and the writes they queue are applied to these rows as well,
+	so a sheet still sees what the sheets before it changed.
+	"""
+
+	users: UserLookup
+	user_reps: dict[str, str | None]
+	season_users: dict[str, dict[str, Any]]
+	contracts: dict[str, dict[str, dict[str, Any]]]  # contractee id -> type -> row
+	fantasy: dict[str, dict[str, Any]]
+	existing_anilist_ids: set[str]
+	mal_id_to_anilist: dict[str, str]
+	impossible_ids: defaultdict[str, set[str]]
+	existing_steam_ids: set[str]
+	changes: SyncChanges = field(default_factory=SyncChanges)
+
+	@classmethod
+	async def load(cls, conn: aiosqlite.Connection) -> _SeasonState:
+		async with conn.execute("SELECT id, username, rep FROM user") as cursor:
+			user_rows = await cursor.fetchall()
+		async with conn.execute("SELECT username, user_id FROM user_alias") as cursor:
+			alias_rows = await cursor.fetchall()
+
+		async with conn.execute("SELECT * FROM season_user WHERE season_id = ?", (SEASON_ID,)) as cursor:
+			season_users = {row["user_id"]: dict(row) for row in await cursor.fetchall()}
+
+		contracts: dict[str, dict[str, dict[str, Any]]] = {}
+		async with conn.execute("SELECT * FROM season_contract WHERE season_id = ?", (SEASON_ID,)) as cursor:
+			for row in await cursor.fetchall():
+				contracts.setdefault(row["contractee_id"], {})[row["type"]] = dict(row)
+
+		async with conn.execute("SELECT * FROM season_user_fantasy WHERE season_id = ?", (SEASON_ID,)) as cursor:
+			fantasy = {row["user_id"]: dict(row) for row in await cursor.fetchall()}
+
+		async with conn.execute("SELECT id, mal_id FROM media_anilist") as cursor:
+			anilist_rows = await cursor.fetchall()
+		impossible_ids: defaultdict[str, set[str]] = defaultdict(set)
+		async with conn.execute("SELECT type, id FROM media_no_match") as cursor:
+			for row in await cursor.fetchall():
+				impossible_ids[row["type"]].add(row["id"])
+		async with conn.execute("SELECT id FROM media WHERE type = ?", ("steam",)) as cursor:
+			existing_steam_ids = {row["id"] for row in await cursor.fetchall()}
+
+		return cls(
+			users=UserLookup(((row["username"], row["id"]) for row in user_rows), ((row["username"], row["user_id"]) for row in alias_rows)),
+			user_reps={row["id"]: row["rep"] for row in user_rows},
+			season_users=season_users,
+			contracts=contracts,
+			fantasy=fantasy,
+			existing_anilist_ids={row["id"] for row in anilist_rows},
+			mal_id_to_anilist={row["mal_id"]: row["id"] for row in anilist_rows},
+			impossible_ids=impossible_ids,
+			existing_steam_ids=existing_steam_ids,
+		)
+
+	def contract(self, user_id: str, contract_type: str) -> dict[str, Any] | None:
+		return self.contracts.get(user_id, {}).get(contract_type)
+
+	def find_arcana_contract(self, user_id: str, *names: str) -> dict[str, Any] | None:
+		"""Arcana Special contract of the user with one of `names`, the highest type wins when there are several."""
+		user_contracts = self.contracts.get(user_id, {})
+		matches = [row for contract_type, row in user_contracts.items() if contract_type.startswith("Arcana Special") and row["name"] in names]
+		return max(matches, key=lambda row: row["type"], default=None)
+
+	def _insert(self, table: str, values: dict[str, Any]):
+		self.changes.add(f"INSERT INTO {table} ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})", tuple(values.values()))
+
+	def _update(self, table: str, row: dict[str, Any], key: str, values: dict[str, Any]):
+		assignments = ", ".join(f"{column} = ?" for column in values)
+		self.changes.add(f"UPDATE {table} SET {assignments} WHERE season_id = ? AND {key} = ?", (*values.values(), SEASON_ID, row[key]))
+		row.update(values)
+
+	def add_user(self, username: str) -> str:
+		user_id = str(uuid4())
+		self.changes.add("INSERT INTO user (id, username) VALUES (?, ?)", (user_id, username))
+		self.users.add(username, user_id)
+		self.user_reps[user_id] = None
+		return user_id
+
+	def update_user_rep(self, user_id: str, rep: str):
+		self.changes.add("UPDATE user SET rep = ? WHERE id = ?", (rep, user_id))
+		self.user_reps[user_id] = rep
+
+	def insert_season_user(self, user_id: str, status: UserStatus, kind: UserKind) -> dict[str, Any]:
+		values = {"season_id": SEASON_ID, "user_id": user_id, "status": status.value, "kind": kind.value}
+		self._insert("season_user", values)
+		row = self.season_users[user_id] = SEASON_USER_DEFAULTS | values
+		return row
+
+	def update_season_user(self, row: dict[str, Any], **values: Any):
+		self._update("season_user", row, "user_id", values)
+
+	def insert_contract(self, **values: Any) -> dict[str, Any]:
+		values = {"season_id": SEASON_ID, "id": str(uuid4()), **values}
+		self._insert("season_contract", values)
+		row = self.contracts.setdefault(values["contractee_id"], {})[values["type"]] = CONTRACT_DEFAULTS | values
+		return row
+
+	def update_contract(self, row: dict[str, Any], **values: Any):
+		self._update("season_contract", row, "id", values)
+
+	def insert_fantasy(self, **values: Any) -> dict[str, Any]:
+		values = {"season_id": SEASON_ID, **values}
+		self._insert("season_user_fantasy", values)
+		row = self.fantasy[values["user_id"]] = values
+		return row
+
+	def update_fantasy(self, row: dict[str, Any], **values: Any):
+		self._update("season_user_fantasy", row, "user_id", values)
+
+
+def _sync_dashboard_sheet(dashboard_sheet: SheetBlock, state: _SeasonState, ctx: SyncContext):
+	for row in track_rows(dashboard_sheet.rows):
 		status = row.get_value(0, "")
 		username = row.get_value(1, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
+		user_id = state.users.get(username)
 		if not user_id:
-			user_id = str(uuid4())
-			await conn.execute("INSERT INTO user (id, username) VALUES (?, ?)", (user_id, username))
+			user_id = state.add_user(username)
 
 		match status:
 			case "P":
@@ -72,18 +219,13 @@ async def _sync_dashboard_sheet(dashboard_sheet: SheetBlock, conn: aiosqlite.Con
 			case _:
 				user_status = UserStatus.PENDING
 
-		async with conn.execute("SELECT * FROM season_user WHERE season_id = ? AND user_id = ?", (SEASON_ID, user_id)) as cursor:
-			user_row = await cursor.fetchone()
+		user_row = state.season_users.get(user_id)
 
 		if not user_row:
-			async with conn.execute(
-				"INSERT INTO season_user (season_id, user_id, status, kind) VALUES (?, ?, ?, ?) RETURNING *",
-				(SEASON_ID, user_id, user_status.value, UserKind.NORMAL.value),
-			) as cursor:
-				user_row = await cursor.fetchone()
+			user_row = state.insert_season_user(user_id, user_status, UserKind.NORMAL)
 		else:
 			if user_row["status"] != user_status:
-				await conn.execute("UPDATE season_user SET status = ? WHERE season_id = ? AND user_id = ?", (user_status.value, SEASON_ID, user_id))
+				state.update_season_user(user_row, status=user_status.value)
 
 		for column, (contract_type, passed_column) in DASHBOARD_ROW_INDEXES.items():
 			contract_cell = row.get_cell(column)
@@ -117,579 +259,423 @@ async def _sync_dashboard_sheet(dashboard_sheet: SheetBlock, conn: aiosqlite.Con
 
 			if media_type is not None:
 				if media_type == "anilist":
-					if media_id not in existing_anilist_ids:
+					if media_id not in state.existing_anilist_ids:
 						ctx.missing_anilist_ids.add(media_id)
 				elif media_type == "myanimelist":
-					if media_id not in mal_id_to_anilist:
-						if media_id not in impossible_ids["mal"]:  # No Anilist ID found for these MAL ids
+					if media_id not in state.mal_id_to_anilist:
+						if media_id not in state.impossible_ids["mal"]:  # No Anilist ID found for these MAL ids
 							ctx.missing_mal_ids.add(media_id)
 						media_type, media_id = None, None
 					else:
 						media_type = "anilist"
-						media_id = mal_id_to_anilist.get(media_id)
+						media_id = state.mal_id_to_anilist.get(media_id)
 				elif media_type == "steam":
-					if media_id not in existing_steam_ids:
-						if media_id not in impossible_ids["steam"]:
+					if media_id not in state.existing_steam_ids:
+						if media_id not in state.impossible_ids["steam"]:
 							ctx.missing_steam_ids.add(media_id)
 						else:
 							media_type, media_id = None, None
 				else:
 					media_type, media_id = None, None
 
-			async with conn.execute(
-				"SELECT * FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?", (SEASON_ID, user_id, contract_type)
-			) as cursor:
-				contract_row = await cursor.fetchone()
+			contract_row = state.contract(user_id, contract_type)
 
 			if not contract_row:
-				contract_id = str(uuid4())
-				async with conn.execute(
-					"INSERT INTO season_contract (season_id, id, name, type, kind, status, contractee_id, media_type, media_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) RETURNING *",
-					(
-						SEASON_ID,
-						contract_id,
-						contract_name,
-						contract_type,
-						ContractKind.NORMAL.value,
-						contract_status.value,
-						user_id,
-						media_type,
-						media_id,
-					),
-				) as cursor:
-					contract_row = await cursor.fetchone()
+				contract_row = state.insert_contract(
+					name=contract_name,
+					type=contract_type,
+					kind=ContractKind.NORMAL.value,
+					status=contract_status.value,
+					contractee_id=user_id,
+					media_type=media_type,
+					media_id=media_id,
+				)
 			else:
-				contract_id: str = contract_row["id"]
 				if contract_row["status"] != contract_status:
-					await conn.execute("UPDATE season_contract SET status = ? WHERE id = ?", (contract_status.value, contract_id))
+					state.update_contract(contract_row, status=contract_status.value)
 				if contract_row["name"] != contract_name:
-					await conn.execute("UPDATE season_contract SET name = ? WHERE id = ?", (contract_name, contract_id))
+					state.update_contract(contract_row, name=contract_name)
 				if contract_row["media_type"] != media_type or contract_row["media_id"] != media_id:
-					await conn.execute("UPDATE season_contract SET media_type = ?, media_id = ? WHERE id = ?", (media_type, media_id, contract_id))
-
-	await conn.commit()
+					state.update_contract(contract_row, media_type=media_type, media_id=media_id)
 
 
-async def _sync_basechallenge_sheet(base_challenge_sheet: SheetBlock, conn: aiosqlite.Connection):
-	for row in base_challenge_sheet.rows:
+def _sync_basechallenge_sheet(base_challenge_sheet: SheetBlock, state: _SeasonState):
+	for row in track_rows(base_challenge_sheet.rows):
 		username = row.get_value(3, "").strip().lower()
 		contractor = row.get_value(5, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
+		user_id = state.users.get(username)
 		if not user_id:
 			continue
 
-		async with conn.execute(
-			"SELECT u.rep as global_rep, su.contractor_id, su.veto_used FROM season_user su INNER JOIN user u ON su.user_id = u.id WHERE su.season_id = ? AND su.user_id = ?",
-			(SEASON_ID, user_id),
-		) as cursor:
-			user_row = await cursor.fetchone()
+		user_row = state.season_users.get(user_id)
 
 		if not user_row:
 			continue
 
-		contractor_id = await get_user_id(conn, contractor)
+		contractor_id = state.users.get(contractor)
 
 		user_rep = get_rep(row.get_value(2, "").strip())
 
 		if user_row["contractor_id"] != contractor_id or user_row["veto_used"] != (row.get_value(12) == "TRUE"):
-			await conn.execute(
-				"""
-				UPDATE season_user SET
-					contractor_id = ?,
-					rep = ?,
-					list_url = ?,
-					veto_used = ?,
-					preferences = ?,
-					bans = ?,
-					accepting_manhwa = ?,
-					accepting_ln = ?
-				WHERE season_id = ? AND user_id = ?
-				""",
-				(
-					contractor_id,
-					user_rep.value,  # rep
-					row.get_url(8),  # list_url
-					row.get_value(12) == "TRUE",  # veto_used
-					row.get_value(26, "N/A").replace("\n", ", "),  # preferences
-					row.get_value(27, "N/A").replace("\n", ", "),  # bans
-					row.get_value(9, "N/A") == "Yes",  # accepting_manhwa
-					row.get_value(10, "N/A") == "Yes",  # accepting_ln
-					SEASON_ID,
-					user_id,
-				),
+			state.update_season_user(
+				user_row,
+				contractor_id=contractor_id,
+				rep=user_rep.value,
+				list_url=row.get_url(8),
+				veto_used=row.get_value(12) == "TRUE",
+				preferences=row.get_value(26, "N/A").replace("\n", ", "),
+				bans=row.get_value(27, "N/A").replace("\n", ", "),
+				accepting_manhwa=row.get_value(9, "N/A") == "Yes",
+				accepting_ln=row.get_value(10, "N/A") == "Yes",
 			)
 
-		if user_row["global_rep"] != user_rep:
-			await conn.execute("UPDATE user SET rep = ? WHERE id = ?", (user_rep.value, user_id))
+		if state.user_reps.get(user_id) != user_rep:
+			state.update_user_rep(user_id, user_rep.value)
 
-		async with conn.execute(
-			"SELECT progress, rating, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Base Contract"),
-		) as cursor:
-			base_contract = await cursor.fetchone()
+		base_contract = state.contract(user_id, "Base Contract")
 
 		if (
 			base_contract["progress"] != row.get_value(19, "?/?").replace("\n", "")
 			or base_contract["rating"] != row.get_value(20, "0/10")
 			or base_contract["review_url"] != row.get_url(24)
 		):
-			await conn.execute(
-				"""
-				UPDATE season_contract SET
-					contractor = ?,
-					progress = ?,
-					rating = ?,
-					review_url = ?,
-					medium = ?
-				WHERE season_id = ? AND contractee_id = ? AND type = ?
-			""",
-				(
-					contractor,
-					row.get_value(19, "?/?").replace("\n", ""),  # progress
-					row.get_value(20, "0/10"),  # rating
-					row.get_url(24),  # review_url
-					row.get_value(7),  # medium
-					SEASON_ID,
-					user_id,
-					"Base Contract",
-				),
+			state.update_contract(
+				base_contract,
+				contractor=contractor,
+				progress=row.get_value(19, "?/?").replace("\n", ""),
+				rating=row.get_value(20, "0/10"),
+				review_url=row.get_url(24),
+				medium=row.get_value(7),
 			)
 
-		async with conn.execute(
-			"SELECT progress, rating, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Challenge Contract"),
-		) as cursor:
-			challenge_contract = await cursor.fetchone()
+		challenge_contract = state.contract(user_id, "Challenge Contract")
 
 		if challenge_contract and (
 			challenge_contract["progress"] != row.get_value(22, "?/?").replace("\n", "")
 			or challenge_contract["rating"] != row.get_value(23, "0/10")
 			or challenge_contract["review_url"] != row.get_url(25)
 		):
-			await conn.execute(
-				"""
-				UPDATE season_contract SET
-					contractor = ?,
-					progress = ?,
-					rating = ?,
-					review_url = ?,
-					medium = ?
-				WHERE season_id = ? AND contractee_id = ? AND type = ?
-			""",
-				(
-					contractor,
-					row.get_value(22, "?/?").replace("\n", ""),  # progress
-					row.get_value(23, "0/10"),  # rating
-					row.get_url(25),  # review_url
-					row.get_value(15),  # medium
-					SEASON_ID,
-					user_id,
-					"Challenge Contract",
-				),
+			state.update_contract(
+				challenge_contract,
+				contractor=contractor,
+				progress=row.get_value(22, "?/?").replace("\n", ""),
+				rating=row.get_value(23, "0/10"),
+				review_url=row.get_url(25),
+				medium=row.get_value(15),
 			)
 
-	await conn.commit()
 
-
-async def _sync_special_sheets(spreadsheet: Spreadsheet, conn: aiosqlite.Connection):
+def _sync_special_sheets(spreadsheet: Spreadsheet, state: _SeasonState):
 	# Duality Special
-	for row in spreadsheet.get_sheet("Duality Special", block=0).rows:
-		username = row.get_value(3, "").strip().lower()
+	with sync_phase("Duality Special"):
+		for row in track_rows(spreadsheet.get_sheet("Duality Special", block=0).rows):
+			username = row.get_value(3, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
-		if not user_id:
-			continue
+			user_id = state.users.get(username)
+			if not user_id:
+				continue
 
-		async with conn.execute(
-			"SELECT id, rating, progress, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Duality Special"),
-		) as cursor:
-			contract_row = await cursor.fetchone()
+			contract_row = state.contract(user_id, "Duality Special")
 
-		if not contract_row:
-			continue
+			if not contract_row:
+				continue
 
-		if (
-			contract_row["rating"] != row.get_value(9, "0/10")
-			or contract_row["progress"] != row.get_value(8, "").replace("\n", "")
-			or contract_row["review_url"] != row.get_url(10)
-		):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, progress = ?, rating = ?, review_url = ?, optional = ?, medium = ? WHERE season_id = ? AND id = ?",
-				(
-					row.get_value(6, "frazzle_dazzle").strip().lower(),  # contractor
-					row.get_value(8, "").replace("\n", ""),  # progress
-					row.get_value(9, "0/10"),  # rating
-					row.get_url(10),  # review_url
-					"Duality Special" in OPTIONAL_CONTRACTS,  # optional
-					re.sub(PATTERNS.NAME_MEDIUM, r"\2", row.get_value(4, "")),  # medium,
-					SEASON_ID,
-					contract_row["id"],
-				),
-			)
+			if (
+				contract_row["rating"] != row.get_value(9, "0/10")
+				or contract_row["progress"] != row.get_value(8, "").replace("\n", "")
+				or contract_row["review_url"] != row.get_url(10)
+			):
+				state.update_contract(
+					contract_row,
+					contractor=row.get_value(6, "frazzle_dazzle").strip().lower(),
+					progress=row.get_value(8, "").replace("\n", ""),
+					rating=row.get_value(9, "0/10"),
+					review_url=row.get_url(10),
+					optional="Duality Special" in OPTIONAL_CONTRACTS,
+					medium=re.sub(PATTERNS.NAME_MEDIUM, r"\2", row.get_value(4, "")),
+				)
 
 	# Veteran Special
-	for row in spreadsheet.get_sheet("Veteran Special", block=0).rows:
-		username = row.get_value(3, "").strip().lower()
+	with sync_phase("Veteran Special"):
+		for row in track_rows(spreadsheet.get_sheet("Veteran Special", block=0).rows):
+			username = row.get_value(3, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
-		if not user_id:
-			continue
+			user_id = state.users.get(username)
+			if not user_id:
+				continue
 
-		async with conn.execute(
-			"SELECT id, rating, progress, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Veteran Special"),
-		) as cursor:
-			contract_row = await cursor.fetchone()
+			contract_row = state.contract(user_id, "Veteran Special")
 
-		if not contract_row:
-			continue
+			if not contract_row:
+				continue
 
-		if (
-			contract_row["rating"] != row.get_value(8, "0/10")
-			or contract_row["progress"] != row.get_value(7, "").replace("\n", "")
-			or contract_row["review_url"] != row.get_url(9)
-		):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, progress = ?, rating = ?, review_url = ?, optional = ?, medium = ? WHERE season_id = ? AND id = ?",
-				(
-					row.get_value(5, "").strip().lower(),  # contractor
-					row.get_value(7, "").replace("\n", ""),  # progress
-					row.get_value(8, "0/10"),  # rating
-					row.get_url(9),  # review_url
-					"Veteran Special" in OPTIONAL_CONTRACTS,  # optional
-					re.sub(PATTERNS.NAME_MEDIUM, r"\2", row.get_value(4, "")),  # medium,
-					SEASON_ID,
-					contract_row["id"],
-				),
-			)
+			if (
+				contract_row["rating"] != row.get_value(8, "0/10")
+				or contract_row["progress"] != row.get_value(7, "").replace("\n", "")
+				or contract_row["review_url"] != row.get_url(9)
+			):
+				state.update_contract(
+					contract_row,
+					contractor=row.get_value(5, "").strip().lower(),
+					progress=row.get_value(7, "").replace("\n", ""),
+					rating=row.get_value(8, "0/10"),
+					review_url=row.get_url(9),
+					optional="Veteran Special" in OPTIONAL_CONTRACTS,
+					medium=re.sub(PATTERNS.NAME_MEDIUM, r"\2", row.get_value(4, "")),
+				)
 
 	# Epoch Special
-	for row in spreadsheet.get_sheet("Epoch Special", block=0).rows:
-		username = row.get_value(3, "").strip().lower()
+	with sync_phase("Epoch Special"):
+		for row in track_rows(spreadsheet.get_sheet("Epoch Special", block=0).rows):
+			username = row.get_value(3, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
-		if not user_id:
-			continue
+			user_id = state.users.get(username)
+			if not user_id:
+				continue
 
-		async with conn.execute(
-			"SELECT id, rating, progress, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Epoch Special"),
-		) as cursor:
-			contract_row = await cursor.fetchone()
+			contract_row = state.contract(user_id, "Epoch Special")
 
-		if not contract_row:
-			continue
+			if not contract_row:
+				continue
 
-		if (
-			contract_row["rating"] != row.get_value(9, "0/10")
-			or contract_row["progress"] != row.get_value(8, "").replace("\n", "")
-			or contract_row["review_url"] != row.get_url(10)
-		):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, progress = ?, rating = ?, review_url = ?, optional = ?, medium = ? WHERE season_id = ? AND id = ?",
-				(
-					row.get_value(6, "frazzle_dazzle").strip().lower(),  # contractor
-					row.get_value(8, "").replace("\n", ""),  # progress
-					row.get_value(9, "0/10"),  # rating
-					row.get_url(10),  # review_url
-					"Epoch Special" in OPTIONAL_CONTRACTS,  # optional
-					re.sub(PATTERNS.NAME_MEDIUM, r"\2", row.get_value(4, "")),  # medium,
-					SEASON_ID,
-					contract_row["id"],
-				),
-			)
+			if (
+				contract_row["rating"] != row.get_value(9, "0/10")
+				or contract_row["progress"] != row.get_value(8, "").replace("\n", "")
+				or contract_row["review_url"] != row.get_url(10)
+			):
+				state.update_contract(
+					contract_row,
+					contractor=row.get_value(6, "frazzle_dazzle").strip().lower(),
+					progress=row.get_value(8, "").replace("\n", ""),
+					rating=row.get_value(9, "0/10"),
+					review_url=row.get_url(10),
+					optional="Epoch Special" in OPTIONAL_CONTRACTS,
+					medium=re.sub(PATTERNS.NAME_MEDIUM, r"\2", row.get_value(4, "")),
+				)
 
 	# Honzuki Special
-	for row in spreadsheet.get_sheet("Honzuki Special", block=0).rows:
-		username = row.get_value(3, "").strip().lower()
+	with sync_phase("Honzuki Special"):
+		for row in track_rows(spreadsheet.get_sheet("Honzuki Special", block=0).rows):
+			username = row.get_value(3, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
-		if not user_id:
-			continue
+			user_id = state.users.get(username)
+			if not user_id:
+				continue
 
-		async with conn.execute(
-			"SELECT id, rating, progress, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Honzuki Special"),
-		) as cursor:
-			contract_row = await cursor.fetchone()
+			contract_row = state.contract(user_id, "Honzuki Special")
 
-		if not contract_row:
-			continue
+			if not contract_row:
+				continue
 
-		if (
-			contract_row["rating"] != row.get_value(7, "0/10")
-			or contract_row["progress"] != row.get_value(6, "").replace("\n", "")
-			or contract_row["review_url"] != row.get_url(8)
-		):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, progress = ?, rating = ?, review_url = ?, optional = ?, medium = ? WHERE season_id = ? AND id = ?",
-				(
-					"frazzle_dazzle",  # contractor
-					row.get_value(6, "").replace("\n", ""),  # progress
-					row.get_value(7, "0/10"),  # rating
-					row.get_url(8),  # review_url
-					"Honzuki Special" in OPTIONAL_CONTRACTS,  # optional
-					"LN",  # medium,
-					SEASON_ID,
-					contract_row["id"],
-				),
-			)
+			if (
+				contract_row["rating"] != row.get_value(7, "0/10")
+				or contract_row["progress"] != row.get_value(6, "").replace("\n", "")
+				or contract_row["review_url"] != row.get_url(8)
+			):
+				state.update_contract(
+					contract_row,
+					contractor="frazzle_dazzle",
+					progress=row.get_value(6, "").replace("\n", ""),
+					rating=row.get_value(7, "0/10"),
+					review_url=row.get_url(8),
+					optional="Honzuki Special" in OPTIONAL_CONTRACTS,
+					medium="LN",
+				)
 
 	# Aria Special
-	for row in spreadsheet.get_sheet("Aria Special", block=0).rows:
-		username = row.get_value(2, "").strip().lower()
+	with sync_phase("Aria Special"):
+		for row in track_rows(spreadsheet.get_sheet("Aria Special", block=0).rows):
+			username = row.get_value(2, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
-		if not user_id:
-			continue
+			user_id = state.users.get(username)
+			if not user_id:
+				continue
 
-		async with conn.execute(
-			"SELECT id, rating, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Aria Special"),
-		) as cursor:
-			contract_row = await cursor.fetchone()
+			contract_row = state.contract(user_id, "Aria Special")
 
-		if not contract_row:
-			continue
+			if not contract_row:
+				continue
 
-		if contract_row["rating"] != row.get_value(5, "0/10") or contract_row["review_url"] != row.get_url(6):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, rating = ?, review_url = ?, optional = ?, medium = ? WHERE season_id = ? AND id = ?",
-				(
-					row.get_value(4, "").strip().lower(),  # contractor
-					row.get_value(5, "0/10"),  # rating
-					row.get_url(6),  # review_url
-					"Aria Special" in OPTIONAL_CONTRACTS,  # optional
-					"Game",  # medium,
-					SEASON_ID,
-					contract_row["id"],
-				),
-			)
+			if contract_row["rating"] != row.get_value(5, "0/10") or contract_row["review_url"] != row.get_url(6):
+				state.update_contract(
+					contract_row,
+					contractor=row.get_value(4, "").strip().lower(),
+					rating=row.get_value(5, "0/10"),
+					review_url=row.get_url(6),
+					optional="Aria Special" in OPTIONAL_CONTRACTS,
+					medium="Game",
+				)
 
 	# Sumira's Challenge
-	for row in spreadsheet.get_sheet("Sumira's Challenge", block=0).rows:
-		username = row.get_value(2, "").strip().lower()
+	with sync_phase("Sumira's Challenge"):
+		for row in track_rows(spreadsheet.get_sheet("Sumira's Challenge", block=0).rows):
+			username = row.get_value(2, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
-		if not user_id:
-			continue
+			user_id = state.users.get(username)
+			if not user_id:
+				continue
 
-		async with conn.execute(
-			"SELECT id, rating, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Sumira's Challenge"),
-		) as cursor:
-			contract_row = await cursor.fetchone()
+			contract_row = state.contract(user_id, "Sumira's Challenge")
 
-		if not contract_row:
-			continue
+			if not contract_row:
+				continue
 
-		if contract_row["rating"] != row.get_value(4, "0/10") or contract_row["review_url"] != row.get_url(5):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, rating = ?, review_url = ?, optional = ?, medium = ? WHERE season_id = ? AND id = ?",
-				(
-					"frazzle_dazzle",  # contractor
-					row.get_value(4, "0/10"),  # rating
-					row.get_url(5),  # review_url
-					"Sumira's Challenge" in OPTIONAL_CONTRACTS,  # optional
-					"Manga",  # medium,
-					SEASON_ID,
-					contract_row["id"],
-				),
-			)
+			if contract_row["rating"] != row.get_value(4, "0/10") or contract_row["review_url"] != row.get_url(5):
+				state.update_contract(
+					contract_row,
+					contractor="frazzle_dazzle",
+					rating=row.get_value(4, "0/10"),
+					review_url=row.get_url(5),
+					optional="Sumira's Challenge" in OPTIONAL_CONTRACTS,
+					medium="Manga",
+				)
 
 	# Hitome's Challenge
-	for row in spreadsheet.get_sheet("Hitome's Challenge", block=0).rows:
-		username = row.get_value(2, "").strip().lower()
+	with sync_phase("Hitome's Challenge"):
+		for row in track_rows(spreadsheet.get_sheet("Hitome's Challenge", block=0).rows):
+			username = row.get_value(2, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
-		if not user_id:
-			continue
+			user_id = state.users.get(username)
+			if not user_id:
+				continue
 
-		async with conn.execute(
-			"SELECT id, rating, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Hitome's Challenge"),
-		) as cursor:
-			contract_row = await cursor.fetchone()
+			contract_row = state.contract(user_id, "Hitome's Challenge")
 
-		if not contract_row:
-			continue
+			if not contract_row:
+				continue
 
-		if contract_row["rating"] != row.get_value(4, "0/10") or contract_row["review_url"] != row.get_url(5):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, rating = ?, review_url = ?, optional = ?, medium = ? WHERE season_id = ? AND id = ?",
-				(
-					"frazzle_dazzle",  # contractor
-					row.get_value(4, "0/10"),  # rating
-					row.get_url(5),  # review_url
-					"Hitome's Challenge" in OPTIONAL_CONTRACTS,  # optional
-					"Movie",  # medium,
-					SEASON_ID,
-					contract_row["id"],
-				),
-			)
+			if contract_row["rating"] != row.get_value(4, "0/10") or contract_row["review_url"] != row.get_url(5):
+				state.update_contract(
+					contract_row,
+					contractor="frazzle_dazzle",
+					rating=row.get_value(4, "0/10"),
+					review_url=row.get_url(5),
+					optional="Hitome's Challenge" in OPTIONAL_CONTRACTS,
+					medium="Movie",
+				)
 
 	# Sae's Challenge
-	for row in spreadsheet.get_sheet("Sae's Challenge", block=0).rows:
-		username = row.get_value(2, "").strip().lower()
+	with sync_phase("Sae's Challenge"):
+		for row in track_rows(spreadsheet.get_sheet("Sae's Challenge", block=0).rows):
+			username = row.get_value(2, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
-		if not user_id:
-			continue
+			user_id = state.users.get(username)
+			if not user_id:
+				continue
 
-		async with conn.execute(
-			"SELECT id, rating, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Sae's Challenge"),
-		) as cursor:
-			contract_row = await cursor.fetchone()
+			contract_row = state.contract(user_id, "Sae's Challenge")
 
-		if not contract_row:
-			continue
+			if not contract_row:
+				continue
 
-		if contract_row["rating"] != row.get_value(4, "0/10") or contract_row["review_url"] != row.get_url(5):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, rating = ?, review_url = ?, optional = ?, medium = ? WHERE season_id = ? AND id = ?",
-				(
-					"frazzle_dazzle",  # contractor
-					row.get_value(4, "0/10"),  # rating
-					row.get_url(5),  # review_url
-					"Sae's Challenge" in OPTIONAL_CONTRACTS,  # optional
-					"Cooking",  # medium,
-					SEASON_ID,
-					contract_row["id"],
-				),
-			)
+			if contract_row["rating"] != row.get_value(4, "0/10") or contract_row["review_url"] != row.get_url(5):
+				state.update_contract(
+					contract_row,
+					contractor="frazzle_dazzle",
+					rating=row.get_value(4, "0/10"),
+					review_url=row.get_url(5),
+					optional="Sae's Challenge" in OPTIONAL_CONTRACTS,
+					medium="Cooking",
+				)
 
 	# Christmas Challenge
-	for row in spreadsheet.get_sheet("Christmas Challenge", block=0).rows:
-		username = row.get_value(2, "").strip().lower()
+	with sync_phase("Christmas Challenge"):
+		for row in track_rows(spreadsheet.get_sheet("Christmas Challenge", block=0).rows):
+			username = row.get_value(2, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
-		if not user_id:
-			continue
-
-		match row.get_value(0, "").upper().strip():
-			case "PASSED" | "BADGE":
-				contract_status = ContractStatus.PASSED
-			case "FAILED":
-				contract_status = ContractStatus.FAILED
-			case "LATE PASS":
-				contract_status = ContractStatus.LATE_PASS
-			case _:
-				contract_status = ContractStatus.PENDING
-
-		async with conn.execute(
-			"SELECT id, rating, status, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Christmas Challenge"),
-		) as cursor:
-			contract_row = await cursor.fetchone()
-
-		if not contract_row:
-			await conn.execute(
-				"INSERT INTO season_contract (season_id, id, name, type, kind, status, contractee_id, contractor, optional, rating, review_url, medium) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-				(
-					SEASON_ID,
-					str(uuid4()),
-					"Tokyo Godfathers",  # name
-					"Christmas Challenge",  # type
-					ContractKind.NORMAL.value,  # kind
-					contract_status.value,  # status,
-					user_id,  # contractee_id
-					"frazzle_dazzle",  # contractor
-					"Christmas Challenge" in OPTIONAL_CONTRACTS,  # optional
-					row.get_value(3, "0/10"),  # rating
-					row.get_url(4),  # review_url
-					"Movie",  # medium
-				),
-			)
-		elif (
-			contract_row["status"] != contract_status.value
-			or contract_row["rating"] != row.get_value(3, "0/10")
-			or contract_row["review_url"] != row.get_url(4)
-		):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, rating = ?, review_url = ?, optional = ?, medium = ?, status = ? WHERE season_id = ? AND id = ?",
-				(
-					"frazzle_dazzle",  # contractor
-					row.get_value(3, "0/10"),  # rating
-					row.get_url(4),  # review_url
-					"Christmas Challenge" in OPTIONAL_CONTRACTS,  # optional
-					"Movie",  # medium
-					contract_status.value,  # status
-					SEASON_ID,
-					contract_row["id"],
-				),
-			)
+			user_id = state.users.get(username)
+			if not user_id:
+				continue
 
-	await conn.commit()
+			match row.get_value(0, "").upper().strip():
+				case "PASSED" | "BADGE":
+					contract_status = ContractStatus.PASSED
+				case "FAILED":
+					contract_status = ContractStatus.FAILED
+				case "LATE PASS":
+					contract_status = ContractStatus.LATE_PASS
+				case _:
+					contract_status = ContractStatus.PENDING
 
+			contract_row = state.contract(user_id, "Christmas Challenge")
 
-async def _sync_buddies_sheet(buddy_sheet: SheetBlock, conn: aiosqlite.Connection):
-	for row in buddy_sheet.rows:
+			if not contract_row:
+				state.insert_contract(
+					name="Tokyo Godfathers",
+					type="Christmas Challenge",
+					kind=ContractKind.NORMAL.value,
+					status=contract_status.value,
+					contractee_id=user_id,
+					contractor="frazzle_dazzle",
+					optional="Christmas Challenge" in OPTIONAL_CONTRACTS,
+					rating=row.get_value(3, "0/10"),
+					review_url=row.get_url(4),
+					medium="Movie",
+				)
+			elif (
+				contract_row["status"] != contract_status.value
+				or contract_row["rating"] != row.get_value(3, "0/10")
+				or contract_row["review_url"] != row.get_url(4)
+			):
+				state.update_contract(
+					contract_row,
+					contractor="frazzle_dazzle",
+					rating=row.get_value(3, "0/10"),
+					review_url=row.get_url(4),
+					optional="Christmas Challenge" in OPTIONAL_CONTRACTS,
+					medium="Movie",
+					status=contract_status.value,
+				)
+
+
+def _sync_buddies_sheet(buddy_sheet: SheetBlock, state: _SeasonState):
+	for row in track_rows(buddy_sheet.rows):
 		username = row.get_value(2, "").strip().lower()
 
-		user_id = await get_user_id(conn, username)
+		user_id = state.users.get(username)
 		if not user_id:
 			continue
 
-		async with conn.execute(
-			"SELECT id, rating, progress, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Base Buddy"),
-		) as cursor:
-			base_buddy_row = await cursor.fetchone()
+		base_buddy_row = state.contract(user_id, "Base Buddy")
 
 		if base_buddy_row and (
 			base_buddy_row["rating"] != row.get_value(10, "0/10")
 			or base_buddy_row["progress"] != row.get_value(8, "").replace("\n", "")
 			or base_buddy_row["review_url"] != row.get_url(12)
 		):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, progress = ?, rating = ?, review_url = ?, optional = ?, medium = ? WHERE season_id = ? AND id = ?",
-				(
-					row.get_value(4, "").strip().lower(),  # contractor
-					row.get_value(8, "").replace("\n", ""),  # progress
-					row.get_value(10, "0/10"),  # rating
-					row.get_url(12),  # review_url
-					"Base Buddy" in OPTIONAL_CONTRACTS,  # optional
-					re.sub(PATTERNS.NAME_MEDIUM, r"\2", row.get_value(5, "")),  # medium,
-					SEASON_ID,
-					base_buddy_row["id"],
-				),
+			state.update_contract(
+				base_buddy_row,
+				contractor=row.get_value(4, "").strip().lower(),
+				progress=row.get_value(8, "").replace("\n", ""),
+				rating=row.get_value(10, "0/10"),
+				review_url=row.get_url(12),
+				optional="Base Buddy" in OPTIONAL_CONTRACTS,
+				medium=re.sub(PATTERNS.NAME_MEDIUM, r"\2", row.get_value(5, "")),
 			)
 
-		async with conn.execute(
-			"SELECT id, rating, progress, review_url FROM season_contract WHERE season_id = ? AND contractee_id = ? AND type = ?",
-			(SEASON_ID, user_id, "Challenge Buddy"),
-		) as cursor:
-			challenge_buddy_row = await cursor.fetchone()
+		challenge_buddy_row = state.contract(user_id, "Challenge Buddy")
 
 		if challenge_buddy_row and (
 			challenge_buddy_row["rating"] != row.get_value(11, "0/10")
 			or challenge_buddy_row["progress"] != row.get_value(9, "").replace("\n", "")
 			or challenge_buddy_row["review_url"] != row.get_url(13)
 		):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, progress = ?, rating = ?, review_url = ?, optional = ?, medium = ? WHERE season_id = ? AND id = ?",
-				(
-					row.get_value(6, "").strip().lower(),  # contractor
-					row.get_value(9, "").replace("\n", ""),  # progress
-					row.get_value(11, "0/10"),  # rating
-					row.get_url(13),  # review_url
-					"Challenge Buddy" in OPTIONAL_CONTRACTS,  # optional
-					re.sub(PATTERNS.NAME_MEDIUM, r"\2", row.get_value(7, "")),  # medium,
-					SEASON_ID,
-					challenge_buddy_row["id"],
-				),
+			state.update_contract(
+				challenge_buddy_row,
+				contractor=row.get_value(6, "").strip().lower(),
+				progress=row.get_value(9, "").replace("\n", ""),
+				rating=row.get_value(11, "0/10"),
+				review_url=row.get_url(13),
+				optional="Challenge Buddy" in OPTIONAL_CONTRACTS,
+				medium=re.sub(PATTERNS.NAME_MEDIUM, r"\2", row.get_value(7, "")),
 			)
 
-	await conn.commit()
-
 
 arcana_special_columns = {"status": 0, "user": 3, "quests": 4, "soul_quota": 5, "minimum_quest": 7, "rating": 12, "review_url": 13}
 
 
-async def _sync_arcana_sheet(sheet: SheetBlock, conn: aiosqlite.Connection):
+def _sync_arcana_sheet(sheet: SheetBlock, state: _SeasonState):
 	rows = sheet.rows
 
 	def get_row_type(row: Row) -> Literal["user", "contract", "empty"]:
@@ -704,6 +690,7 @@ async def _sync_arcana_sheet(sheet: SheetBlock, conn: aiosqlite.Connection):
 
 	i = 0
 	while i < len(rows):
+		begin_sync_row()
 		row = rows[i]
 		row_type = get_row_type(row)
 
@@ -713,15 +700,12 @@ async def _sync_arcana_sheet(sheet: SheetBlock, conn: aiosqlite.Connection):
 				i += 1
 				continue
 
-			user_id = await get_user_id(conn, username)
+			user_id = state.users.get(username)
 			if not user_id:
 				i += 1
 				continue
 
-			async with conn.execute("SELECT 1 FROM season_user WHERE season_id = ? AND user_id = ?", (SEASON_ID, user_id)) as cursor:
-				does_user_exist = await cursor.fetchone()
-
-			if not does_user_exist:
+			if user_id not in state.season_users:
 				i += 1
 				continue
 
@@ -750,50 +734,33 @@ async def _sync_arcana_sheet(sheet: SheetBlock, conn: aiosqlite.Connection):
 					case _:
 						min_contract_status = ContractStatus.PENDING
 
-				async with conn.execute(
-					"""
-					SELECT id, status, name, rating, review_url FROM season_contract
-					WHERE season_id = ?
-						AND contractee_id = ?
-						AND type LIKE "Arcana Special%"
-						AND (name = ? OR name = "PLEASE SELECT")
-					ORDER BY type DESC
-					LIMIT 1
-					""",
-					(SEASON_ID, user_id, min_contract_name),
-				) as cursor:
-					db_row = await cursor.fetchone()
+				db_row = state.find_arcana_contract(user_id, min_contract_name, "PLEASE SELECT")
 
 				medium_match = re.search(PATTERNS.NAME_MEDIUM, min_contract_name)
 				contract_medium = medium_match.group(2) if medium_match else ""
 				arcana_count += 1
 
 				if db_row is None:
-					await conn.execute(
-						"INSERT OR IGNORE INTO season_contract (season_id, id, name, type, kind, status, contractee_id, contractor, rating, review_url, medium) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-						(
-							SEASON_ID,
-							str(uuid4()),
-							min_contract_name,
-							f"Arcana Special {arcana_count}",
-							ContractKind.NORMAL.value,
-							min_contract_status.value,
-							user_id,
-							"frazzle_dazzle",
-							min_contract_rating,
-							min_contract_review,
-							contract_medium,
-						),
-					)
+					if not state.contract(user_id, f"Arcana Special {arcana_count}"):
+						state.insert_contract(
+							name=min_contract_name,
+							type=f"Arcana Special {arcana_count}",
+							kind=ContractKind.NORMAL.value,
+							status=min_contract_status.value,
+							contractee_id=user_id,
+							contractor="frazzle_dazzle",
+							rating=min_contract_rating,
+							review_url=min_contract_review,
+							medium=contract_medium,
+						)
 				elif (
 					db_row["status"] != min_contract_status.value
 					or db_row["name"] != min_contract_name
 					or db_row["rating"] != min_contract_rating
 					or db_row["review_url"] != min_contract_review
 				):
-					await conn.execute(
-						"UPDATE season_contract SET name = ?, status = ?, rating = ?, review_url = ? WHERE season_id = ? AND id = ?",
-						(min_contract_name, min_contract_status.value, min_contract_rating, min_contract_review, SEASON_ID, db_row["id"]),
+					state.update_contract(
+						db_row, name=min_contract_name, status=min_contract_status.value, rating=min_contract_rating, review_url=min_contract_review
 					)
 
 			i += 1
@@ -819,44 +786,27 @@ async def _sync_arcana_sheet(sheet: SheetBlock, conn: aiosqlite.Connection):
 					case _:
 						contract_status = ContractStatus.PENDING
 
-				async with conn.execute(
-					"""
-					SELECT id, status, rating, review_url FROM season_contract
-					WHERE season_id = ?
-						AND contractee_id = ?
-						AND type LIKE "Arcana Special%"
-						AND name = ?
-					ORDER BY type DESC
-					LIMIT 1
-					""",
-					(SEASON_ID, user_id, contract_name),
-				) as cursor:
-					db_row = await cursor.fetchone()
+				db_row = state.find_arcana_contract(user_id, contract_name)
 
 				medium_match = re.search(PATTERNS.NAME_MEDIUM, contract_name)
 				contract_medium = medium_match.group(2) if medium_match else ""
 				arcana_count += 1
 				if db_row is None:
-					await conn.execute(
-						"INSERT OR IGNORE INTO season_contract (season_id, id, name, type, kind, status, contractee_id, contractor, rating, review_url, medium) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-						(
-							SEASON_ID,
-							str(uuid4()),
-							contract_name,
-							f"Arcana Special {arcana_count}",
-							ContractKind.NORMAL.value,
-							contract_status.value,
-							user_id,
-							"frazzle_dazzle",
-							contract_rating,
-							contract_review,
-							contract_medium,
-						),
-					)
+					if not state.contract(user_id, f"Arcana Special {arcana_count}"):
+						state.insert_contract(
+							name=contract_name,
+							type=f"Arcana Special {arcana_count}",
+							kind=ContractKind.NORMAL.value,
+							status=contract_status.value,
+							contractee_id=user_id,
+							contractor="frazzle_dazzle",
+							rating=contract_rating,
+							review_url=contract_review,
+							medium=contract_medium,
+						)
 				elif db_row["status"] != contract_status.value or db_row["rating"] != contract_rating or db_row["review_url"] != contract_review:
-					await conn.execute(
-						"UPDATE season_contract SET name = ?, status = ?, rating = ?, review_url = ? WHERE season_id = ? AND id = ?",
-						(contract_name, contract_status.value, contract_rating, contract_review, SEASON_ID, db_row["id"]),
+					state.update_contract(
+						db_row, name=contract_name, status=contract_status.value, rating=contract_rating, review_url=contract_review
 					)
 
 				i += 1
@@ -867,14 +817,13 @@ async def _sync_arcana_sheet(sheet: SheetBlock, conn: aiosqlite.Connection):
 
 		i += 1
 
-	await conn.commit()
-
 
-async def _sync_fantasy_sheet(fantasy_sheet: SheetBlock, conn: aiosqlite.Connection):
+def _sync_fantasy_sheet(fantasy_sheet: SheetBlock, state: _SeasonState):
 	rows = fantasy_sheet.rows
 
 	i = 0
 	while i < len(rows):
+		begin_sync_row()
 		row = rows[i]
 		if row.get_value(1, "") == "Player:":
 			username = row.get_value(2, "")
@@ -882,139 +831,87 @@ async def _sync_fantasy_sheet(fantasy_sheet: SheetBlock, conn: aiosqlite.Connect
 				i += 1
 				continue
 
-			user_id = await get_user_id(conn, username)
+			user_id = state.users.get(username)
 			if not user_id:
 				i += 1
 				continue
 
-			async with conn.execute("SELECT 1 FROM season_user WHERE season_id = ? AND user_id = ?", (SEASON_ID, user_id)) as cursor:
-				does_user_exist = await cursor.fetchone()
-
-			if not does_user_exist:
+			if user_id not in state.season_users:
 				i += 1
 				continue
 
-			async with conn.execute("SELECT * FROM season_user_fantasy WHERE season_id = ? AND user_id = ?", (SEASON_ID, user_id)) as cursor:
-				fantasy_row = await cursor.fetchone()
+			fantasy_row = state.fantasy.get(user_id)
 
 			i += 1
 			if fantasy_row:
-				update_list = []
-				update_params = []
+				update_values: dict[str, int] = {}
 
 				for m_i in range(5):
 					i += 1
-					update_list.append(f"member{m_i + 1}_score = ?")
-					update_params.append(int(rows[i].get_value(4, 0)))
+					update_values[f"member{m_i + 1}_score"] = int(rows[i].get_value(4, 0))
 
 				i += 2
 
-				update_list.append("total_score = ?")
-				update_params.append(int(rows[i].get_value(2, 0)))
+				update_values["total_score"] = int(rows[i].get_value(2, 0))
 
+				member_scores = list(update_values.values())
 				if fantasy_row["total_score"] != int(rows[i].get_value(2, 0)) or any(
-					fantasy_row[f"member{index}_score"] != member_score for index, member_score in enumerate(update_params[:1], start=1)
+					fantasy_row[f"member{index}_score"] != member_score for index, member_score in enumerate(member_scores[:1], start=1)
 				):
-					await conn.execute(
-						f"UPDATE season_user_fantasy SET {','.join(update_list)} WHERE season_id = ? AND user_id = ?",
-						(*update_params, SEASON_ID, user_id),
-					)
+					state.update_fantasy(fantasy_row, **update_values)
 
 				i += 1
 			else:
-				member_ids: list[tuple[str, int]] = []
+				member_values: dict[str, str | int] = {}
 
 				for m_i in range(5):
 					i += 1
-					member_id = await get_user_id(conn, rows[i].get_value(2))
+					member_id = state.users.get(rows[i].get_value(2))
 					if not member_id:
 						print(f"{rows[i].get_value(2)} NO ID")
 						raise
 
-					member_ids.append((member_id, int(rows[i].get_value(4, 0))))
+					member_values[f"member{m_i + 1}_id"] = member_id
+					member_values[f"member{m_i + 1}_score"] = int(rows[i].get_value(4, 0))
 
 				i += 2
 
 				total_score = int(rows[i].get_value(2, 0))
 
-				query = """
-					INSERT INTO season_user_fantasy
-						(
-							season_id, user_id, total_score, 
-							member1_id, member1_score, member2_id, member2_score,
-							member3_id, member3_score, member4_id, member4_score,
-							member5_id, member5_score
-						)
-					VALUES
-						(
-							?, ?, ?,
-							?, ?, ?, ?,
-							?, ?, ?, ?,
-							?, ?
-						)
-					RETURNING *
-				"""
-				flat_members = []
-				for m in member_ids:
-					flat_members.extend(m)
-
-				async with conn.execute(query, (SEASON_ID, user_id, total_score, *flat_members)) as cursor:
-					fantasy_row = await cursor.fetchone()
+				state.insert_fantasy(user_id=user_id, total_score=total_score, **member_values)
 
 				i += 1
 		else:
 			i += 1
 			continue
 
-	await conn.commit()
-
-
-async def _sync_aids_sheet(aids_sheet: SheetBlock, conn: aiosqlite.Connection, ctx: SyncContext):
-	async with conn.execute("SELECT id, mal_id FROM media_anilist") as cursor:
-		rows = await cursor.fetchall()
-		existing_anilist_ids: list[str] = [row["id"] for row in rows]
-		mal_id_to_anilist: dict[str, str] = {row["mal_id"]: row["id"] for row in rows if "mal_id" in dict(row)}
-	async with conn.execute("SELECT type, id FROM media_no_match") as cursor:
-		rows = await cursor.fetchall()
-		impossible_ids: defaultdict[str, list[str]] = defaultdict(list)
-		for row in rows:
-			impossible_ids[row["type"]].append(row["id"])
-	async with conn.execute("SELECT id FROM media WHERE type = ?", ("steam",)) as cursor:
-		rows = await cursor.fetchall()
-		existing_steam_ids: list[str] = [row["id"] for row in rows]
 
+def _sync_aids_sheet(aids_sheet: SheetBlock, state: _SeasonState, ctx: SyncContext):
 	user_id_occurances: defaultdict[str, int] = defaultdict(int)
 	aid_user_passed: defaultdict[str, int] = defaultdict(int)
 	aid_user_total: defaultdict[str, int] = defaultdict(int)
 
-	for row in aids_sheet.rows:
+	for row in track_rows(aids_sheet.rows):
 		username = row.get_value(1, "").strip().lower()
 
 		if not username:
 			continue
 
-		user_id = await get_user_id(conn, username)
+		user_id = state.users.get(username)
 		if not user_id:
 			print(f"User id not found for {username}, currently creation of users is not available!")
 			continue
 
-		async with conn.execute("SELECT kind, status FROM season_user WHERE season_id = ? AND user_id = ?", (SEASON_ID, user_id)) as cursor:
-			user_row = await cursor.fetchone()
-			if not user_row:
-				async with conn.execute(
-					"INSERT INTO season_user (season_id, user_id, status, kind) VALUES (?, ?, ?, ?) RETURNING kind, status",
-					(SEASON_ID, user_id, UserStatus.PENDING.value, UserKind.AID.value),
-				) as cursor:
-					user_row = await cursor.fetchone()
+		user_row = state.season_users.get(user_id)
+		if not user_row:
+			user_row = state.insert_season_user(user_id, UserStatus.PENDING, UserKind.AID)
 
 		user_id_occurances[user_id] += 1
 		aid_number = user_id_occurances.get(user_id)
 
-		async with conn.execute(
-			"SELECT id, rating, progress, review_url, name, media_type, media_id FROM season_contract WHERE season_id = ? AND contractee_id = ? AND kind = ? AND type = ?",
-			(SEASON_ID, user_id, ContractKind.AID.value, f"Aid Contract {aid_number}"),
-		) as cursor:
-			aid_contract_row = await cursor.fetchone()
+		aid_contract_row = state.contract(user_id, f"Aid Contract {aid_number}")
+		if aid_contract_row and aid_contract_row["kind"] != ContractKind.AID.value:
+			aid_contract_row = None
 
 		match row.get_value(0, "").strip().upper():
 			case "PASSED":
@@ -1044,19 +941,19 @@ async def _sync_aids_sheet(aids_sheet: SheetBlock, conn: aiosqlite.Connection, c
 
 		if media_type is not None:
 			if media_type == "anilist":
-				if media_id not in existing_anilist_ids:
+				if media_id not in state.existing_anilist_ids:
 					ctx.missing_anilist_ids.add(media_id)
 			elif media_type == "myanimelist":
-				if media_id not in mal_id_to_anilist:
-					if media_id not in impossible_ids["mal"]:  # No Anilist ID found for these MAL ids
+				if media_id not in state.mal_id_to_anilist:
+					if media_id not in state.impossible_ids["mal"]:  # No Anilist ID found for these MAL ids
 						ctx.missing_mal_ids.add(media_id)
 					media_type, media_id = None, None
 				else:
 					media_type = "anilist"
-					media_id = mal_id_to_anilist.get(media_id)
+					media_id = state.mal_id_to_anilist.get(media_id)
 			elif media_type == "steam":
-				if media_id not in existing_steam_ids:
-					if media_id not in impossible_ids["steam"]:
+				if media_id not in state.existing_steam_ids:
+					if media_id not in state.impossible_ids["steam"]:
 						ctx.missing_steam_ids.add(media_id)
 					else:
 						media_type, media_id = None, None
@@ -1077,88 +974,76 @@ async def _sync_aids_sheet(aids_sheet: SheetBlock, conn: aiosqlite.Connection, c
 			or aid_contract_row["name"] != contract_name
 			or (aid_contract_row["media_type"] != media_type or aid_contract_row["media_id"] != media_id)
 		):
-			await conn.execute(
-				"UPDATE season_contract SET contractor = ?, progress = ?, rating = ?, review_url = ?, medium = ?, status = ?, name = ?, media_type = ?, media_id = ? WHERE season_id = ? AND id = ?",
-				(
-					contract_contractor,
-					contract_progress,
-					contract_rating,
-					contract_review_url,
-					contract_medium,
-					contract_status.value,
-					contract_name,
-					media_type,
-					media_id,
-					SEASON_ID,
-					aid_contract_row["id"],
-				),
+			state.update_contract(
+				aid_contract_row,
+				contractor=contract_contractor,
+				progress=contract_progress,
+				rating=contract_rating,
+				review_url=contract_review_url,
+				medium=contract_medium,
+				status=contract_status.value,
+				name=contract_name,
+				media_type=media_type,
+				media_id=media_id,
 			)
 		elif not aid_contract_row:
-			contract_id = str(uuid4())
-			await conn.execute(
-				"INSERT INTO season_contract (season_id, id, name, type, kind, status, contractee_id, contractor, progress, rating, review_url, medium, media_type, media_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-				(
-					SEASON_ID,
-					contract_id,
-					contract_name,
-					f"Aid Contract {aid_number}",
-					ContractKind.AID.value,
-					contract_status.value,
-					user_id,
-					contract_contractor,
-					contract_progress,
-					contract_rating,
-					contract_review_url,
-					contract_medium,
-					media_type,
-					media_id,
-				),
+			state.insert_contract(
+				name=contract_name,
+				type=f"Aid Contract {aid_number}",
+				kind=ContractKind.AID.value,
+				status=contract_status.value,
+				contractee_id=user_id,
+				contractor=contract_contractor,
+				progress=contract_progress,
+				rating=contract_rating,
+				review_url=contract_review_url,
+				medium=contract_medium,
+				media_type=media_type,
+				media_id=media_id,
 			)
 
 	for user_id, total in aid_user_total.items():
 		passed = aid_user_passed[user_id]
 
 		if passed >= total:
-			await conn.execute("UPDATE season_user SET status = ? WHERE season_id = ? AND user_id = ?", (UserStatus.PASSED, SEASON_ID, user_id))
-
-	await conn.commit()
+			state.update_season_user(state.season_users[user_id], status=UserStatus.PASSED.value)
 
 
 async def sync_season(database: NatsuminDatabase):
-	spreadsheet = await fetch_sheets(
-		SEASON_SPREADSHEET_ID,
-		[
-			"Dashboard!A2:AC508",
-			"Base!A2:AI516",
-			"Duality Special!A2:K291",
-			"Veteran Special!A2:J280",
-			"Epoch Special!A2:K237",
-			"Honzuki Special!A2:I171",
-			"Aria Special!A2:G149",
-			"Arcana Special!A2:N1539",
-			"Buddying!A2:N100",
-			"Sumira's Challenge!A2:F508",
-			"Hitome's Challenge!A2:F508",
-			"Sae's Challenge!A2:F508",
-			"Christmas Challenge!A2:E36",
-			"Aid Parade!A4:H120",
-		],
-	)
+	spreadsheet = await fetch_sheets(SEASON_SPREADSHEET_ID, SEASON_SHEET_RANGES)
+	try:
+		fantasy_sheet = await fetch_sheets(FANTASY_SPREADSHEET_ID, FANTASY_SHEET_RANGE)
+	except aiohttp.ClientResponseError:
+		fantasy_sheet = None  # Ignore response errors for fantasy sheet
 
 	ctx = SyncContext()
 
-	async with database.connect() as conn:
-		await _sync_dashboard_sheet(spreadsheet.get_sheet("Dashboard", block=0), conn, ctx)
-		await _sync_basechallenge_sheet(spreadsheet.get_sheet("Base", block=0), conn)
-		await _sync_special_sheets(spreadsheet, conn)
-		await _sync_buddies_sheet(spreadsheet.get_sheet("Buddying", block=0), conn)
-		await _sync_arcana_sheet(spreadsheet.get_sheet("Arcana Special", block=0), conn)
-		await _sync_aids_sheet(spreadsheet.get_sheet("Aid Parade", block=0), conn, ctx)
-
-		try:
-			fantasy_sheet = await fetch_sheets(FANTASY_SPREADSHEET_ID, "Draft Picks!A1:L312")
-			await _sync_fantasy_sheet(fantasy_sheet, conn)
-		except aiohttp.ClientResponseError:
-			pass  # Ignore response errors for fantasy sheet
-
-		await sync_media_data(conn, ctx)  # In case of missing media ids sync at the end
+	# two syncs planning against the same snapshot would queue the same inserts
+	async with _sync_lock:
+		with sync_timing("Load"):
+			async with database.snapshot() as conn:
+				state = await _SeasonState.load(conn)
+
+		# the sheets are compared in memory, only the writes they lead to take the writer
+		with sync_phase("Dashboard"):
+			_sync_dashboard_sheet(spreadsheet.get_sheet("Dashboard", block=0), state, ctx)
+		with sync_phase("Base"):
+			_sync_basechallenge_sheet(spreadsheet.get_sheet("Base", block=0), state)
+		_sync_special_sheets(spreadsheet, state)
+		with sync_phase("Buddying"):
+			_sync_buddies_sheet(spreadsheet.get_sheet("Buddying", block=0), state)
+		with sync_phase("Arcana Special"):
+			_sync_arcana_sheet(spreadsheet.get_sheet("Arcana Special", block=0), state)
+		with sync_phase("Aid Parade"):
+			_sync_aids_sheet(spreadsheet.get_sheet("Aid Parade", block=0), state, ctx)
+		if fantasy_sheet is not None:
+			with sync_phase("Fantasy"):
+				_sync_fantasy_sheet(fantasy_sheet, state)
+
+		# every change is applied in one transaction, readers see the season either fully before or fully after the sync
+		if state.changes:
+			async with database.transaction() as conn:
+				await state.changes.apply(conn)
+
+	with sync_phase("Media sync"):
+		await sync_media_data(database, ctx)  # In case of missing media ids sync at the end, outside the transaction as it waits on other APIs
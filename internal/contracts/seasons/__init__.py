@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import importlib
+
+if TYPE_CHECKING:
+	from types import ModuleType
+
+# season id -> module with its sync, imported on first use since they pull in aiohttp and the sheet parsing
+SEASON_MODULES = {
+	"season_x": "internal.contracts.seasons.SeasonX",
+}
+
+
+def load_season(season_id: str) -> ModuleType:
+	try:
+		return importlib.import_module(SEASON_MODULES[season_id])
+	except KeyError:
+		raise ValueError(f"Season {season_id} has no sync") from None
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from internal.metrics import http_trace_config, current_sync_phase, sync_timing, sync_phase
 from config import GOOGLE_API_KEY
-from typing import overload
+from typing import TYPE_CHECKING, overload
 
-import aiosqlite
+import itertools
 import datetime
 import aiofiles
 import aiohttp
+import json
 import re
 
+if TYPE_CHECKING:
+	from internal.database import NatsuminDatabase
+
+	import aiosqlite
+
 
 class PATTERNS:
 	ANILIST = r"https://anilist\.co/.+/(\d+)(?:/.*)?"
@@ -48,6 +55,31 @@ class SyncContext:
 	missing_mal_ids: set[str] = field(default_factory=set)
 
 
+@dataclass(kw_only=True, slots=True)
+class SyncChanges:
+	"""
+	Writes a sync decided on while comparing the sheets, applied afterwards in one short transaction.
+
+	Statements are counted towards the sync phase that queued them, so the report still shows which sheet changed what.
+	"""
+
+	statements: list[tuple[str, tuple]] = field(default_factory=list)
+
+	def __len__(self) -> int:
+		return len(self.statements)
+
+	def add(self, sql: str, parameters: tuple = ()):
+		self.statements.append((sql, parameters))
+		if (phase := current_sync_phase.get()) is not None:
+			phase.record_statement(sql, 1)
+
+	async def apply(self, conn: aiosqlite.Connection):
+		"""Run the queued statements in order, runs of the same statement go through one executemany."""
+		with sync_timing("Writes"):
+			for sql, group in itertools.groupby(self.statements, key=lambda statement: statement[0]):
+				await conn.executemany(sql, [parameters for _, parameters in group])
+
+
 @dataclass(kw_only=True, slots=True, frozen=True)
 class Cell:
 	value: str | None
@@ -201,23 +233,43 @@ class Spreadsheet:
 			return self.sheets.get(sheet_name)
 
 
+async def fetch_sheets_payload(spreadsheet_id: str, ranges: list[str]) -> bytes:
+	"""Raw Sheets API response for the ranges, in the form `parse_sheets` takes."""
+	async with aiohttp.ClientSession(headers={"Accept-Encoding": "gzip, deflate"}, trace_configs=[http_trace_config()]) as session:
+		async with session.get(
+			f"https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}",
+			params={"ranges": ranges, "fields": ",".join(SHEET_DATA_FIELDS), "key": GOOGLE_API_KEY},
+		) as response:
+			response.raise_for_status()
+			return await response.read()
+
+
 @overload
 async def fetch_sheets(spreadsheet_id: str, range: str) -> SheetBlock: ...
 @overload
 async def fetch_sheets(spreadsheet_id: str, range: list[str]) -> Spreadsheet: ...
 async def fetch_sheets(spreadsheet_id: str, range: str | list[str]) -> SheetBlock | Spreadsheet:
-	raw_range = range
-	if isinstance(raw_range, str):
-		range = [raw_range]
+	with sync_phase("HTTP fetch"):
+		payload = await fetch_sheets_payload(spreadsheet_id, [range] if isinstance(range, str) else range)
+
+	with sync_phase("JSON parse"):
+		return parse_sheets(spreadsheet_id, range, payload)
 
-	async with aiohttp.ClientSession(headers={"Accept-Encoding": "gzip, deflate"}) as session:
-		async with session.get(
-			f"https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}",
-			params={"ranges": range, "fields": ",".join(SHEET_DATA_FIELDS), "key": GOOGLE_API_KEY},
-		) as response:
-			response.raise_for_status()
-			spreadsheet_data: dict[str, list[dict[str]]] = await response.json()
 
+@overload
+def parse_sheets(spreadsheet_id: str, range: str, payload: bytes | str | dict) -> SheetBlock: ...
+@overload
+def parse_sheets(spreadsheet_id: str, range: list[str], payload: bytes | str | dict) -> Spreadsheet: ...
+def parse_sheets(spreadsheet_id: str, range: str | list[str], payload: bytes | str | dict) -> SheetBlock | Spreadsheet:
+	"""
+	Build the sheet objects out of a Sheets API response
+
+	:param range: Range(s) the payload was fetched with, a single range returns only its `SheetBlock`
+	:type range: str | list[str]
+	:param payload: Response body, or the already decoded json
+	:type payload: bytes | str | dict
+	"""
+	spreadsheet_data: dict[str, list[dict[str]]] = payload if isinstance(payload, dict) else json.loads(payload)
 	sheets: dict[str, Sheet] = {}
 
 	for raw_sheet in spreadsheet_data["sheets"]:
@@ -247,7 +299,7 @@ async def fetch_sheets(spreadsheet_id: str, range: str | list[str]) -> SheetBloc
 
 		sheets[sheet_name] = Sheet(name=sheet_name, blocks=blocks)
 
-	if isinstance(raw_range, str):
+	if isinstance(range, str):
 		sheet: Sheet = tuple(sheets.values())[0]
 		return sheet.blocks[0]
 
@@ -308,7 +360,7 @@ async def fetch_anilist_data(*, anilist_ids: list[int] | None = None, mal_ids: l
 
 	rate_limited: bool = False
 	try:
-		async with aiohttp.ClientSession(headers={"Accept-Encoding": "gzip, deflate"}) as session:
+		async with aiohttp.ClientSession(headers={"Accept-Encoding": "gzip, deflate"}, trace_configs=[http_trace_config()]) as session:
 			while True:
 				async with session.post("https://graphql.anilist.co", json={"query": query, "variables": variables}) as response:
 					response.raise_for_status()
@@ -372,7 +424,7 @@ async def fetch_steam_data(ids: list[int]) -> tuple[list[SteamGameData], bool]:
 	rate_limited = False
 
 	try:
-		async with aiohttp.ClientSession() as session:
+		async with aiohttp.ClientSession(trace_configs=[http_trace_config()]) as session:
 			for appid in ids:
 				async with session.get(f"https://store.steampowered.com/api/appdetails?appids={appid}") as response:
 					response.raise_for_status()
@@ -400,55 +452,22 @@ async def fetch_steam_data(ids: list[int]) -> tuple[list[SteamGameData], bool]:
 	return games, rate_limited
 
 
-async def sync_media_data(conn: aiosqlite.Connection, ctx: SyncContext):
+async def sync_media_data(database: NatsuminDatabase, ctx: SyncContext):
+	"""Fetch the media the sync found no data for, the requests all run before the short transaction writing their rows."""
+	steam_games: list[SteamGameData] = []
+	steam_rate_limited = False
 	if ctx.missing_steam_ids:
-		steam_games: list[SteamGameData] = []
-		rate_limited = False
 		try:
-			games_found, rate_limited = await fetch_steam_data(ctx.missing_steam_ids)
+			games_found, steam_rate_limited = await fetch_steam_data(ctx.missing_steam_ids)
 			steam_games.extend(games_found)
 		except aiohttp.ClientResponseError as err:
 			if err.status == 429:
-				rate_limited = True
-
-		if steam_games:
-			for game in steam_games:
-				if str(game.id) in ctx.missing_steam_ids:
-					ctx.missing_steam_ids.remove(str(game.id))
-
-				await conn.execute(
-					"INSERT OR IGNORE INTO media (type, id, name, description, medium, url, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
-					(
-						"steam",
-						game.id,
-						game.name,
-						game.description,
-						game.type.upper(),
-						f"https://store.steampowered.com/app/{game.id}/",
-						str(datetime.datetime.now(datetime.UTC)),
-					),
-				)
-
-				query = """
-					INSERT OR IGNORE INTO media_steam (
-						id, developer, publisher,
-						release_date, header_image
-					) VALUES (?, ?, ?, ?, ?, ?)
-				"""
-				await conn.execute(query, (game.id, game.developer, game.publisher, game.release_date, game.header_image))
-
-		if ctx.missing_steam_ids and not rate_limited:
-			await conn.executemany(
-				"INSERT OR IGNORE INTO media_no_match (type, id) VALUES (?, ?)", [("steam", steam_id) for steam_id in ctx.missing_steam_ids]
-			)
-
-		await conn.commit()
+				steam_rate_limited = True
 
+	total_medias: list[AnilistMedia] = []
+	was_rate_limited = False
 	if ctx.missing_anilist_ids or ctx.missing_mal_ids:
-		was_rate_limited = False
 		try:
-			total_medias: list[AnilistMedia] = []
-
 			if ctx.missing_anilist_ids:
 				anilist_medias, rate_limited = await fetch_anilist_data(anilist_ids=[int(ani_id) for ani_id in ctx.missing_anilist_ids])
 				total_medias.extend(anilist_medias)
@@ -461,56 +480,87 @@ async def sync_media_data(conn: aiosqlite.Connection, ctx: SyncContext):
 			if err.status == 429:
 				was_rate_limited = True
 
-		if total_medias:
-			for media in total_medias:
-				name_to_use = media.english_name or media.romaji_name or media.native_name
-
-				if media.mal_id and str(media.mal_id) in ctx.missing_mal_ids:
-					ctx.missing_mal_ids.remove(str(media.mal_id))
-
-				await conn.execute(
-					"INSERT OR IGNORE INTO media (type, id, name, description, medium, url, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
-					("anilist", media.id, name_to_use, media.description, media.type, media.url, str(datetime.datetime.now(datetime.UTC))),
-				)
-
-				query = """
-						INSERT OR IGNORE INTO media_anilist (
-							id, format, is_adult,
-							cover_image, cover_color, mal_id,
-							start_date, end_date,
-							romaji_name, english_name, native_name,
-							episodes, chapters, volumes
-						) VALUES (
-							?, ?, ?,
-							?, ?, ?,
-							?, ?,
-							?, ?, ?,
-							?, ?, ?
-						)
-					"""
-				await conn.execute(
-					query,
-					(
-						media.id,
-						media.format,
-						media.is_adult,
-						media.cover_image,
-						media.cover_color,
-						media.mal_id,
-						media.start_date,
-						media.end_date,
-						media.romaji_name,
-						media.english_name,
-						media.native_name,
-						media.episodes,
-						media.chapters,
-						media.volumes,
-					),
-				)
+	if not ctx.missing_steam_ids and not ctx.missing_anilist_ids and not ctx.missing_mal_ids:
+		return
+
+	async with database.transaction() as conn:
+		for game in steam_games:
+			if str(game.id) in ctx.missing_steam_ids:
+				ctx.missing_steam_ids.remove(str(game.id))
+
+			await conn.execute(
+				"INSERT OR IGNORE INTO media (type, id, name, description, medium, url, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+				(
+					"steam",
+					game.id,
+					game.name,
+					game.description,
+					game.type.upper(),
+					f"https://store.steampowered.com/app/{game.id}/",
+					str(datetime.datetime.now(datetime.UTC)),
+				),
+			)
+
+			query = """
+				INSERT OR IGNORE INTO media_steam (
+					id, developer, publisher,
+					release_date, header_image
+				) VALUES (?, ?, ?, ?, ?, ?)
+			"""
+			await conn.execute(query, (game.id, game.developer, game.publisher, game.release_date, game.header_image))
+
+		if ctx.missing_steam_ids and not steam_rate_limited:
+			await conn.executemany(
+				"INSERT OR IGNORE INTO media_no_match (type, id) VALUES (?, ?)", [("steam", steam_id) for steam_id in ctx.missing_steam_ids]
+			)
+
+		for media in total_medias:
+			name_to_use = media.english_name or media.romaji_name or media.native_name
+
+			if media.mal_id and str(media.mal_id) in ctx.missing_mal_ids:
+				ctx.missing_mal_ids.remove(str(media.mal_id))
+
+			await conn.execute(
+				"INSERT OR IGNORE INTO media (type, id, name, description, medium, url, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+				("anilist", media.id, name_to_use, media.description, media.type, media.url, str(datetime.datetime.now(datetime.UTC))),
+			)
+
+			query = """
+					INSERT OR IGNORE INTO media_anilist (
+						id, format, is_adult,
+						cover_image, cover_color, mal_id,
+						start_date, end_date,
+						romaji_name, english_name, native_name,
+						episodes, chapters, volumes
+					) VALUES (
+						?, ?, ?,
+						?, ?, ?,
+						?, ?,
+						?, ?, ?,
+						?, ?, ?
+					)
+				"""
+			await conn.execute(
+				query,
+				(
+					media.id,
+					media.format,
+					media.is_adult,
+					media.cover_image,
+					media.cover_color,
+					media.mal_id,
+					media.start_date,
+					media.end_date,
+					media.romaji_name,
+					media.english_name,
+					media.native_name,
+					media.episodes,
+					media.chapters,
+					media.volumes,
+				),
+			)
 
 		if ctx.missing_mal_ids and not was_rate_limited:
 			await conn.executemany(
 				"INSERT OR IGNORE INTO media_no_match (type, id) VALUES (?, ?)", [("mal", mal_id) for mal_id in ctx.missing_mal_ids]
 			)
-
-		await conn.commit()
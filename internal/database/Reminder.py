@@ -1,12 +1,18 @@
-from contextlib import asynccontextmanager
+from __future__ import annotations
+
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from pathlib import Path
+from enum import StrEnum
 
-import aiosqlite
-import aiofiles
 import datetime
 import asyncio
 import logging
-import sqlite3
+
+if TYPE_CHECKING:
+	from internal.database import NatsuminDatabase
+
+	import aiosqlite
 
 
 def to_utc_timestamp(dt: datetime.datetime) -> int:
@@ -21,6 +27,47 @@ def from_utc_timestamp(ts: int) -> datetime.datetime:
 	return datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc)
 
 
+REMINDER_LEASE_SECONDS = 120
+REMINDER_MAX_ATTEMPTS = 5
+REMINDER_RETRY_BASE_SECONDS = 30
+REMINDER_RETRY_MAX_SECONDS = 3600
+
+# select expressions copying rows out of the old reminders file, the last three columns were added to it later on
+LEGACY_REMINDER_COLUMNS = {
+	"id": "id",
+	"user_id": "user_id",
+	"channel_id": "channel_id",
+	"message": "message",
+	"remind_at": "remind_at",
+	"hidden": "hidden",
+	"created_at": "COALESCE(CAST(created_at AS INTEGER), unixepoch())",
+	"claimed_at": "claimed_at",
+	"attempts": "attempts",
+	"retry_at": "retry_at",
+}
+LEGACY_REMINDER_DEFAULTS = {"claimed_at": "NULL", "attempts": "0", "retry_at": "NULL"}
+LEGACY_DEAD_REMINDER_COLUMNS = (
+	"id",
+	"user_id",
+	"channel_id",
+	"message",
+	"remind_at",
+	"hidden",
+	"CAST(created_at AS INTEGER)",
+	"attempts",
+	"error",
+	"COALESCE(CAST(failed_at AS INTEGER), unixepoch())",
+)
+
+
+class FailedReminder(StrEnum):
+	"""What `fail_reminder` did with a reminder whose delivery failed."""
+
+	RETRYING = "retrying"
+	DEAD = "dead"  # out of attempts, moved to reminder_dead
+	DELETED = "deleted"  # deleted by its user while it was being delivered, nothing left to release
+
+
 @dataclass
 class Reminder:
 	id: int
@@ -30,112 +77,213 @@ class Reminder:
 	remind_at: datetime.datetime
 	hidden: bool
 	created_at: datetime.datetime
+	attempts: int = 0
+	claimed_at: datetime.datetime | None = None
+	retry_at: datetime.datetime | None = None
 
 	def remind_timestamp(self) -> int:
 		return to_utc_timestamp(self.remind_at)
 
+	def due_timestamp(self) -> int:
+		"""Timestamp the reminder should next be delivered at, accounting for retries and claims held by a worker."""
+		due = to_utc_timestamp(self.retry_at) if self.retry_at is not None else self.remind_timestamp()
+		if self.claimed_at is not None:
+			due = max(due, to_utc_timestamp(self.claimed_at) + REMINDER_LEASE_SECONDS)
+
+		return due
+
 	def created_timestamp(self) -> int:
 		return to_utc_timestamp(self.created_at)
 
 
 class ReminderDatabase:
-	def __init__(self, production: bool = False):
+	"""Reminders, stored in the main database so they share its writer, read pool and pragma profile."""
+
+	def __init__(self, database: NatsuminDatabase, *, legacy_path: str | None = None):
 		self.logger = logging.getLogger("bot")
-		self.production = production
+		self.database = database
+		self.legacy_path = legacy_path or ("data/reminders-prod.sqlite" if database.production else "data/reminders-dev.sqlite")
 
 		self._setup_complete = asyncio.Event()
 
-	async def open(self) -> aiosqlite.Connection:
-		conn = await aiosqlite.connect("data/reminders-prod.sqlite" if self.production else "data/reminders-dev.sqlite")
-		conn.row_factory = aiosqlite.Row
-		return conn
-
-	@asynccontextmanager
-	async def connect(self, existing_connection: aiosqlite.Connection | None = None):
+	async def setup(self):
 		"""
-		Connect to the database with a context manager.
+		Import reminders from the separate file they used to be kept in, the tables themselves are part of the main schema.
 
-		Optionally takes in a existing connection that won't close when the context ends.
+		Safe to call again, the old file is renamed once its reminders are copied over.
 		"""
-		conn = await self.open() if existing_connection is None else existing_connection
+		if self._setup_complete.is_set():
+			return
+
+		await self.database.wait_until_ready()
+		if Path(self.legacy_path).is_file():
+			await self._migrate_legacy_file()
+
+		self._setup_complete.set()
+
+	async def _migrate_legacy_file(self):
+		# ATTACH can't run inside a transaction, so this uses its own connection instead of the writer
+		conn = await self.database.open(autocommit=True)
 		try:
-			yield conn
-		except (aiosqlite.Error, sqlite3.Error) as err:
-			self.logger.error(err, exc_info=err)
-			raise err
-		finally:
-			if existing_connection is None:
-				await conn.close()
+			await conn.execute("ATTACH DATABASE ? AS legacy", (self.legacy_path,))
 
-	async def setup(self):
-		async with aiofiles.open("assets/schemas/Reminder.sql") as f:
-			schema = await f.read()
+			async with conn.execute("SELECT name FROM legacy.sqlite_master WHERE type = 'table'") as cursor:
+				legacy_tables = {row["name"] for row in await cursor.fetchall()}
 
-		async with self.connect() as conn:
-			await conn.executescript(schema)
-			await conn.commit()
+			await conn.execute("BEGIN IMMEDIATE")
+			try:
+				migrated = dead_migrated = 0
+				if "reminders" in legacy_tables:
+					async with conn.execute("PRAGMA legacy.table_info(reminders)") as cursor:
+						legacy_columns = {row["name"] for row in await cursor.fetchall()}
 
-		self._setup_complete.set()
+					select_list = ", ".join(
+						LEGACY_REMINDER_DEFAULTS[name] if name not in legacy_columns else expression
+						for name, expression in LEGACY_REMINDER_COLUMNS.items()
+					)
+					async with conn.execute(
+						f"INSERT OR IGNORE INTO reminder ({', '.join(LEGACY_REMINDER_COLUMNS)}) SELECT {select_list} FROM legacy.reminders"
+					) as cursor:
+						migrated = cursor.rowcount
+
+				if "reminders_dead" in legacy_tables:
+					async with conn.execute(
+						f"""
+						INSERT OR IGNORE INTO reminder_dead (id, user_id, channel_id, message, remind_at, hidden, created_at, attempts, error, failed_at)
+						SELECT {", ".join(LEGACY_DEAD_REMINDER_COLUMNS)} FROM legacy.reminders_dead
+						"""
+					) as cursor:
+						dead_migrated = cursor.rowcount
+
+				await conn.execute("COMMIT")
+			except BaseException:
+				await conn.execute("ROLLBACK")
+				raise
+
+			await conn.execute("DETACH DATABASE legacy")
+		finally:
+			await conn.close()
+
+		Path(self.legacy_path).rename(f"{self.legacy_path}.migrated")
+		self.logger.info(f"Migrated {migrated} reminders and {dead_migrated} dead letters from {self.legacy_path} into the main database")
 
 	async def wait_until_ready(self):
 		await self._setup_complete.wait()
 
 	async def create_reminder(self, user_id: int, channel_id: int, remind_at: datetime.datetime, message: str, hidden: bool = False) -> Reminder:
-		async with self.connect() as db:
+		async def insert(db: aiosqlite.Connection) -> aiosqlite.Row:
 			async with await db.execute(
 				"""
-				INSERT INTO reminders (user_id, channel_id, message, remind_at, hidden)
+				INSERT INTO reminder (user_id, channel_id, message, remind_at, hidden)
 				VALUES (?, ?, ?, ?, ?)
+				RETURNING *
 				""",
 				(user_id, channel_id, message, to_utc_timestamp(remind_at), int(hidden)),
 			) as cursor:
-				await db.commit()
-				reminder_id = cursor.lastrowid
+				return await cursor.fetchone()
 
-			async with await db.execute("SELECT * FROM reminders WHERE id = ?", (reminder_id,)) as cursor:
-				row = await cursor.fetchone()
+		return self._row_to_reminder(await self.database.write(insert))
 
-			return self._row_to_reminder(row)
+	async def delete_reminder(self, user_id: int, id: int) -> Reminder | None:
+		async def delete(db: aiosqlite.Connection) -> aiosqlite.Row | None:
+			async with await db.execute("DELETE FROM reminder WHERE id = ? AND user_id = ? RETURNING *", (id, user_id)) as cursor:
+				return await cursor.fetchone()
 
-	async def delete_reminder(self, id: int):
-		async with self.connect() as db:
-			await db.execute("DELETE FROM reminders WHERE id = ?", (id,))
-			await db.commit()
+		row = await self.database.write(delete)
+		return self._row_to_reminder(row) if row else None
 
 	async def get_reminder(self, id: int) -> Reminder | None:
-		async with self.connect() as db:
-			async with await db.execute("SELECT * FROM reminders WHERE id = ?", (id,)) as cursor:
+		async with self.database.connect() as db:
+			async with await db.execute("SELECT * FROM reminder WHERE id = ?", (id,)) as cursor:
 				row = await cursor.fetchone()
 				return self._row_to_reminder(row) if row else None
 
 	async def get_reminders(self, *, user_id: int | None = None) -> list[Reminder]:
-		async with self.connect() as db:
+		async with self.database.read() as db:
 			if user_id is None:
-				cursor = await db.execute("SELECT * FROM reminders")
+				cursor = await db.execute("SELECT * FROM reminder")
 			else:
-				cursor = await db.execute("SELECT * FROM reminders WHERE user_id = ?", (user_id,))
+				cursor = await db.execute("SELECT * FROM reminder WHERE user_id = ? ORDER BY remind_at", (user_id,))
 
 			rows = await cursor.fetchall()
 			await cursor.close()
 			return [self._row_to_reminder(row) for row in rows]
 
-	async def get_due_reminders(self) -> list[Reminder]:
-		async with self.connect() as db:
+	async def claim_reminders(self, ids: list[int]) -> list[Reminder]:
+		"""
+		Claim due reminders for delivery, reminders already claimed by a worker whose lease hasn't expired are skipped.
+
+		Claimed reminders must be acknowledged with `ack_reminders` or released with `fail_reminder`.
+		"""
+		if not ids:
+			return []
+
+		now = to_utc_timestamp(datetime.datetime.now(datetime.UTC))
+		placeholders = ",".join("?" for _ in ids)
+		query = f"""
+			UPDATE reminder
+			SET claimed_at = ?1, attempts = attempts + 1
+			WHERE
+				id IN ({placeholders})
+				AND COALESCE(retry_at, remind_at) <= ?1
+				AND (claimed_at IS NULL OR claimed_at <= ?1 - {REMINDER_LEASE_SECONDS})
+			RETURNING *
+		"""
+
+		async def claim(db: aiosqlite.Connection) -> list[aiosqlite.Row]:
+			async with await db.execute(query, (now, *ids)) as cursor:
+				return await cursor.fetchall()
+
+		return [self._row_to_reminder(row) for row in await self.database.write(claim)]
+
+	async def ack_reminders(self, ids: list[int]):
+		if not ids:
+			return
+
+		placeholders = ",".join("?" for _ in ids)
+
+		async def ack(db: aiosqlite.Connection):
+			await db.execute(f"DELETE FROM reminder WHERE id IN ({placeholders})", ids)
+
+		await self.database.write(ack)
+
+	async def fail_reminder(self, reminder: Reminder, error: str | None = None) -> tuple[FailedReminder, Reminder | None]:
+		"""
+		Release a claimed reminder after a failed delivery.
+
+		Returns what happened to it, with the reminder rescheduled with exponential backoff when it's retrying.
+		"""
+		if reminder.attempts >= REMINDER_MAX_ATTEMPTS:
+
+			async def move_to_dead(db: aiosqlite.Connection) -> bool:
+				await db.execute(
+					"""
+					INSERT OR REPLACE INTO reminder_dead (id, user_id, channel_id, message, remind_at, hidden, created_at, attempts, error)
+					SELECT id, user_id, channel_id, message, remind_at, hidden, created_at, attempts, ?
+					FROM reminder WHERE id = ?
+					""",
+					(error, reminder.id),
+				)
+				async with db.execute("DELETE FROM reminder WHERE id = ?", (reminder.id,)) as cursor:
+					return cursor.rowcount > 0
+
+			moved = await self.database.write(move_to_dead)
+			return (FailedReminder.DEAD if moved else FailedReminder.DELETED), None
+
+		delay = min(REMINDER_RETRY_BASE_SECONDS * 2 ** (reminder.attempts - 1), REMINDER_RETRY_MAX_SECONDS)
+		retry_at = to_utc_timestamp(datetime.datetime.now(datetime.UTC)) + delay
+
+		async def reschedule(db: aiosqlite.Connection) -> aiosqlite.Row | None:
 			async with await db.execute(
-				"SELECT * FROM reminders WHERE remind_at <= ?", (to_utc_timestamp(datetime.datetime.now(datetime.UTC)),)
+				"UPDATE reminder SET claimed_at = NULL, retry_at = ? WHERE id = ? RETURNING *", (retry_at, reminder.id)
 			) as cursor:
-				rows = await cursor.fetchall()
-			await cursor.close()
-
-			if not rows:
-				return []
+				return await cursor.fetchone()
 
-			ids = [row["id"] for row in rows]
-			placeholders = ",".join("?" for _ in ids)
-			await db.execute(f"DELETE FROM reminders WHERE id IN ({placeholders})", ids)
-			await db.commit()
+		row = await self.database.write(reschedule)
+		if row is None:
+			return FailedReminder.DELETED, None
 
-			return [self._row_to_reminder(row) for row in rows]
+		return FailedReminder.RETRYING, self._row_to_reminder(row)
 
 	def _row_to_reminder(self, row: aiosqlite.Row) -> Reminder:
 		return Reminder(
@@ -146,4 +294,7 @@ class ReminderDatabase:
 			remind_at=from_utc_timestamp(row["remind_at"]),
 			hidden=bool(row["hidden"]),
 			created_at=from_utc_timestamp(row["created_at"]),
+			attempts=row["attempts"],
+			claimed_at=from_utc_timestamp(row["claimed_at"]) if row["claimed_at"] is not None else None,
+			retry_at=from_utc_timestamp(row["retry_at"]) if row["retry_at"] is not None else None,
 		)
@@ -1,28 +1,65 @@
+from __future__ import annotations
+
+from internal.database.maintenance import AUTO_VACUUM_MODES, DatabaseStats, MaintenanceResult, checkpoint_wal, collect_stats, optimize_database
+from internal.database.pragmas import PragmaProfile
+from internal.database.writer import WriteCoordinator
+from internal.database.pool import ReadPool
+from internal.database.profiler import QueryProfiler
+from internal.metrics import MeteredConnection
 from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any
+from pathlib import Path
 
 import aiosqlite
 import aiofiles
+import itertools
 import asyncio
 import logging
 import sqlite3
+import time
+import zlib
+
+if TYPE_CHECKING:
+	from collections.abc import Awaitable, Callable
+
+
+def schema_checksum(schema: str) -> int:
+	"""Version stored in `PRAGMA user_version`, a signed 32-bit integer so the top bit is dropped."""
+	return zlib.crc32(schema.encode()) & 0x7FFFFFFF
 
 
 class NatsuminDatabase:
-	def __init__(self, production: bool = False):
+	def __init__(self, production: bool = False, *, profile: bool = False, path: str | None = None, pragmas: PragmaProfile | None = None):
 		self.logger = logging.getLogger("bot")
 		self.production = production
+		self.path = path or ("data/database-prod.sqlite" if production else "data/database-dev.sqlite")
+		self.profiler = QueryProfiler(enabled=profile)
+		self.pragmas = pragmas or PragmaProfile()
 		self.available_seasons: tuple[str, ...] = tuple()
+		self.writer = WriteCoordinator(lambda: self.open(autocommit=True))
+		self.read_pool = ReadPool(self.open_read_only)
+
+		# monotonically increasing versions, bumped whenever a write changes what the views would render
+		self._versions = itertools.count(1)
+		self.data_versions: dict[str, int] = {}
+		self.global_data_version = 0
+		self.config_version = 0
 
 		self._setup_complete = asyncio.Event()
 
-	async def open(self) -> aiosqlite.Connection:
-		conn = await aiosqlite.connect("data/database-prod.sqlite" if self.production else "data/database-dev.sqlite")
+	async def open(self, *, autocommit: bool = False) -> aiosqlite.Connection:
+		"""Open a new connection, `autocommit` leaves transactions entirely to the caller like the writer does."""
+		conn = await (aiosqlite.connect(self.path, isolation_level=None) if autocommit else aiosqlite.connect(self.path))
 		conn.row_factory = aiosqlite.Row
-		await conn.executescript("""
-			PRAGMA journal_mode = WAL;
-			PRAGMA foreign_keys = ON;
-		""")
-		return conn
+		await conn.executescript(self.pragmas.script())
+		return MeteredConnection(conn, self.profiler)
+
+	async def open_read_only(self) -> aiosqlite.Connection:
+		"""Open a read-only connection, it can't take the write lock so it never waits on or blocks the writer."""
+		conn = await aiosqlite.connect(f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True, isolation_level=None)
+		conn.row_factory = aiosqlite.Row
+		await conn.executescript(self.pragmas.read_only_script())
+		return MeteredConnection(conn, self.profiler)
 
 	@asynccontextmanager
 	async def connect(self, existing_connection: aiosqlite.Connection | None = None):
@@ -41,19 +78,128 @@ class NatsuminDatabase:
 			if existing_connection is None:
 				await conn.close()
 
+	@asynccontextmanager
+	async def snapshot(self):
+		"""
+		Connect inside a read transaction, every query sees the database as it was at the first one.
+
+		For views built from several queries, so a sync committing in between can't mix rows from before and after it.
+		"""
+		async with self.read() as conn:
+			await conn.execute("BEGIN")
+			yield conn  # the pool rolls the read transaction back when the connection is released
+
+	@asynccontextmanager
+	async def read(self):
+		"""Borrow a pooled read-only connection, for heavy or long reads that shouldn't share a connection with anything else."""
+		async with self.read_pool.acquire() as conn:
+			try:
+				yield conn
+			except (aiosqlite.Error, sqlite3.Error) as err:
+				self.logger.error(err, exc_info=err)
+				raise err
+
+	async def write[T](self, func: Callable[[aiosqlite.Connection], Awaitable[T]]) -> T:
+		"""
+		Run `func(conn)` on the writer connection, batched with other queued writes.
+
+		Raising inside `func` rolls back only its own changes, commit and rollback on the connection are not available.
+		"""
+		return await self.writer.submit(func)
+
+	async def execute_write(self, sql: str, parameters: Any = None) -> int:
+		"""Run a single write statement through the writer, returns the number of changed rows."""
+
+		async def execute(conn: aiosqlite.Connection) -> int:
+			async with conn.execute(sql, parameters) as cursor:
+				return cursor.rowcount
+
+		return await self.writer.submit(execute)
+
+	def transaction(self):
+		"""Hold the writer for a longer transaction, `async with database.transaction() as conn`."""
+		return self.writer.transaction()
+
+	async def close(self):
+		await self.writer.close()
+		await self.read_pool.close()
+
+	async def stats(self) -> DatabaseStats:
+		async with self.connect() as conn:
+			return await collect_stats(conn, self.path)
+
+	async def maintain(self) -> MaintenanceResult:
+		start = time.perf_counter()
+		result = MaintenanceResult()
+
+		# analyze and vacuum take the write lock, so they go through the writer instead of racing it for the lock
+		async with self.transaction() as conn:
+			await optimize_database(conn, result)
+
+		# the checkpoint needs a connection outside any transaction, the writer stays idle so no batch waits on it
+		async with self.writer.idle():
+			conn = await self.open(autocommit=True)
+			try:
+				await checkpoint_wal(conn, self.path, result)
+			finally:
+				await conn.close()
+
+		result.duration = time.perf_counter() - start
+		return result
+
+	async def _apply_auto_vacuum(self):
+		"""auto_vacuum of an existing database only changes with a VACUUM, done once when it differs from the profile."""
+		conn = await self.open(autocommit=True)
+		try:
+			async with conn.execute("PRAGMA auto_vacuum") as cursor:
+				current = AUTO_VACUUM_MODES.get((await cursor.fetchone())[0], "unknown")
+
+			wanted = self.pragmas.auto_vacuum.lower()
+			if current == wanted:
+				return
+
+			self.logger.info(f"Vacuuming {self.path} to change auto_vacuum from {current} to {wanted}")
+			try:
+				await conn.execute("VACUUM")
+			except sqlite3.OperationalError as err:
+				self.logger.warning(f"Could not vacuum {self.path}, auto_vacuum stays {current} until the next start: {err}")
+		finally:
+			await conn.close()
+
 	async def setup(self):
+		"""Apply the schema if it changed since it was last applied, then load what the bot needs from the database."""
 		async with aiofiles.open("assets/schemas/Database.sql") as f:
 			schema = await f.read()
+		schema_version = schema_checksum(schema)
 
 		async with self.connect() as conn:
-			await conn.executescript(schema)
-			await conn.commit()
+			async with conn.execute("PRAGMA user_version") as cursor:
+				applied_version = (await cursor.fetchone())[0]
+
+			if applied_version != schema_version:
+				await conn.executescript(schema)
+				await conn.execute(f"PRAGMA user_version = {schema_version}")
+				await conn.commit()
+				self.logger.info(f"Applied database schema version {schema_version:08x}")
 
+		await self._apply_auto_vacuum()
+
+		async with self.connect() as conn:
 			async with conn.execute("SELECT DISTINCT(id) FROM season") as cursor:
 				self.available_seasons = tuple(row["id"] for row in await cursor.fetchall())
 
 		self._setup_complete.set()
 
+	def get_data_version(self, season_id: str) -> tuple[int, int]:
+		return self.global_data_version, self.data_versions.get(season_id, 0)
+
+	def bump_data_version(self, season_id: str | None = None):
+		"""Bump the data version of a season, or of every season if none is given."""
+		if season_id is None:
+			self.global_data_version = next(self._versions)
+		else:
+			self.data_versions[season_id] = next(self._versions)
+
 	async def get_config(self, key: str, *, db_conn: aiosqlite.Connection | None = None) -> str | None:
 		async with self.connect(db_conn) as conn:
 			async with conn.execute("SELECT value FROM bot_config WHERE key = ?", (key,)) as cursor:
@@ -61,19 +207,15 @@ class NatsuminDatabase:
 
 		return row["value"] if row is not None else None
 
-	async def set_config(self, key: str, value: str, *, db_conn: aiosqlite.Connection | None = None) -> bool:
-		async with self.connect(db_conn) as conn:
-			async with conn.execute("INSERT OR REPLACE INTO bot_config (key, value) VALUES (?, ?)", (key, value)) as cursor:
-				row_count = cursor.rowcount
-			await conn.commit()
+	async def set_config(self, key: str, value: str) -> bool:
+		row_count = await self.execute_write("INSERT OR REPLACE INTO bot_config (key, value) VALUES (?, ?)", (key, value))
+		self.config_version = next(self._versions)
 
 		return True if row_count == 1 else False
 
-	async def remove_config(self, key: str, *, db_conn: aiosqlite.Connection | None = None) -> bool:
-		async with self.connect(db_conn) as conn:
-			async with conn.execute("DELETE FROM bot_config WHERE key = ?", (key,)) as cursor:
-				row_count = cursor.rowcount
-			await conn.commit()
+	async def remove_config(self, key: str) -> bool:
+		row_count = await self.execute_write("DELETE FROM bot_config WHERE key = ?", (key,))
+		self.config_version = next(self._versions)
 
 		return True if row_count == 1 else False
 
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from pathlib import Path
+
+if TYPE_CHECKING:
+	import aiosqlite
+
+WAL_TRUNCATE_THRESHOLD = 32 * 1024 * 1024  # bytes, bigger WAL files are truncated instead of only checkpointed
+INCREMENTAL_VACUUM_PAGES = 2000
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+SYNCHRONOUS_MODES = {0: "off", 1: "normal", 2: "full", 3: "extra"}
+
+
+def wal_size(path: str) -> int:
+	wal_path = Path(f"{path}-wal")
+	return wal_path.stat().st_size if wal_path.exists() else 0
+
+
+def _format_bytes(size: int) -> str:
+	for unit in ("B", "KiB", "MiB"):
+		if size < 1024:
+			return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+		size /= 1024
+	return f"{size:.1f}GiB"
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class DatabaseStats:
+	path: str
+	page_size: int
+	page_count: int
+	freelist_count: int
+	wal_size: int
+	auto_vacuum: str
+	journal_mode: str
+	synchronous: str
+	cache_size: int
+	mmap_size: int
+
+	@property
+	def size(self) -> int:
+		return self.page_size * self.page_count
+
+	@property
+	def cache_bytes(self) -> int:
+		return -self.cache_size * 1024 if self.cache_size < 0 else self.cache_size * self.page_size
+
+	@property
+	def cache_coverage(self) -> float:
+		"""Share of the database that fits in the page cache and memory map of one connection."""
+		if self.size == 0:
+			return 1.0
+		return min((self.cache_bytes + self.mmap_size) / self.size, 1.0)
+
+	def format(self) -> str:
+		return "\n".join(
+			(
+				f"{self.path}",
+				f"  size      {_format_bytes(self.size)} ({self.page_count} pages of {self.page_size}B, {self.freelist_count} free)",
+				f"  wal       {_format_bytes(self.wal_size)}",
+				f"  cache     {_format_bytes(self.cache_bytes)} + {_format_bytes(self.mmap_size)} mmap, covers {self.cache_coverage:.0%} of the database",
+				f"  journal   {self.journal_mode}, synchronous={self.synchronous}, auto_vacuum={self.auto_vacuum}",
+			)
+		)
+
+
+@dataclass(kw_only=True, slots=True)
+class MaintenanceResult:
+	analyzed: bool = False
+	vacuumed_pages: int = 0
+	checkpoint: str = "PASSIVE"
+	checkpointed_frames: int = 0
+	wal_before: int = 0
+	wal_after: int = 0
+	duration: float = 0.0
+
+	def format(self) -> str:
+		return (
+			f"{'ANALYZE' if self.analyzed else 'optimize'}, {self.vacuumed_pages} pages vacuumed, "
+			f"{self.checkpoint.lower()} checkpoint of {self.checkpointed_frames} frames "
+			f"(wal {_format_bytes(self.wal_before)} -> {_format_bytes(self.wal_after)}) in {self.duration * 1000:.0f}ms"
+		)
+
+
+async def _pragma(conn: aiosqlite.Connection, name: str):
+	async with conn.execute(f"PRAGMA {name}") as cursor:
+		return (await cursor.fetchone())[0]
+
+
+async def collect_stats(conn: aiosqlite.Connection, path: str) -> DatabaseStats:
+	return DatabaseStats(
+		path=path,
+		page_size=await _pragma(conn, "page_size"),
+		page_count=await _pragma(conn, "page_count"),
+		freelist_count=await _pragma(conn, "freelist_count"),
+		wal_size=wal_size(path),
+		auto_vacuum=AUTO_VACUUM_MODES.get(await _pragma(conn, "auto_vacuum"), "unknown"),
+		journal_mode=await _pragma(conn, "journal_mode"),
+		synchronous=SYNCHRONOUS_MODES.get(await _pragma(conn, "synchronous"), "unknown"),
+		cache_size=await _pragma(conn, "cache_size"),
+		mmap_size=await _pragma(conn, "mmap_size"),
+	)
+
+
+async def optimize_database(conn: aiosqlite.Connection, result: MaintenanceResult, *, vacuum_pages: int = INCREMENTAL_VACUUM_PAGES):
+	"""Refresh the query planner statistics and give free pages back to the filesystem, meant to run inside a write transaction."""
+	async with conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'") as cursor:
+		result.analyzed = await cursor.fetchone() is None
+	# optimize only re-analyzes tables whose statistics are stale, so the first run needs a full ANALYZE
+	await conn.execute("ANALYZE" if result.analyzed else "PRAGMA optimize")
+
+	if await _pragma(conn, "auto_vacuum") == 2:
+		free_pages = await _pragma(conn, "freelist_count")
+		# every step of incremental_vacuum frees one page but a single execute only takes one step, so it goes page by page
+		for _ in range(min(free_pages, vacuum_pages)):
+			await conn.execute("PRAGMA incremental_vacuum(1)")
+		result.vacuumed_pages = free_pages - await _pragma(conn, "freelist_count")
+
+
+async def checkpoint_wal(conn: aiosqlite.Connection, path: str, result: MaintenanceResult, *, truncate_threshold: int = WAL_TRUNCATE_THRESHOLD):
+	"""Checkpoint the WAL, expects a connection in autocommit mode since a checkpoint can't run inside a transaction."""
+	result.wal_before = wal_size(path)
+	result.checkpoint = "TRUNCATE" if result.wal_before >= truncate_threshold else "PASSIVE"
+	async with conn.execute(f"PRAGMA wal_checkpoint({result.checkpoint})") as cursor:
+		_, _, checkpointed = await cursor.fetchone()
+	result.checkpointed_frames = max(checkpointed, 0)
+	result.wal_after = wal_size(path)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+import asyncio
+
+if TYPE_CHECKING:
+	from collections.abc import AsyncIterator, Awaitable, Callable
+
+	import aiosqlite
+
+READ_POOL_SIZE = 4
+
+
+class ReadPool:
+	"""
+	Pool of read-only connections, every aiosqlite connection runs on its own thread so the pool doubles as the read thread pool.
+
+	Connections are opened on demand up to `size`, after that readers wait for one to be released.
+	"""
+
+	def __init__(self, open_connection: Callable[[], Awaitable[aiosqlite.Connection]], *, size: int = READ_POOL_SIZE):
+		self.size = size
+
+		self._open_connection = open_connection
+		self._idle: asyncio.LifoQueue[aiosqlite.Connection] = asyncio.LifoQueue()
+		self._opened = 0
+		self._closed = False
+
+	@property
+	def in_use(self) -> int:
+		return self._opened - self._idle.qsize()
+
+	async def _acquire(self) -> aiosqlite.Connection:
+		if self._closed:
+			raise RuntimeError("the read pool is closed")
+
+		if self._idle.empty() and self._opened < self.size:
+			self._opened += 1
+			try:
+				return await self._open_connection()
+			except BaseException:
+				self._opened -= 1
+				raise
+
+		return await self._idle.get()
+
+	async def _release(self, conn: aiosqlite.Connection):
+		if self._closed:
+			self._opened -= 1
+			await conn.close()
+			return
+
+		try:
+			if conn.in_transaction:
+				await conn.execute("ROLLBACK")
+		except Exception:
+			self._opened -= 1
+			await conn.close()
+			return
+
+		self._idle.put_nowait(conn)
+
+	@asynccontextmanager
+	async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+		conn = await self._acquire()
+		try:
+			yield conn
+		finally:
+			await self._release(conn)
+
+	async def close(self):
+		self._closed = True
+		while not self._idle.empty():
+			conn = self._idle.get_nowait()
+			self._opened -= 1
+			await conn.close()
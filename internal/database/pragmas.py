@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
+class PragmaProfile:
+	"""Settings applied to every connection a database opens."""
+
+	auto_vacuum: str = "INCREMENTAL"  # only applies to new databases, existing ones keep their mode until a VACUUM
+	journal_mode: str = "WAL"
+	synchronous: str = "NORMAL"  # with WAL a power loss can only drop the last commits, it can't corrupt the database
+	cache_size: int = -16_000  # negative values are KiB instead of pages
+	mmap_size: int = 128 * 1024 * 1024
+	temp_store: str = "MEMORY"
+	busy_timeout: int = 5000  # ms, only scripts writing next to the bot should ever wait on it
+	foreign_keys: bool = True
+	read_mmap_size: int = 1024 * 1024 * 1024  # read-only connections map the whole database, they never write through it
+
+	def script(self) -> str:
+		return f"""
+			PRAGMA auto_vacuum = {self.auto_vacuum};
+			PRAGMA journal_mode = {self.journal_mode};
+			PRAGMA synchronous = {self.synchronous};
+			PRAGMA cache_size = {self.cache_size};
+			PRAGMA mmap_size = {self.mmap_size};
+			PRAGMA temp_store = {self.temp_store};
+			PRAGMA busy_timeout = {self.busy_timeout};
+			PRAGMA foreign_keys = {"ON" if self.foreign_keys else "OFF"};
+		"""
+
+	def read_only_script(self) -> str:
+		return f"""
+			PRAGMA query_only = ON;
+			PRAGMA cache_size = {self.cache_size};
+			PRAGMA mmap_size = {self.read_mmap_size};
+			PRAGMA temp_store = {self.temp_store};
+			PRAGMA busy_timeout = {self.busy_timeout};
+		"""
+
+
+PRAGMA_PROFILES: dict[str, PragmaProfile] = {
+	"balanced": PragmaProfile(),
+	"durable": PragmaProfile(synchronous="FULL"),
+	"low_memory": PragmaProfile(cache_size=-2000, mmap_size=0, read_mmap_size=0, temp_store="DEFAULT"),
+}
+
+
+def get_pragma_profile(name: str) -> PragmaProfile:
+	try:
+		return PRAGMA_PROFILES[name]
+	except KeyError:
+		raise ValueError(f"Unknown pragma profile: {name}, expected one of {', '.join(PRAGMA_PROFILES)}") from None
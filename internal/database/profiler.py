@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import re
+
+if TYPE_CHECKING:
+	import aiosqlite
+
+PROFILER_TOP_N = 10
+FINGERPRINT_CACHE_SIZE = 2048
+EXPLAINABLE_STATEMENTS = ("select", "with", "insert", "replace", "update", "delete")
+
+_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_PARAM_PATTERN = re.compile(r"\?\d*|[:@$][A-Za-z_]\w*")
+_NUMBER_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_PATTERN = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+	"""Normalize a statement so the same query with different literals, parameters or formatting groups together."""
+	sql = _COMMENT_PATTERN.sub(" ", sql)
+	sql = _STRING_PATTERN.sub("?", sql)
+	sql = _PARAM_PATTERN.sub("?", sql)
+	sql = _NUMBER_PATTERN.sub("?", sql)
+	sql = _SPACE_PATTERN.sub(" ", sql).strip()
+	return _IN_LIST_PATTERN.sub("(...)", sql)
+
+
+@dataclass(kw_only=True, slots=True)
+class QueryStats:
+	fingerprint: str
+	count: int = 0
+	total_time: float = 0.0
+	max_time: float = 0.0
+	rows: int = 0
+	plan: list[str] | None = None
+	plan_sampled: bool = False
+
+	@property
+	def avg_time(self) -> float:
+		return self.total_time / self.count if self.count else 0.0
+
+
+class QueryProfiler:
+	"""
+	Opt-in statement profiler used by the connections `NatsuminDatabase` hands out.
+
+	Statements are grouped by fingerprint, the first time a fingerprint is seen its query plan is sampled.
+	"""
+
+	def __init__(self, *, enabled: bool = False):
+		self.enabled = enabled
+		self.stats: dict[str, QueryStats] = {}
+		self._fingerprints: dict[str, str] = {}
+
+	def reset(self):
+		self.stats.clear()
+
+	def record(self, sql: str, elapsed: float) -> QueryStats:
+		query_fingerprint = self._fingerprints.get(sql)
+		if query_fingerprint is None:
+			if len(self._fingerprints) >= FINGERPRINT_CACHE_SIZE:
+				self._fingerprints.clear()
+			query_fingerprint = self._fingerprints[sql] = fingerprint(sql)
+
+		stats = self.stats.get(query_fingerprint)
+		if stats is None:
+			stats = self.stats[query_fingerprint] = QueryStats(fingerprint=query_fingerprint)
+
+		stats.count += 1
+		stats.total_time += elapsed
+		stats.max_time = max(stats.max_time, elapsed)
+		return stats
+
+	async def sample_plan(self, conn: aiosqlite.Connection, sql: str, parameters: Any, stats: QueryStats):
+		"""Store the EXPLAIN QUERY PLAN of a statement, only runs once per fingerprint."""
+		if stats.plan_sampled:
+			return
+
+		stats.plan_sampled = True
+		if not sql.lstrip().lower().startswith(EXPLAINABLE_STATEMENTS):
+			return
+
+		try:
+			async with conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters) as cursor:
+				stats.plan = [row[3] for row in await cursor.fetchall()]
+		except Exception:  # the plan is best effort, a statement that ran fine can still fail to explain (e.g. temp tables)
+			stats.plan = None
+
+	def top(self, key: str, limit: int = PROFILER_TOP_N) -> list[QueryStats]:
+		return sorted(self.stats.values(), key=lambda stats: getattr(stats, key), reverse=True)[:limit]
+
+	def report(self, limit: int = PROFILER_TOP_N) -> str:
+		if not self.stats:
+			return "No queries recorded." if self.enabled else "Query profiling is disabled."
+
+		total_count = sum(stats.count for stats in self.stats.values())
+		total_time = sum(stats.total_time for stats in self.stats.values())
+		lines: list[str] = [f"{total_count} statements, {len(self.stats)} distinct, {total_time * 1000:.1f}ms total", ""]
+
+		for title, key in (("Slowest by total time", "total_time"), ("Slowest single run", "max_time"), ("Most frequent", "count")):
+			lines.append(f"== {title} ==")
+			for stats in self.top(key, limit):
+				lines.append(
+					f"{stats.count}x total {stats.total_time * 1000:.1f}ms avg {stats.avg_time * 1000:.2f}ms max {stats.max_time * 1000:.2f}ms rows {stats.rows}"
+				)
+				lines.append(f"  {stats.fingerprint}")
+				if stats.plan:
+					lines.extend(f"    plan: {detail}" for detail in stats.plan)
+			lines.append("")
+
+		return "\n".join(lines)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from internal.metrics import sync_timing
+from typing import TYPE_CHECKING, Any
+from collections import deque
+
+import contextvars
+import asyncio
+import logging
+
+if TYPE_CHECKING:
+	from collections.abc import AsyncIterator, Awaitable, Callable
+
+	import aiosqlite
+
+WRITE_BATCH_SIZE = 64
+
+
+class WriterClosed(RuntimeError):
+	pass
+
+
+@dataclass(kw_only=True, slots=True)
+class _WriteJob:
+	func: Callable[[aiosqlite.Connection], Awaitable[Any]] | None
+	future: asyncio.Future[Any]
+	# set for exclusive transactions, the writer waits on it before taking the next job
+	released: asyncio.Event | None = field(default=None)
+
+
+class _BatchConnection:
+	"""The writer connection as handed to queued jobs, the batch owns the transaction so jobs can't end it themselves."""
+
+	def __init__(self, conn: aiosqlite.Connection):
+		self._conn = conn
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self._conn, name)
+
+	def executescript(self, sql_script: str):
+		raise RuntimeError("executescript commits on its own and can't run inside a batched write")
+
+	async def commit(self):
+		pass  # the batch commits once every job in it ran
+
+	async def rollback(self):
+		raise RuntimeError("raise an exception from the write to roll it back")
+
+
+class _TransactionConnection:
+	"""The writer connection inside `WriteCoordinator.transaction`, commit and rollback keep an immediate transaction open."""
+
+	def __init__(self, conn: aiosqlite.Connection):
+		self._conn = conn
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self._conn, name)
+
+	def executescript(self, sql_script: str):
+		raise RuntimeError("executescript commits on its own and can't run inside a transaction")
+
+	async def commit(self):
+		with sync_timing("Commit"):
+			await self._conn.execute("COMMIT")
+		await self._conn.execute("BEGIN IMMEDIATE")
+
+	async def rollback(self):
+		await self._conn.execute("ROLLBACK")
+		await self._conn.execute("BEGIN IMMEDIATE")
+
+
+class WriteCoordinator:
+	"""
+	Serializes every write to a database through one connection.
+
+	Queued writes are grouped into a single transaction, each in its own savepoint so a failing write only rolls back itself.
+	Readers keep their own connections and never wait on the writer, WAL lets them read while a batch is being written.
+	"""
+
+	def __init__(self, open_connection: Callable[[], Awaitable[aiosqlite.Connection]], *, max_batch: int = WRITE_BATCH_SIZE):
+		self.logger = logging.getLogger("bot")
+		self.max_batch = max_batch
+
+		self._open_connection = open_connection
+		self._queue: deque[_WriteJob | None] = deque()
+		self._wakeup = asyncio.Event()
+		self._task: asyncio.Task | None = None
+		self._closed = False
+
+	def _enqueue(self, job: _WriteJob):
+		if self._closed:
+			raise WriterClosed("the database writer is closed")
+
+		self._queue.append(job)
+		self._wakeup.set()
+		if self._task is None or self._task.done():
+			# a fresh context, otherwise the writer would keep the sync report or invocation of whoever wrote first
+			self._task = asyncio.create_task(self._run(), name="database-writer", context=contextvars.Context())
+
+	async def submit[T](self, func: Callable[[aiosqlite.Connection], Awaitable[T]]) -> T:
+		"""Queue `func(conn)` to run on the writer connection, resolving once the batch it ran in is committed."""
+		job = _WriteJob(func=func, future=asyncio.get_running_loop().create_future())
+		self._enqueue(job)
+		return await job.future
+
+	@asynccontextmanager
+	async def _hold(self) -> AsyncIterator[aiosqlite.Connection]:
+		job = _WriteJob(func=None, future=asyncio.get_running_loop().create_future(), released=asyncio.Event())
+		self._enqueue(job)
+		try:
+			yield await job.future
+		finally:
+			job.released.set()
+
+	@asynccontextmanager
+	async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+		"""
+		Hold the writer for a longer transaction, queued writes wait until it ends.
+
+		Commits when the context exits and rolls back on an exception, `commit()` inside it makes a checkpoint.
+		"""
+		async with self._hold() as conn:
+			await conn.execute("BEGIN IMMEDIATE")
+			try:
+				yield _TransactionConnection(conn)
+			except BaseException:
+				await conn.execute("ROLLBACK")
+				raise
+			else:
+				with sync_timing("Commit"):
+					await conn.execute("COMMIT")
+
+	@asynccontextmanager
+	async def idle(self) -> AsyncIterator[None]:
+		"""Wait for the queued writes to finish and keep the writer idle until the context exits."""
+		async with self._hold():
+			yield
+
+	async def close(self):
+		"""Finish the queued writes and close the writer connection."""
+		if self._closed:
+			return
+
+		self._closed = True
+		if self._task is not None and not self._task.done():
+			self._queue.append(None)
+			self._wakeup.set()
+			await self._task
+
+	async def _run(self):
+		try:
+			conn = await self._open_connection()
+		except Exception as err:
+			self.logger.error("Failed to open the database writer connection", exc_info=err)
+			self._fail_queued(err)
+			return
+
+		try:
+			while True:
+				while not self._queue:
+					self._wakeup.clear()
+					await self._wakeup.wait()
+
+				await asyncio.sleep(0)  # let writes issued in the same tick join the batch
+
+				job = self._queue.popleft()
+				if job is None:
+					break
+
+				if job.released is not None:
+					if not job.future.cancelled():
+						job.future.set_result(conn)
+						await job.released.wait()
+					continue
+
+				batch = [job]
+				while len(batch) < self.max_batch and self._queue and self._queue[0] is not None and self._queue[0].released is None:
+					batch.append(self._queue.popleft())
+
+				await self._run_batch(conn, batch)
+		finally:
+			self._fail_queued(WriterClosed("the database writer stopped"))
+			await conn.close()
+
+	async def _run_batch(self, conn: aiosqlite.Connection, batch: list[_WriteJob]):
+		jobs = [job for job in batch if not job.future.cancelled()]
+		if not jobs:
+			return
+
+		batch_conn = _BatchConnection(conn)
+		outcomes: list[tuple[_WriteJob, Any, BaseException | None]] = []
+		try:
+			await conn.execute("BEGIN IMMEDIATE")
+			for job in jobs:
+				await conn.execute("SAVEPOINT write_job")
+				try:
+					result = await job.func(batch_conn)
+				except Exception as err:
+					# not logged here, the caller gets the exception and decides whether it's worth logging
+					await conn.execute("ROLLBACK TO write_job")
+					outcomes.append((job, None, err))
+				else:
+					outcomes.append((job, result, None))
+				await conn.execute("RELEASE write_job")
+
+			await conn.execute("COMMIT")
+		except BaseException as err:
+			# the jobs are already off the queue, so every future has to be resolved here or its caller waits forever
+			try:
+				if conn.in_transaction:
+					await conn.execute("ROLLBACK")
+			finally:
+				failure = err if isinstance(err, Exception) else WriterClosed("the database writer stopped in the middle of a batch")
+				for job in jobs:
+					if not job.future.done():
+						job.future.set_exception(failure)
+
+			if not isinstance(err, Exception):
+				raise
+
+			self.logger.error("Batched write failed, rolling back all of it", exc_info=err)
+			return
+
+		for job, result, err in outcomes:
+			if job.future.done():
+				continue
+			if err is not None:
+				job.future.set_exception(err)
+			else:
+				job.future.set_result(result)
+
+	def _fail_queued(self, err: BaseException):
+		while self._queue:
+			job = self._queue.popleft()
+			if job is not None and not job.future.done():
+				job.future.set_exception(err)
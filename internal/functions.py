@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+from internal.metrics import record_fuzzy_fallback, sync_timing
 from internal.enums import UserStatus, ContractStatus, LegacyRank
+from internal.matching import FuzzyMatcher
 from typing import TYPE_CHECKING
-from thefuzz import process
 
 import aiosqlite
 import datetime
@@ -68,36 +69,91 @@ def diff_to_str(dt1: datetime.datetime, dt2: datetime.datetime, *, include_secon
 	return frmt_iter(parts)
 
 
-async def get_user_id(conn: aiosqlite.Connection, username: str | None, *, score_cutoff: int = 91) -> str | None:
-	if username == "" or username is None:
-		return None
-
-	async with conn.execute(
-		"""
-		SELECT id FROM user WHERE username = ?1 OR id = ?1
-		UNION ALL
-		SELECT user_id as id FROM user_alias WHERE username = ?1
-		""",
-		(username,),
-	) as cursor:
-		row = await cursor.fetchone()
-		if row:
-			return row["id"]
-
+async def load_user_matcher(conn: aiosqlite.Connection) -> FuzzyMatcher[str]:
+	"""Matcher over every username and alias, for the fuzzy fallback of get_user_id."""
 	async with conn.execute("""
 		SELECT id, username FROM user
 		UNION ALL
 		SELECT user_id as id, username FROM user_alias
 		""") as cursor:
-		id_username = {row["id"]: row["username"] for row in await cursor.fetchall()}
+		return FuzzyMatcher((row["username"], row["id"]) for row in await cursor.fetchall())
+
 
-		fuzzy_result = process.extractOne(username, id_username, score_cutoff=score_cutoff)
+async def get_user_id(
+	conn: aiosqlite.Connection, username: str | None, *, score_cutoff: int = 91, matcher: FuzzyMatcher[str] | None = None
+) -> str | None:
+	if username == "" or username is None:
+		return None
+
+	with sync_timing("User resolution"):
+		async with conn.execute(
+			"""
+			SELECT id FROM user WHERE username = ?1 OR id = ?1
+			UNION ALL
+			SELECT user_id as id FROM user_alias WHERE username = ?1
+			""",
+			(username,),
+		) as cursor:
+			row = await cursor.fetchone()
+			if row:
+				return row["id"]
+
+		record_fuzzy_fallback()
+		if matcher is None:  # reads every user, callers resolving more than a few names should keep one around
+			matcher = await load_user_matcher(conn)
+
+		fuzzy_result = matcher.extract_one(username, score_cutoff=score_cutoff)
 		if fuzzy_result:
-			return fuzzy_result[2]
+			return fuzzy_result[0]
 		else:
 			return None
 
 
+class UserLookup:
+	"""
+	Every username and alias kept in memory, for resolving a whole sheet of names without a query per name.
+
+	Resolves the same way get_user_id does, usernames, ids and aliases first and the fuzzy fallback after.
+	"""
+
+	def __init__(self, users: Iterable[tuple[str, str]], aliases: Iterable[tuple[str, str]]):
+		self._users: dict[str, str] = {}
+		self._aliases: dict[str, str] = {}
+		self._entries: list[tuple[str, str]] = []
+		self._matcher: FuzzyMatcher[str] | None = None
+
+		for username, user_id in users:
+			self._users.setdefault(username, user_id)
+			self._users.setdefault(user_id, user_id)
+			self._entries.append((username, user_id))
+		for username, user_id in aliases:
+			self._aliases.setdefault(username, user_id)
+			self._entries.append((username, user_id))
+
+	def add(self, username: str, user_id: str):
+		self._users[username] = user_id
+		self._users[user_id] = user_id
+		self._entries.append((username, user_id))
+		if self._matcher is not None:
+			self._matcher.add(username, user_id)
+
+	def get(self, username: str | None, *, score_cutoff: int = 91) -> str | None:
+		if username == "" or username is None:
+			return None
+
+		with sync_timing("User resolution"):
+			user_id = self._users.get(username) or self._aliases.get(username)
+			if user_id:
+				return user_id
+
+			record_fuzzy_fallback()
+			if self._matcher is None:  # built on the first miss, a sync without typos never needs it
+				self._matcher = FuzzyMatcher(self._entries)
+
+			fuzzy_result = self._matcher.extract_one(username, score_cutoff=score_cutoff)
+			return fuzzy_result[0] if fuzzy_result else None
+
+
 def get_status_name(status: UserStatus | ContractStatus, is_optional: bool = False) -> str:
 	status_name: str
 	match status:
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from config import LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_WHEN, LOG_COMPRESS
+from internal.constants import FILE_LOGGING_FORMATTER, CONSOLE_LOGGING_FORMATTER
+from queue import SimpleQueue
+
+import logging
+import atexit
+import shutil
+import gzip
+import os
+
+ROOT_LOGGER = "bot"
+
+
+def _gzip_namer(name: str) -> str:
+	return f"{name}.gz"
+
+
+def _gzip_rotator(source: str, dest: str):
+	with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+		shutil.copyfileobj(src, dst)
+	os.remove(source)
+
+
+class _LogRouter(logging.Handler):
+	"""Sends records taken off the queue to every handler whose logger filter matches, runs on the listener thread."""
+
+	def __init__(self):
+		super().__init__()
+		self.handlers: tuple[logging.Handler, ...] = ()
+
+	def add(self, handler: logging.Handler):
+		self.handlers = (*self.handlers, handler)  # swapped whole so the listener thread never sees a half updated tuple
+
+	def emit(self, record: logging.LogRecord):
+		for handler in self.handlers:
+			if record.levelno >= handler.level:
+				handler.handle(record)
+
+	def close(self):
+		for handler in self.handlers:
+			handler.close()
+		super().close()
+
+
+_queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+_router = _LogRouter()
+_listener: QueueListener | None = None
+_configured: set[str] = set()
+
+
+def _create_file_handler(filename: str) -> logging.Handler:
+	# delay opens the file on the first write, which happens on the listener thread
+	if LOG_ROTATE_WHEN:
+		handler = TimedRotatingFileHandler(filename, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True, utc=True)
+	else:
+		handler = RotatingFileHandler(filename, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True)
+
+	if LOG_COMPRESS:
+		handler.namer = _gzip_namer
+		handler.rotator = _gzip_rotator
+
+	handler.setFormatter(FILE_LOGGING_FORMATTER)
+	return handler
+
+
+def _start_listener():
+	global _listener
+	if _listener is not None:
+		return
+
+	root = logging.getLogger(ROOT_LOGGER)
+	root.addHandler(QueueHandler(_queue))
+	root.setLevel(logging.INFO)
+
+	_listener = QueueListener(_queue, _router)
+	_listener.start()
+	atexit.register(stop_logging)
+
+
+def stop_logging():
+	"""Flush whatever is still queued and close the log files."""
+	global _listener
+	if _listener is None:
+		return
+
+	_listener.stop()
+	_listener = None
+	_router.close()
+
+
+def get_logger(name: str, filename: str, *, console: bool = False) -> logging.Logger:
+	"""
+	Get a logger under `bot` that also writes to its own rotating file.
+
+	Loggers only put records on a queue, formatting and disk writes happen on a background listener thread.
+	Safe to call again when an extension is reloaded.
+	"""
+	if name != ROOT_LOGGER and not name.startswith(f"{ROOT_LOGGER}."):
+		raise ValueError(f"Logger {name} is not under {ROOT_LOGGER}")
+
+	_start_listener()
+	logger = logging.getLogger(name)
+	if name in _configured:
+		return logger
+
+	file_handler = _create_file_handler(filename)
+	file_handler.addFilter(logging.Filter(name))
+	_router.add(file_handler)
+
+	if console:
+		console_handler = logging.StreamHandler()
+		console_handler.setFormatter(CONSOLE_LOGGING_FORMATTER)
+		console_handler.addFilter(logging.Filter(name))
+		_router.add(console_handler)
+
+	logger.setLevel(logging.INFO)
+	_configured.add(name)
+	return logger
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from collections.abc import Callable, Iterable
+
+	type Scorer = Callable[..., float]
+
+# thefuzz drops latin-1 characters before processing for its default scorers, kept so scores and cutoffs stay the same
+_ASCII_ONLY = dict.fromkeys(range(128, 256))
+
+
+def process_choice(value: str) -> str:
+	"""Same processing thefuzz applies to queries and choices with its default scorer."""
+	from rapidfuzz import utils  # imported on first use, most scripts never match a name
+
+	return utils.default_process(value.translate(_ASCII_ONLY))
+
+
+class FuzzyMatcher[T]:
+	"""
+	Scores a query against every candidate in one call to rapidfuzz instead of one at a time.
+
+	Candidates are processed once when the matcher is built. Scores are rounded the same way thefuzz does,
+	and cutoffs are applied before rounding like thefuzz, so existing cutoffs keep their meaning.
+	"""
+
+	def __init__(self, entries: Iterable[tuple[str, T]], *, scorer: Scorer | None = None):
+		if scorer is None:
+			from rapidfuzz import fuzz
+
+			scorer = fuzz.WRatio
+
+		self.scorer = scorer
+		self.choices: list[str] = []
+		self.values: list[T] = []
+
+		for choice, value in entries:
+			self.choices.append(process_choice(choice))
+			self.values.append(value)
+
+	def __len__(self) -> int:
+		return len(self.values)
+
+	def add(self, choice: str, value: T):
+		self.choices.append(process_choice(choice))
+		self.values.append(value)
+
+	def extract(self, query: str, *, limit: int | None = 5, score_cutoff: float = 0) -> list[tuple[T, int, str]]:
+		"""Best matches as (value, score, processed choice), highest score first."""
+		query = process_choice(query)
+		if not query or not self.choices:
+			return []
+
+		from rapidfuzz import process
+
+		results = process.extract(query, self.choices, scorer=self.scorer, processor=None, limit=limit, score_cutoff=score_cutoff)
+		return [(self.values[index], int(round(score)), choice) for choice, score, index in results]
+
+	def extract_one(self, query: str, *, score_cutoff: float = 0) -> tuple[T, int, str] | None:
+		query = process_choice(query)
+		if not query or not self.choices:
+			return None
+
+		from rapidfuzz import process
+
+		result = process.extractOne(query, self.choices, scorer=self.scorer, processor=None, score_cutoff=score_cutoff)
+		if result is None:
+			return None
+
+		choice, score, index = result
+		return self.values[index], int(round(score)), choice
@@ -0,0 +1,513 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from contextvars import ContextVar
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+from bisect import bisect_left
+
+import time
+
+if TYPE_CHECKING:
+	from collections.abc import Awaitable, Callable, Iterable, Iterator
+	from internal.database.profiler import QueryProfiler, QueryStats
+	from aiohttp import web
+
+	import aiosqlite
+	import aiohttp
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+	"""Cumulative latency histogram with fixed buckets, same shape as a prometheus histogram."""
+
+	def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+		self.buckets = buckets
+		self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+		self.count = 0
+		self.total = 0.0
+
+	def observe(self, value: float):
+		self.counts[bisect_left(self.buckets, value)] += 1
+		self.count += 1
+		self.total += value
+
+	def quantile(self, q: float) -> float:
+		"""Upper bound of the bucket the quantile falls in."""
+		if self.count == 0:
+			return 0.0
+
+		rank = q * self.count
+		seen = 0
+		for bound, count in zip(self.buckets, self.counts):
+			seen += count
+			if seen >= rank:
+				return bound
+
+		return float("inf")
+
+
+@dataclass(kw_only=True, slots=True)
+class CallStats:
+	count: int = 0
+	time: float = 0.0
+
+	def add(self, elapsed: float):
+		self.count += 1
+		self.time += elapsed
+
+
+@dataclass(kw_only=True, slots=True)
+class CommandStats:
+	latency: Histogram = field(default_factory=Histogram)
+	errors: int = 0
+	queries: CallStats = field(default_factory=CallStats)
+	http: CallStats = field(default_factory=CallStats)
+
+
+@dataclass(kw_only=True, slots=True)
+class Invocation:
+	"""Work done by a single command invocation, filled in by the database and http hooks."""
+
+	command: str
+	started_at: float = field(default_factory=time.perf_counter)
+	queries: CallStats = field(default_factory=CallStats)
+	http: CallStats = field(default_factory=CallStats)
+
+
+current_invocation: ContextVar[Invocation | None] = ContextVar("current_invocation", default=None)
+
+
+class Metrics:
+	def __init__(self):
+		self.started_at = time.time()
+		self.commands: dict[str, CommandStats] = {}
+		self.queries = CallStats()
+		self.http: dict[str, CallStats] = {}
+
+	def start_invocation(self, command: str) -> Invocation:
+		invocation = Invocation(command=command)
+		current_invocation.set(invocation)
+		return invocation
+
+	def finish_invocation(self, invocation: Invocation, *, failed: bool = False):
+		if current_invocation.get() is invocation:
+			current_invocation.set(None)
+
+		stats = self.commands.get(invocation.command)
+		if stats is None:
+			stats = self.commands[invocation.command] = CommandStats()
+
+		stats.latency.observe(time.perf_counter() - invocation.started_at)
+		stats.queries.count += invocation.queries.count
+		stats.queries.time += invocation.queries.time
+		stats.http.count += invocation.http.count
+		stats.http.time += invocation.http.time
+		if failed:
+			stats.errors += 1
+
+	def record_query(self, elapsed: float):
+		self.queries.add(elapsed)
+		if (invocation := current_invocation.get()) is not None:
+			invocation.queries.add(elapsed)
+
+	def record_http(self, target: str, elapsed: float):
+		stats = self.http.get(target)
+		if stats is None:
+			stats = self.http[target] = CallStats()
+
+		stats.add(elapsed)
+		if (invocation := current_invocation.get()) is not None:
+			invocation.http.add(elapsed)
+
+	def reset(self):
+		self.started_at = time.time()
+		self.commands.clear()
+		self.queries = CallStats()
+		self.http.clear()
+
+	def render_prometheus(self) -> str:
+		lines: list[str] = [
+			"# TYPE natsumin_command_latency_seconds histogram",
+		]
+		for command, stats in sorted(self.commands.items()):
+			cumulative = 0
+			for bound, count in zip((*stats.latency.buckets, "+Inf"), stats.latency.counts):
+				cumulative += count
+				lines.append(f'natsumin_command_latency_seconds_bucket{{command="{command}",le="{bound}"}} {cumulative}')
+			lines.append(f'natsumin_command_latency_seconds_sum{{command="{command}"}} {stats.latency.total}')
+			lines.append(f'natsumin_command_latency_seconds_count{{command="{command}"}} {stats.latency.count}')
+
+		lines.append("# TYPE natsumin_command_errors_total counter")
+		lines.extend(f'natsumin_command_errors_total{{command="{command}"}} {stats.errors}' for command, stats in sorted(self.commands.items()))
+		lines.append("# TYPE natsumin_command_queries_total counter")
+		lines.extend(f'natsumin_command_queries_total{{command="{command}"}} {stats.queries.count}' for command, stats in sorted(self.commands.items()))
+		lines.append("# TYPE natsumin_command_query_seconds_total counter")
+		lines.extend(f'natsumin_command_query_seconds_total{{command="{command}"}} {stats.queries.time}' for command, stats in sorted(self.commands.items()))
+		lines.append("# TYPE natsumin_command_http_requests_total counter")
+		lines.extend(f'natsumin_command_http_requests_total{{command="{command}"}} {stats.http.count}' for command, stats in sorted(self.commands.items()))
+
+		lines.append("# TYPE natsumin_db_queries_total counter")
+		lines.append(f"natsumin_db_queries_total {self.queries.count}")
+		lines.append("# TYPE natsumin_db_query_seconds_total counter")
+		lines.append(f"natsumin_db_query_seconds_total {self.queries.time}")
+
+		lines.append("# TYPE natsumin_http_requests_total counter")
+		lines.extend(f'natsumin_http_requests_total{{target="{target}"}} {stats.count}' for target, stats in sorted(self.http.items()))
+		lines.append("# TYPE natsumin_http_request_seconds_total counter")
+		lines.extend(f'natsumin_http_request_seconds_total{{target="{target}"}} {stats.time}' for target, stats in sorted(self.http.items()))
+
+		return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+_WRITE_COUNTERS = {"insert": "inserted", "replace": "inserted", "update": "updated", "delete": "deleted"}
+
+
+@dataclass(kw_only=True, slots=True)
+class SyncPhase:
+	"""
+	Time and changes of one step of a season sync.
+
+	`nested` phases (user resolution, commits) are timed inside the sheet phases and overlap with them.
+	"""
+
+	name: str
+	nested: bool = False
+	duration: float = 0.0
+	rows_read: int = 0
+	inserted: int = 0
+	updated: int = 0
+	deleted: int = 0
+	unchanged: int = 0
+	fuzzy_fallbacks: int = 0
+	writes: int = 0
+	_row_writes: int | None = None
+
+	def record_statement(self, sql: str, rowcount: int):
+		if rowcount <= 0:
+			return
+
+		counter = _WRITE_COUNTERS.get(sql.lstrip()[:7].rstrip().lower())
+		if counter is None:
+			return
+
+		setattr(self, counter, getattr(self, counter) + rowcount)
+		self.writes += 1
+
+	def begin_row(self):
+		"""Start a sheet row, the previous row counts as unchanged if it didn't write anything."""
+		self.end_row()
+		self.rows_read += 1
+		self._row_writes = self.writes
+
+	def end_row(self):
+		if self._row_writes is not None and self._row_writes == self.writes:
+			self.unchanged += 1
+		self._row_writes = None
+
+	def to_dict(self) -> dict[str, Any]:
+		return {
+			"name": self.name,
+			"nested": self.nested,
+			"duration": self.duration,
+			"rows_read": self.rows_read,
+			"inserted": self.inserted,
+			"updated": self.updated,
+			"deleted": self.deleted,
+			"unchanged": self.unchanged,
+			"fuzzy_fallbacks": self.fuzzy_fallbacks,
+		}
+
+	@classmethod
+	def from_dict(cls, data: dict[str, Any]) -> SyncPhase:
+		return cls(**{key: value for key, value in data.items() if key in SYNC_PHASE_FIELDS})
+
+
+SYNC_PHASE_FIELDS = frozenset(("name", "nested", "duration", "rows_read", "inserted", "updated", "deleted", "unchanged", "fuzzy_fallbacks"))
+
+
+@dataclass(kw_only=True, slots=True)
+class SyncReport:
+	"""Per phase breakdown of a season sync, phases are kept in the order they first ran."""
+
+	season_id: str
+	started_at: float = field(default_factory=time.time)
+	duration: float = 0.0
+	error: str | None = None
+	phases: dict[str, SyncPhase] = field(default_factory=dict)
+	id: int | None = None
+
+	@property
+	def status(self) -> str:
+		return "failed" if self.error is not None else "ok"
+
+	def get_phase(self, name: str, *, nested: bool = False) -> SyncPhase:
+		phase = self.phases.get(name)
+		if phase is None:
+			phase = self.phases[name] = SyncPhase(name=name, nested=nested)
+		return phase
+
+	@contextmanager
+	def phase(self, name: str) -> Iterator[SyncPhase]:
+		"""Make `name` the current phase, statements and rows are counted towards it. Running a phase again adds to it."""
+		phase = self.get_phase(name)
+		token = current_sync_phase.set(phase)
+		start = time.perf_counter()
+		try:
+			yield phase
+		finally:
+			phase.end_row()
+			phase.duration += time.perf_counter() - start
+			current_sync_phase.reset(token)
+
+	def total(self, counter: str) -> int:
+		return sum(getattr(phase, counter) for phase in self.phases.values() if not phase.nested)
+
+	def format(self) -> str:
+		lines: list[str] = [f"{'phase':<22}{'time':>9}{'rows':>7}{'ins':>6}{'upd':>6}{'del':>6}{'same':>6}{'fuzzy':>6}"]
+		for phase in sorted(self.phases.values(), key=lambda phase: phase.nested):
+			name = f"({phase.name})" if phase.nested else phase.name
+			lines.append(
+				f"{name[:21]:<22}{phase.duration:>8.2f}s{phase.rows_read:>7}{phase.inserted:>6}{phase.updated:>6}"
+				f"{phase.deleted:>6}{phase.unchanged:>6}{phase.fuzzy_fallbacks:>6}"
+			)
+
+		lines.append(
+			f"{'total':<22}{self.duration:>8.2f}s{self.total('rows_read'):>7}{self.total('inserted'):>6}{self.total('updated'):>6}"
+			f"{self.total('deleted'):>6}{self.total('unchanged'):>6}{self.total('fuzzy_fallbacks'):>6}"
+		)
+		return "\n".join(lines)
+
+
+current_sync_report: ContextVar[SyncReport | None] = ContextVar("current_sync_report", default=None)
+current_sync_phase: ContextVar[SyncPhase | None] = ContextVar("current_sync_phase", default=None)
+
+
+@contextmanager
+def sync_phase(name: str) -> Iterator[SyncPhase | None]:
+	"""`SyncReport.phase` of the sync running in this context, does nothing outside of a sync."""
+	report = current_sync_report.get()
+	if report is None:
+		yield None
+		return
+
+	with report.phase(name) as phase:
+		yield phase
+
+
+@contextmanager
+def sync_timing(name: str) -> Iterator[None]:
+	"""Add the time spent to a nested phase without taking over the counters of the current one."""
+	report = current_sync_report.get()
+	if report is None:
+		yield
+		return
+
+	start = time.perf_counter()
+	try:
+		yield
+	finally:
+		report.get_phase(name, nested=True).duration += time.perf_counter() - start
+
+
+def _track_rows[T](phase: SyncPhase, rows: Iterable[T]) -> Iterator[T]:
+	for row in rows:
+		phase.begin_row()
+		yield row
+	phase.end_row()
+
+
+def track_rows[T](rows: Iterable[T]) -> Iterable[T]:
+	"""Count the rows a sheet handler loops over, and how many of them ended up not changing anything."""
+	phase = current_sync_phase.get()
+	if phase is None:
+		return rows
+
+	return _track_rows(phase, rows)
+
+
+def begin_sync_row():
+	"""`track_rows` for handlers that walk rows by index."""
+	if (phase := current_sync_phase.get()) is not None:
+		phase.begin_row()
+
+
+def record_fuzzy_fallback():
+	if (phase := current_sync_phase.get()) is not None:
+		phase.fuzzy_fallbacks += 1
+
+
+class _ProfiledCursor:
+	"""Cursor proxy that adds the rows fetched to the statement's profiler stats."""
+
+	def __init__(self, cursor: aiosqlite.Cursor, stats: QueryStats):
+		self._cursor = cursor
+		self._stats = stats
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self._cursor, name)
+
+	# dunder lookups skip __getattr__, so `async with await conn.execute(...)` needs these defined here
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, *exc_info):
+		await self._cursor.close()
+
+	async def __aiter__(self):
+		async for row in self._cursor:
+			self._stats.rows += 1
+			yield row
+
+	async def fetchone(self):
+		row = await self._cursor.fetchone()
+		if row is not None:
+			self._stats.rows += 1
+		return row
+
+	async def fetchmany(self, size: int | None = None):
+		rows = await (self._cursor.fetchmany() if size is None else self._cursor.fetchmany(size))
+		self._stats.rows += len(rows)
+		return rows
+
+	async def fetchall(self):
+		rows = await self._cursor.fetchall()
+		self._stats.rows += len(rows)
+		return rows
+
+
+class _MeteredResult:
+	"""Wraps the awaitable/context manager aiosqlite returns from `execute`, timing the statement itself."""
+
+	def __init__(self, result: Any, conn: aiosqlite.Connection, profiler: QueryProfiler | None, sql: str, parameters: Any = None):
+		self._result = result
+		self._conn = conn
+		self._profiler = profiler
+		self._sql = sql
+		self._parameters = parameters
+		self._cursor = None
+
+	def __await__(self):
+		return self._run().__await__()
+
+	async def _run(self):
+		start = time.perf_counter()
+		try:
+			cursor = await self._result
+		finally:
+			elapsed = time.perf_counter() - start
+			metrics.record_query(elapsed)
+
+		if self._sql is not None and (phase := current_sync_phase.get()) is not None:
+			phase.record_statement(self._sql, getattr(cursor, "rowcount", -1))
+
+		if self._profiler is None or not self._profiler.enabled or self._sql is None:
+			return cursor
+
+		stats = self._profiler.record(self._sql, elapsed)
+		if cursor.rowcount > 0:  # rows changed by writes, selects count what gets fetched instead
+			stats.rows += cursor.rowcount
+		if not stats.plan_sampled and self._parameters is not _MANY:
+			await self._profiler.sample_plan(self._conn, self._sql, self._parameters, stats)
+
+		return _ProfiledCursor(cursor, stats)
+
+	async def __aenter__(self):
+		self._cursor = await self._run()
+		return self._cursor
+
+	async def __aexit__(self, *exc_info):
+		if self._cursor is not None and hasattr(self._cursor, "close"):
+			await self._cursor.close()
+
+
+_MANY = object()  # executemany parameters, can't be used to explain the statement
+
+
+class MeteredConnection:
+	"""Proxy around an aiosqlite connection that counts and times every statement, optionally profiling them."""
+
+	def __init__(self, conn: aiosqlite.Connection, profiler: QueryProfiler | None = None):
+		object.__setattr__(self, "_conn", conn)
+		object.__setattr__(self, "_profiler", profiler)
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self._conn, name)
+
+	def __setattr__(self, name: str, value: Any):
+		setattr(self._conn, name, value)
+
+	def execute(self, sql: str, parameters: Any = None) -> _MeteredResult:
+		return _MeteredResult(self._conn.execute(sql, parameters), self._conn, self._profiler, sql, parameters)
+
+	def executemany(self, sql: str, parameters: Any) -> _MeteredResult:
+		return _MeteredResult(self._conn.executemany(sql, parameters), self._conn, self._profiler, sql, _MANY)
+
+	def executescript(self, sql_script: str) -> _MeteredResult:
+		return _MeteredResult(self._conn.executescript(sql_script), self._conn, None, None)
+
+	def execute_fetchall(self, sql: str, parameters: Any = None) -> _MeteredResult:
+		return _MeteredResult(self._conn.execute_fetchall(sql, parameters), self._conn, None, sql)
+
+	async def commit(self):
+		with sync_timing("Commit"):
+			await self._conn.commit()
+
+
+def _http_target(url: Any) -> str:
+	return getattr(url, "host", None) or "unknown"
+
+
+async def _on_request_start(session: aiohttp.ClientSession, context: Any, params: aiohttp.TraceRequestStartParams):
+	context.started_at = time.perf_counter()
+
+
+async def _on_request_end(session: aiohttp.ClientSession, context: Any, params: aiohttp.TraceRequestEndParams):
+	metrics.record_http(_http_target(params.url), time.perf_counter() - context.started_at)
+
+
+async def _on_request_exception(session: aiohttp.ClientSession, context: Any, params: aiohttp.TraceRequestExceptionParams):
+	metrics.record_http(_http_target(params.url), time.perf_counter() - context.started_at)
+
+
+def http_trace_config() -> aiohttp.TraceConfig:
+	"""Trace config for aiohttp sessions so their requests show up in the metrics."""
+	import aiohttp  # the database layer imports this module, scripts that never touch the network shouldn't pay for aiohttp
+
+	trace_config = aiohttp.TraceConfig()
+	trace_config.on_request_start.append(_on_request_start)
+	trace_config.on_request_end.append(_on_request_end)
+	trace_config.on_request_exception.append(_on_request_exception)
+	return trace_config
+
+
+def meter_discord_http[**P, R](request: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+	"""Wrap `HTTPClient.request` of the discord client so api calls are counted too."""
+
+	async def metered_request(*args: P.args, **kwargs: P.kwargs) -> R:
+		start = time.perf_counter()
+		try:
+			return await request(*args, **kwargs)
+		finally:
+			metrics.record_http("discord", time.perf_counter() - start)
+
+	return metered_request
+
+
+async def start_metrics_server(port: int) -> web.AppRunner:
+	"""Serve the metrics in prometheus text format on localhost only."""
+	from aiohttp import web
+
+	async def handle_metrics(request: web.Request) -> web.Response:
+		return web.Response(text=metrics.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+	app = web.Application()
+	app.router.add_get("/metrics", handle_metrics)
+
+	runner = web.AppRunner(app, access_log=None)
+	await runner.setup()
+	await web.TCPSite(runner, "127.0.0.1", port).start()
+	return runner
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import asyncio
+import discord
+import time
+
+if TYPE_CHECKING:
+	from internal.base.bot import NatsuminBot
+
+	import aiosqlite
+
+RESOLVER_TTL = 600
+RESOLVER_NEGATIVE_TTL = 60
+QUERY_MEMBERS_LIMIT = 100  # max user ids discord accepts per guild member request
+
+
+class UserResolver:
+	"""
+	Cache mapping internal user ids to discord ids and discord ids to members/users, including negative results.
+
+	Lookups that miss the cache are gathered and resolved together through guild member requests,
+	anyone not in the guild falls back to fetching the user.
+	"""
+
+	def __init__(self, bot: NatsuminBot):
+		self.bot = bot
+		self._users: dict[int, tuple[float, discord.Member | discord.User | None]] = {}
+		self._discord_ids: dict[str, tuple[float, int | None]] = {}
+		self._pending: dict[int, asyncio.Future[discord.Member | discord.User | None]] = {}
+		self._flush_task: asyncio.Task | None = None
+
+	def invalidate(self, discord_id: int):
+		self._users.pop(discord_id, None)
+
+	def clear_discord_ids(self):
+		"""Forget every user id -> discord id mapping, after a sync that may have linked or changed them."""
+		self._discord_ids.clear()
+
+	def clear(self):
+		self._users.clear()
+		self._discord_ids.clear()
+
+	def _store(self, discord_id: int, user: discord.Member | discord.User | None):
+		ttl = RESOLVER_TTL if user is not None else RESOLVER_NEGATIVE_TTL
+		self._users[discord_id] = (time.monotonic() + ttl, user)
+
+	async def get_discord_id(self, user_id: str, *, db_conn: aiosqlite.Connection | None = None) -> int | None:
+		entry = self._discord_ids.get(user_id)
+		if entry is not None and entry[0] > time.monotonic():
+			return entry[1]
+
+		async with self.bot.database.connect(db_conn) as conn:
+			async with conn.execute("SELECT discord_id FROM user WHERE id = ?", (user_id,)) as cursor:
+				row = await cursor.fetchone()
+				discord_id: int | None = row["discord_id"] if row is not None else None
+
+		ttl = RESOLVER_TTL if discord_id is not None else RESOLVER_NEGATIVE_TTL
+		self._discord_ids[user_id] = (time.monotonic() + ttl, discord_id)
+		return discord_id
+
+	async def resolve(self, discord_id: int) -> discord.Member | discord.User | None:
+		entry = self._users.get(discord_id)
+		if entry is not None and entry[0] > time.monotonic():
+			return entry[1]
+
+		if self.bot.anicord and (member := self.bot.anicord.get_member(discord_id)):
+			self._store(discord_id, member)
+			return member
+
+		future = self._pending.get(discord_id)
+		if future is None:
+			future = asyncio.get_running_loop().create_future()
+			self._pending[discord_id] = future
+			if self._flush_task is None:
+				self._flush_task = asyncio.create_task(self._flush())
+
+		return await asyncio.shield(future)
+
+	async def _fetch_user(self, discord_id: int) -> discord.User | None:
+		try:
+			return await self.bot.get_or_fetch(discord.User, discord_id)
+		except discord.HTTPException:
+			return None
+
+	async def _flush(self):
+		await asyncio.sleep(0)  # let lookups started in the same tick join this batch
+		pending, self._pending = self._pending, {}
+		self._flush_task = None
+
+		resolved: dict[int, discord.Member | discord.User | None] = {}
+		try:
+			discord_ids = list(pending)
+			if self.bot.anicord:
+				for i in range(0, len(discord_ids), QUERY_MEMBERS_LIMIT):
+					chunk = discord_ids[i : i + QUERY_MEMBERS_LIMIT]
+					try:
+						members = await self.bot.anicord.query_members(user_ids=chunk, limit=len(chunk), cache=True)
+					except (asyncio.TimeoutError, discord.ClientException, discord.HTTPException) as err:
+						self.bot.logger.warning(f"Guild member request for {len(chunk)} users failed: {err}")
+						continue
+
+					resolved.update((member.id, member) for member in members)
+
+			missing = [discord_id for discord_id in discord_ids if discord_id not in resolved]
+			resolved.update(zip(missing, await asyncio.gather(*(self._fetch_user(discord_id) for discord_id in missing))))
+		finally:
+			for discord_id, future in pending.items():
+				user = resolved.get(discord_id)
+				if discord_id in resolved:
+					self._store(discord_id, user)
+				if not future.done():
+					future.set_result(user)
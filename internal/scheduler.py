@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING
+
+import asyncio
+import heapq
+import time
+
+if TYPE_CHECKING:
+	from internal.database.Reminder import Reminder
+	from collections.abc import Iterable
+
+
+def _sort_key(reminder: Reminder) -> tuple[int, int]:
+	return reminder.remind_timestamp(), reminder.id
+
+
+class ReminderScheduler:
+	"""
+	In-memory min-heap of pending reminders keyed by their due timestamp (including retries and claim leases).
+
+	Cancelled or rescheduled entries are left in the heap and skipped once they reach the top.
+	Also keeps every user's reminders sorted by due time for listing and autocomplete, including the ones popped for delivery
+	until they are rescheduled or cancelled once acknowledged.
+	"""
+
+	def __init__(self):
+		self._heap: list[tuple[int, int]] = []
+		self._reminders: dict[int, Reminder] = {}
+		self._in_flight: dict[int, Reminder] = {}
+		self._by_user: dict[int, list[Reminder]] = {}
+		self._wakeup = asyncio.Event()
+
+	def __len__(self) -> int:
+		return len(self._reminders) + len(self._in_flight)
+
+	def __contains__(self, reminder_id: int) -> bool:
+		return reminder_id in self._reminders or reminder_id in self._in_flight
+
+	def load(self, reminders: Iterable[Reminder]):
+		self._reminders = {reminder.id: reminder for reminder in reminders}
+		self._in_flight = {}
+		self._heap = [(reminder.due_timestamp(), reminder.id) for reminder in self._reminders.values()]
+		heapq.heapify(self._heap)
+
+		self._by_user = {}
+		for reminder in sorted(self._reminders.values(), key=_sort_key):
+			self._by_user.setdefault(reminder.user_id, []).append(reminder)
+
+		self._wakeup.set()
+
+	def schedule(self, reminder: Reminder):
+		self.cancel(reminder.id)
+		self._reminders[reminder.id] = reminder
+		insort(self._by_user.setdefault(reminder.user_id, []), reminder, key=_sort_key)
+
+		entry = (reminder.due_timestamp(), reminder.id)
+		heapq.heappush(self._heap, entry)
+		if self._heap[0] == entry:
+			self._wakeup.set()
+
+	def cancel(self, reminder_id: int) -> Reminder | None:
+		reminder = self._reminders.pop(reminder_id, None)
+		if reminder is None:
+			reminder = self._in_flight.pop(reminder_id, None)
+		if reminder is not None:
+			self._remove_from_user(reminder)
+
+		return reminder
+
+	def get_user_reminders(self, user_id: int) -> list[Reminder]:
+		return list(self._by_user.get(user_id, ()))
+
+	def _remove_from_user(self, reminder: Reminder):
+		user_reminders = self._by_user.get(reminder.user_id)
+		if not user_reminders:
+			return
+
+		index = bisect_left(user_reminders, _sort_key(reminder), key=_sort_key)
+		if index < len(user_reminders) and user_reminders[index].id == reminder.id:
+			del user_reminders[index]
+		if not user_reminders:
+			del self._by_user[reminder.user_id]
+
+	def _is_stale(self, entry: tuple[int, int]) -> bool:
+		reminder = self._reminders.get(entry[1])
+		return reminder is None or reminder.due_timestamp() != entry[0]
+
+	def next_due(self) -> int | None:
+		while self._heap and self._is_stale(self._heap[0]):
+			heapq.heappop(self._heap)
+
+		return self._heap[0][0] if self._heap else None
+
+	def pop_due(self, now: float | None = None) -> list[Reminder]:
+		now = time.time() if now is None else now
+		due: list[Reminder] = []
+		while (next_due := self.next_due()) is not None and next_due <= now:
+			_, reminder_id = heapq.heappop(self._heap)
+			reminder = self._in_flight[reminder_id] = self._reminders.pop(reminder_id)
+			due.append(reminder)
+
+		return due
+
+	async def wait_for_due(self) -> list[Reminder]:
+		"""
+		Sleep until the earliest reminder is due and return every reminder due by then.
+
+		Wakes up early whenever a reminder that is due sooner gets scheduled.
+		"""
+		while True:
+			self._wakeup.clear()
+			next_due = self.next_due()
+			now = time.time()
+			if next_due is not None and next_due <= now:
+				return self.pop_due(now)
+
+			try:
+				await asyncio.wait_for(self._wakeup.wait(), None if next_due is None else next_due - now)
+			except TimeoutError:
+				pass
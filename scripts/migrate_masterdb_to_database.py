@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from internal.database import NatsuminDatabase
-from internal.contracts.seasons import SeasonX
+from internal.contracts.seasons import load_season
 from uuid import uuid4
 
 import aiosqlite
@@ -68,7 +68,8 @@ async def main(*, production: bool, sync_season: bool):
 		await conn.commit()
 
 	if sync_season:
-		await SeasonX.sync_season(database)
+		await load_season("season_x").sync_season(database)
+	await database.close()
 
 
 if __name__ == "__main__":
@@ -13,8 +13,8 @@ import asyncio
 ROMAN_TO_NUMBER = {"Ⅰ": 1, "Ⅱ": 2, "Ⅲ": 3, "Ⅳ": 4, "Ⅴ": 5, "Ⅵ": 6, "Ⅶ": 7, "Ⅷ": 8, "Ⅸ": 9, "Ⅹ": 10}
 
 
-async def main(*, production: bool):
-	database = NatsuminDatabase(production)
+async def main(*, production: bool, profile: bool = False):
+	database = NatsuminDatabase(production, profile=profile)
 	await database.setup()
 
 	master_sheet = await fetch_sheets("15M2jJ46tI3Dy5VC_zPPT-whUt7cFjwXTxOdBga8EL6A", "Legacy Rank (Season 1-10)!A2:G889")
@@ -47,10 +47,14 @@ async def main(*, production: bool):
 
 	print("Finished!")
 
+	if profile:
+		print(database.profiler.report())
+
 
 if __name__ == "__main__":
 	parser = argparse.ArgumentParser()
 	parser.add_argument("--production", action="store_true")
+	parser.add_argument("--profile", action="store_true", help="print a report of the queries that ran")
 	args = parser.parse_args()
 
-	asyncio.run(main(production=args.production))
+	asyncio.run(main(production=args.production, profile=args.profile))
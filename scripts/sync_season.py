@@ -7,16 +7,21 @@ import argparse
 import asyncio
 
 
-async def main(*, production: bool):
-	database = NatsuminDatabase(production)
+async def main(*, production: bool, profile: bool = False):
+	database = NatsuminDatabase(production, profile=profile)
 	await database.setup()
 
 	await SeasonX.sync_season(database)
+	await database.close()
+
+	if profile:
+		print(database.profiler.report())
 
 
 if __name__ == "__main__":
 	parser = argparse.ArgumentParser()
 	parser.add_argument("--production", action="store_true")
+	parser.add_argument("--profile", action="store_true", help="print a report of the queries that ran")
 	args = parser.parse_args()
 
-	asyncio.run(main(production=args.production))
+	asyncio.run(main(production=args.production, profile=args.profile))